@@ -0,0 +1,103 @@
+import os
+import threading
+
+from flask import Flask, request, jsonify
+from flask_cors import CORS
+
+from mlProject import logger
+from mlProject.config.configuration import ConfigurationManager
+from mlProject.pipeline.prediction import PredictionPipeline
+from mlProject.pipeline.micro_batching import MicroBatcher
+
+
+app = Flask(__name__)
+CORS(app)
+
+config_manager = ConfigurationManager()
+serving_config = config_manager.get_model_serving_config()
+
+# Artifacts are loaded once per process, not per request. Under serve.py
+# they are loaded once in the parent and shared by the forked workers.
+prediction_pipeline = PredictionPipeline(
+    serving_config,
+    config_manager.get_prediction_cache_config(),
+)
+
+# Single-customer requests are coalesced into windows scored as one matrix
+batching_config = config_manager.get_micro_batching_config()
+micro_batcher = None
+if batching_config.enabled:
+    micro_batcher = MicroBatcher(batching_config, prediction_pipeline.predict)
+
+_background_pid = None
+_background_lock = threading.Lock()
+
+
+@app.before_request
+def start_background_workers():
+    """
+    Starts the hot-reload watcher and the micro-batching loop once per
+    serving process. Threads do not survive a fork, so this runs lazily
+    in whichever process ends up handling requests.
+    """
+    global _background_pid
+
+    if _background_pid == os.getpid():
+        return
+
+    with _background_lock:
+        if _background_pid == os.getpid():
+            return
+
+        prediction_pipeline.start_hot_reload()
+        if micro_batcher is not None:
+            micro_batcher.start_in_thread()
+
+        _background_pid = os.getpid()
+
+
+@app.route("/health", methods=["GET"])
+def health():
+    return jsonify({"status": "ok"})
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    return jsonify({
+        "pid": os.getpid(),
+        "model": prediction_pipeline.model_holder.stats(),
+        "micro_batching": micro_batcher.stats() if micro_batcher else None,
+        "prediction_cache": (
+            prediction_pipeline.cache.stats() if prediction_pipeline.cache else None
+        ),
+    })
+
+
+@app.route("/predict", methods=["POST"])
+def predict():
+    """
+    Accepts a single customer object or a JSON array of customer objects.
+    """
+    payload = request.get_json(silent=True)
+
+    if isinstance(payload, dict):
+        records = [payload]
+    elif isinstance(payload, list) and payload:
+        records = payload
+    else:
+        return jsonify({"error": "Expected a customer object or a non-empty array"}), 400
+
+    try:
+        if micro_batcher is not None and isinstance(payload, dict):
+            return jsonify(micro_batcher.submit_threadsafe(payload))
+
+        predictions = prediction_pipeline.predict(records)
+    except (ValueError, TypeError) as e:
+        logger.warning(f"Rejected prediction request: {e}")
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify(predictions if isinstance(payload, list) else predictions[0])
+
+
+if __name__ == "__main__":
+    app.run(host=serving_config.host, port=serving_config.port, threaded=True)
@@ -0,0 +1,23 @@
+import argparse
+
+from mlProject.config.configuration import ConfigurationManager
+from mlProject.pipeline.batch_prediction import BatchPredictionPipeline
+from mlProject import logger
+
+STAGE_NAME = "Batch Prediction"
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Score a customer file in chunks")
+    parser.add_argument("--input", help="CSV in the raw Telco layout")
+    parser.add_argument("--output", help="where predictions are written")
+    args = parser.parse_args()
+
+    try:
+        logger.info(f">>>>>> Stage {STAGE_NAME} started <<<<<<")
+        config = ConfigurationManager().get_batch_prediction_config()
+        obj = BatchPredictionPipeline(config)
+        obj.run(args.input, args.output)
+        logger.info(f">>>>>> Stage {STAGE_NAME} completed <<<<<<\n\nx==========x")
+    except Exception as e:
+        logger.exception(e)
+        raise e
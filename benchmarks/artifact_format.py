@@ -0,0 +1,88 @@
+"""
+Compares CSV, Parquet and Feather as the inter-stage artifact format.
+
+Runs DataCleaning and FeatureEngineering on synthetic customers with each
+format and reports stage wall time, the time to load the featured data
+(what DataTransformation pays) and the size on disk.
+
+    python benchmarks/artifact_format.py --rows 1000000
+"""
+import argparse
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+from synthetic import generate_customers
+
+from mlProject import logger
+from mlProject.components.data_cleaning import DataCleaning
+from mlProject.components.feature_engineering import FeatureEngineering
+from mlProject.entity.config_entity import DataCleaningConfig, FeatureEngineeringConfig
+from mlProject.utils.common import load_dataframe
+
+
+FORMATS = ["csv", "parquet", "feather"]
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def run(n_rows: int) -> list:
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        raw_path = tmp / "raw.csv"
+        generate_customers(n_rows).to_csv(raw_path, index=False)
+
+        for fmt in FORMATS:
+            cleaning = DataCleaning(DataCleaningConfig(
+                root_dir=tmp,
+                cleaned_data_path=tmp / f"cleaned.{fmt}",
+            ))
+            feature_engineering = FeatureEngineering(FeatureEngineeringConfig(
+                root_dir=tmp,
+                featured_data_path=tmp / f"featured.{fmt}",
+                feature_transformer_path=tmp / "feature_transformer.pkl",
+                partitions_dir=tmp / "partitions",
+            ))
+
+            cleaned_path, cleaning_s = _timed(cleaning.initiate_data_cleaning, raw_path)
+            featured_path, fe_s = _timed(
+                feature_engineering.initiate_feature_engineering, cleaned_path
+            )
+            featured, load_s = _timed(load_dataframe, featured_path)
+
+            results.append({
+                "format": fmt,
+                "cleaning_s": cleaning_s,
+                "feature_engineering_s": fe_s,
+                "load_featured_s": load_s,
+                "cleaned_mb": cleaned_path.stat().st_size / 1e6,
+                "featured_mb": featured_path.stat().st_size / 1e6,
+                "featured_memory_mb": featured.memory_usage(deep=True).sum() / 1e6,
+            })
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    logger.setLevel(logging.WARNING)
+
+    results = run(args.rows)
+
+    print(f"\n{args.rows:,} rows")
+    header = list(results[0])
+    print(" | ".join(f"{h:>22}" for h in header))
+    for row in results:
+        print(" | ".join(
+            f"{v:>22.2f}" if isinstance(v, float) else f"{v:>22}" for v in row.values()
+        ))
@@ -0,0 +1,165 @@
+"""
+Compares float64 and compact (float32/int8) matrices, read or memory-mapped.
+
+DataTransformation writes the matrices once per storage dtype. Then, for
+each mode, a fresh process runs ModelTrainer followed by ModelEvaluation
+on them, as the on-disk pipeline does, and reports artifact size, load
+time, fit time, the anonymous (private) RSS the loaded matrices take,
+peak RSS growth and the test metrics.
+
+The metrics of every mode must be within METRIC_TOLERANCE of the float64
+baseline; the benchmark exits non-zero otherwise. Rounding the features
+to float32 moves a probability by ~1e-7, so predictions only change
+when they sit that close to the threshold.
+
+    python benchmarks/compact_matrices.py --rows 1000000
+"""
+import argparse
+import logging
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from scratch import featured_customers, transform_dataset
+from synthetic import generate_customers
+
+from mlProject import logger
+from mlProject.components.model_evaluation import ModelEvaluation
+from mlProject.components.model_trainer import ModelTrainer
+from mlProject.entity.config_entity import (
+    ModelEvaluationConfig,
+    ModelTrainerConfig,
+)
+from mlProject.pipeline.profiler import _read_status_mb, peak_rss_mb, reset_peak_rss, rss_mb
+
+
+METRIC_TOLERANCE = 1e-3
+
+MODES = {
+    "float64": {"compact": False, "mmap": False},
+    "float64_mmap": {"compact": False, "mmap": True},
+    "compact": {"compact": True, "mmap": False},
+    "compact_mmap": {"compact": True, "mmap": True},
+}
+
+
+def _train_and_evaluate(data_dir: Path, mmap: bool) -> dict:
+    """Runs in a spawned process so memory is not shared between modes"""
+    logger.setLevel(logging.WARNING)
+
+    trainer = ModelTrainer(ModelTrainerConfig(
+        root_dir=data_dir,
+        model_path=data_dir / f"model-{mmap}.pkl",
+        leaderboard_path=data_dir / f"leaderboard-{mmap}.json",
+        report_path=data_dir / f"model_report-{mmap}.json",
+        cv_report_path=data_dir / f"cv_report-{mmap}.json",
+        featured_data_path=data_dir / "featured.parquet",
+        preprocessor_path=data_dir / "preprocessor.pkl",
+        train_data_path=data_dir / "X_train.npy",
+        test_data_path=data_dir / "X_test.npy",
+        y_train=data_dir / "y_train.npy",
+        y_test=data_dir / "y_test.npy",
+        n_workers=0,
+        cpu_threads=0,
+    ))
+    evaluation = ModelEvaluation(ModelEvaluationConfig(
+        root_dir=data_dir,
+        model_path=trainer.config.model_path,
+        test_data_path=trainer.config.test_data_path,
+        y_test=trainer.config.y_test,
+        metrics_path=data_dir / f"metrics-{mmap}.json",
+    ))
+    for component in (trainer, evaluation):
+        component.params["data_transformation"]["storage"]["mmap"] = mmap
+
+    reset_peak_rss()
+    rss_before, anon_before = rss_mb(), _read_status_mb("RssAnon")
+
+    start = time.perf_counter()
+    data = trainer._load_data()
+    load_s = time.perf_counter() - start
+    anon_loaded_mb = _read_status_mb("RssAnon") - anon_before
+
+    start = time.perf_counter()
+    trainer.initiate_model_training(data)
+    fit_s = time.perf_counter() - start
+    del data
+
+    start = time.perf_counter()
+    metrics = evaluation.initiate_model_evaluation()
+    evaluate_s = time.perf_counter() - start
+
+    return {
+        "load_s": load_s,
+        "private_mb_after_load": anon_loaded_mb,
+        "fit_s": fit_s,
+        "evaluate_s": evaluate_s,
+        "peak_rss_growth_mb": peak_rss_mb() - rss_before,
+        "metrics": metrics,
+    }
+
+
+def run(n_rows: int) -> list:
+    featured = featured_customers(generate_customers(n_rows))
+    spawn = multiprocessing.get_context("spawn")
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dirs = {}
+        for compact in (False, True):
+            data_dirs[compact] = Path(tmp) / ("compact" if compact else "float64")
+            paths = transform_dataset(featured, data_dirs[compact], compact=compact)._array_paths()
+            data_dirs[compact, "bytes"] = sum(Path(path).stat().st_size for path in paths)
+        del featured
+
+        for mode, settings in MODES.items():
+            with spawn.Pool(1) as pool:
+                result = pool.apply(
+                    _train_and_evaluate, (data_dirs[settings["compact"]], settings["mmap"])
+                )
+            results.append({
+                "mode": mode,
+                "artifact_mb": data_dirs[settings["compact"], "bytes"] / 1e6,
+                **result,
+            })
+
+    return results
+
+
+def check_metrics(results: list) -> dict:
+    """Largest absolute difference of each metric from the float64 baseline"""
+    baseline = results[0]["metrics"]
+    return {
+        metric: max(abs(row["metrics"][metric] - value) for row in results[1:])
+        for metric, value in baseline.items()
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    logger.setLevel(logging.WARNING)
+
+    results = run(args.rows)
+
+    print(f"\n{args.rows:,} rows")
+    header = [h for h in results[0] if h != "metrics"] + ["roc_auc"]
+    print(" | ".join(f"{h:>22}" for h in header))
+    for row in results:
+        values = [row[h] for h in header[:-1]] + [row["metrics"]["roc_auc"]]
+        print(" | ".join(
+            f"{v:>22.6f}" if isinstance(v, float) else f"{v:>22}" for v in values
+        ))
+
+    differences = check_metrics(results)
+    print(f"\nMax metric difference from float64 (tolerance {METRIC_TOLERANCE:.0e}):")
+    for metric, diff in differences.items():
+        print(f"  {metric:<10} {diff:.2e}")
+
+    if max(differences.values()) > METRIC_TOLERANCE:
+        print("Metrics changed beyond tolerance")
+        sys.exit(1)
@@ -0,0 +1,95 @@
+"""
+Wall time and memory of stratified k-fold cross-validation at scale.
+
+A featured Parquet file of synthetic customers is built chunk by chunk,
+then CrossValidation runs the params.yaml model and preprocessor on it
+for each --max-rows setting (0 cross-validates every row). Reported are
+the wall time, the mean per-fold stage timings, the ROC-AUC mean and
+standard deviation across folds, and the peak RSS of this process and
+of the largest fold worker.
+
+    python benchmarks/cross_validation.py --rows 2000000 --max-rows 1000000 0
+"""
+import argparse
+import logging
+import resource
+import tempfile
+import time
+from pathlib import Path
+
+from box import ConfigBox
+
+from streaming_transformation import write_featured
+
+from mlProject import logger
+from mlProject.components.cross_validation import CrossValidation
+from mlProject.components.data_transformation import build_preprocessor
+from mlProject.components.model_backends import build_model
+from mlProject.constants import PARAMS_FILE_PATH, SCHEMA_PROCESSED_FILE_PATH
+from mlProject.pipeline.profiler import peak_rss_mb, reset_peak_rss
+from mlProject.utils.common import read_yaml
+
+
+def run(featured_path: Path, max_rows: int, n_splits: int, cpu_threads: int, scratch_dir: Path) -> dict:
+    params = read_yaml(PARAMS_FILE_PATH)
+    schema = read_yaml(SCHEMA_PROCESSED_FILE_PATH)
+    transformation_params = params["data_transformation"]
+
+    cross_validation = CrossValidation(
+        ConfigBox({"n_splits": n_splits, "n_repeats": 1, "max_rows": max_rows or None}),
+        target_column=schema["target_column"],
+        random_state=params["general"]["random_state"],
+        cpu_threads=cpu_threads,
+        scratch_dir=scratch_dir,
+    )
+
+    reset_peak_rss()
+    start = time.perf_counter()
+    report = cross_validation.run(
+        featured_path,
+        build_preprocessor(params, schema, bool(transformation_params["encoding"]["sparse_output"])),
+        build_model(params["model"]["name"], params, 1),
+        compact=bool(transformation_params["storage"]["compact"]),
+    )
+    seconds = time.perf_counter() - start
+
+    summary = report["summary"]
+    return {
+        "max_rows": max_rows,
+        "rows": report["rows"],
+        "workers": report["n_workers"],
+        "wall_s": seconds,
+        **{f"fold_{key}": summary[key]["mean"] for key in ("load_s", "transform_s", "fit_s")},
+        "roc_auc_mean": summary["roc_auc"]["mean"],
+        "roc_auc_std": summary["roc_auc"]["std"],
+        "parent_peak_mb": peak_rss_mb(),
+        # ru_maxrss of children is the largest of all workers so far, in KB
+        "worker_peak_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--max-rows", type=int, nargs="+", default=[1_000_000, 0])
+    parser.add_argument("--splits", type=int, default=5)
+    parser.add_argument("--cpu-threads", type=int, default=0)
+    args = parser.parse_args()
+
+    logger.setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        featured_path = Path(tmp) / "featured.parquet"
+        write_featured(featured_path, args.rows)
+        results = [
+            run(featured_path, max_rows, args.splits, args.cpu_threads, Path(tmp) / "cv")
+            for max_rows in args.max_rows
+        ]
+
+    print(f"\n{args.rows:,} featured rows, {args.splits} folds")
+    header = list(results[0])
+    print(" | ".join(f"{h:>15}" for h in header))
+    for row in results:
+        print(" | ".join(
+            f"{v:>15.4f}" if isinstance(v, float) else f"{v:>15}" for v in row.values()
+        ))
@@ -0,0 +1,151 @@
+"""
+Compares the row-wise feature engineering with the compiled FeatureSpec.
+
+The row-wise path is the original implementation: `apply` with a Python
+function per element or per row, on object columns as `pd.read_csv`
+produced them. The spec path is FeatureSpec built from params.yaml, on
+the categorical columns `read_dataset` produces. Outputs are checked to
+agree.
+
+    python benchmarks/feature_engineering.py --rows 1000000 10000000
+"""
+import argparse
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+from synthetic import generate_customers
+
+from mlProject import logger
+from mlProject.components.feature_engineering import FeatureSpec
+from mlProject.constants import PARAMS_FILE_PATH
+from mlProject.utils.common import read_yaml
+
+
+GENERATE_CHUNK_ROWS = 1_000_000
+
+SERVICE_COLUMNS = [
+    "PhoneService",
+    "MultipleLines",
+    "OnlineSecurity",
+    "OnlineBackup",
+    "DeviceProtection",
+    "TechSupport",
+    "StreamingTV",
+    "StreamingMovies",
+]
+
+
+def _cleaned_customers(n_rows: int) -> pd.DataFrame:
+    """Generates in chunks with shared categorical dtypes to bound memory"""
+    chunks, dtypes = [], None
+    for start in range(0, n_rows, GENERATE_CHUNK_ROWS):
+        chunk = generate_customers(
+            min(GENERATE_CHUNK_ROWS, n_rows - start), seed=42 + start
+        ).drop(columns=["customerID"])
+        chunk["TotalCharges"] = pd.to_numeric(chunk["TotalCharges"].replace(" ", None))
+        chunk = chunk.dropna(subset=["TotalCharges"])
+
+        if dtypes is None:
+            dtypes = {
+                col: pd.CategoricalDtype(sorted(chunk[col].unique()))
+                for col in chunk.columns if chunk[col].dtype.kind in "OT"
+            }
+        chunks.append(chunk.astype(dtypes))
+
+    return pd.concat(chunks, ignore_index=True)
+
+
+def _tenure_group(tenure: int) -> str:
+    if tenure <= 12:
+        return "0-1 Year"
+    elif tenure <= 24:
+        return "1-2 Years"
+    elif tenure <= 48:
+        return "2-4 Years"
+    else:
+        return "4+ Years"
+
+
+def build_features_rowwise(df: pd.DataFrame) -> pd.DataFrame:
+    df["TenureGroup"] = df["tenure"].apply(_tenure_group)
+    df["MonthlyChargeLevel"] = pd.qcut(
+        df["MonthlyCharges"], q=3, labels=["Low", "Medium", "High"]
+    )
+    df["TotalServices"] = df[SERVICE_COLUMNS].apply(
+        lambda row: sum(row == "Yes"), axis=1
+    )
+    df["HasInternet"] = df["InternetService"].apply(
+        lambda x: "No" if x == "No" else "Yes"
+    )
+    df["SupportRisk"] = df[["OnlineSecurity", "TechSupport"]].apply(
+        lambda row: "HighRisk"
+        if row["OnlineSecurity"] == "No" and row["TechSupport"] == "No"
+        else "LowRisk",
+        axis=1,
+    )
+    df["ContractRisk"] = df["Contract"].map({
+        "Month-to-month": "High",
+        "One year": "Medium",
+        "Two year": "Low",
+    })
+    df["AvgMonthlySpend"] = (
+        df["TotalCharges"] / df["tenure"]
+    ).replace([np.inf, -np.inf], 0)
+    return df
+
+
+def build_features_spec(df: pd.DataFrame, spec: FeatureSpec) -> pd.DataFrame:
+    return spec.apply(df, spec.fit(df))
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def run(n_rows: int, spec: FeatureSpec, rowwise_max_rows: int) -> dict:
+    df = _cleaned_customers(n_rows)
+    features = list(spec.features)
+
+    spec_df, spec_s = _timed(build_features_spec, df.copy(), spec)
+    result = {"rows": len(df), "spec_s": spec_s, "rowwise_s": None, "speedup": None}
+
+    if len(df) <= rowwise_max_rows:
+        # Row-wise apply over categorical columns is far slower still
+        rowwise_df, rowwise_s = _timed(build_features_rowwise, df.astype(
+            {col: object for col in df.select_dtypes("category").columns}
+        ))
+        for col in features:
+            if not (rowwise_df[col].astype(str) == spec_df[col].astype(str)).all():
+                raise AssertionError(f"Feature {col} differs between implementations")
+        result["rowwise_s"] = rowwise_s
+        result["speedup"] = rowwise_s / spec_s
+
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument(
+        "--rowwise-max-rows", type=int, default=10_000_000,
+        help="skip the row-wise implementation above this many rows",
+    )
+    args = parser.parse_args()
+
+    logger.setLevel(logging.WARNING)
+    spec = FeatureSpec.from_params(read_yaml(PARAMS_FILE_PATH))
+
+    results = [run(n_rows, spec, args.rowwise_max_rows) for n_rows in args.rows]
+
+    header = list(results[0])
+    print(" | ".join(f"{h:>12}" for h in header))
+    for row in results:
+        print(" | ".join(
+            f"{v:>12.2f}" if isinstance(v, float)
+            else f"{'-' if v is None else v:>12}" for v in row.values()
+        ))
@@ -0,0 +1,221 @@
+"""
+Memory and accuracy of out-of-core SGD training against a full logistic regression fit.
+
+DataTransformation writes the matrices of synthetic featured customers
+once. Then, for logistic_regression and for sgd_logistic at each
+--chunk-rows setting, a fresh process memory-maps them as ModelTrainer
+does and fits the model. Reported are the fit time, the peak private
+(anonymous) memory above the baseline while fitting, sampled every few
+milliseconds, the peak RSS, which also counts the mapped file's page
+cache, the full passes over X_train and the test ROC-AUC.
+
+The private peak of sgd_logistic follows the chunk size rather than the
+row count. lbfgs can also fit a memory-mapped float64 matrix in place,
+but it passes over all of it at least once per iteration, against
+sgd_logistic's `epochs` passes. gb_read_uncached is what those passes
+read from disk once X_train outgrows the page cache.
+
+Then the whole of ModelTrainer.initiate_model_training, with
+sgd_logistic selected and featured.parquet on disk for the fused scorer
+parity check, runs at each --scaling-rows size, and the benchmark fails
+if its private peak grows by more than FLAT_PEAK_TOLERANCE of the
+growth of X_train between the smallest and the largest size.
+
+    python benchmarks/incremental_training.py --rows 2000000 --chunk-rows 50000 200000 \
+        --scaling-rows 250000 1000000
+"""
+import argparse
+import logging
+import multiprocessing
+import tempfile
+import threading
+from pathlib import Path
+
+import numpy as np
+from sklearn.metrics import roc_auc_score
+
+from scratch import featured_customers, transform_dataset
+from synthetic import generate_customers
+
+from mlProject import logger
+from mlProject.components.model_backends import build_model
+from mlProject.components.model_trainer import ModelTrainer, _fit
+from mlProject.entity.config_entity import ModelTrainerConfig
+from mlProject.pipeline.profiler import _read_status_mb, peak_rss_mb, reset_peak_rss
+from mlProject.utils.common import save_dataframe
+
+
+SAMPLE_INTERVAL_S = 0.005
+# Share of the growth of X_train that the private peak of a whole
+# sgd_logistic training run may grow by as the rows grow
+FLAT_PEAK_TOLERANCE = 0.1
+
+
+class _AnonPeak(threading.Thread):
+    """Samples RssAnon until stopped, keeping the largest value"""
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.peak = _read_status_mb("RssAnon")
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(SAMPLE_INTERVAL_S):
+            self.peak = max(self.peak, _read_status_mb("RssAnon"))
+
+    def stop(self) -> float:
+        self._done.set()
+        self.join()
+        return max(self.peak, _read_status_mb("RssAnon"))
+
+
+def _write_dataset(n_rows: int, data_dir: Path):
+    featured = featured_customers(generate_customers(n_rows))
+    save_dataframe(featured, data_dir / "featured.parquet")
+    transform_dataset(featured, data_dir)
+
+
+def _trainer(data_dir: Path, name: str, chunk_rows: int) -> ModelTrainer:
+    trainer = ModelTrainer(ModelTrainerConfig(
+        root_dir=data_dir,
+        model_path=data_dir / "model.pkl",
+        leaderboard_path=data_dir / "leaderboard.json",
+        report_path=data_dir / "model_report.json",
+        cv_report_path=data_dir / "cv_report.json",
+        featured_data_path=data_dir / "featured.parquet",
+        preprocessor_path=data_dir / "preprocessor.pkl",
+        train_data_path=data_dir / "X_train.npy",
+        test_data_path=data_dir / "X_test.npy",
+        y_train=data_dir / "y_train.npy",
+        y_test=data_dir / "y_test.npy",
+        n_workers=0,
+        cpu_threads=0,
+    ))
+    trainer.params["model"]["name"] = name
+    trainer.params["data_transformation"]["storage"]["mmap"] = True
+    trainer.params["sgd_logistic"]["chunk_rows"] = chunk_rows
+    return trainer
+
+
+def _train(data_dir: Path, name: str, chunk_rows: int) -> dict:
+    """Runs in a spawned process so memory is not shared between runs"""
+    logger.setLevel(logging.WARNING)
+
+    trainer = _trainer(data_dir, name, chunk_rows)
+    X_train, X_test, y_train, y_test = trainer._load_data()
+    model = build_model(name, trainer.params, 1)
+
+    reset_peak_rss()
+    anon_before = _read_status_mb("RssAnon")
+    sampler = _AnonPeak()
+    sampler.start()
+    model, fit_s = _fit(model, X_train, y_train, 1, trainer._incremental(name))
+    anon_peak = sampler.stop()
+    peak_rss = peak_rss_mb()
+
+    # lbfgs evaluates the loss and gradient over every row at least once
+    # per iteration
+    passes = trainer.params["sgd_logistic"]["epochs"] if name == "sgd_logistic" \
+        else int(np.max(model.n_iter_))
+    x_bytes = (data_dir / "X_train.npy").stat().st_size
+
+    return {
+        "model": name,
+        "chunk_rows": chunk_rows if name == "sgd_logistic" else 0,
+        "fit_s": fit_s,
+        "private_peak_mb": anon_peak - anon_before,
+        "peak_rss_mb": peak_rss,
+        "passes": passes,
+        "gb_read_uncached": passes * x_bytes / 1e9,
+        "roc_auc": float(roc_auc_score(y_test, model.predict_proba(X_test)[:, 1])),
+    }
+
+
+def _train_whole(data_dir: Path, chunk_rows: int) -> dict:
+    """initiate_model_training with sgd_logistic, in a spawned process"""
+    logger.setLevel(logging.WARNING)
+
+    trainer = _trainer(data_dir, "sgd_logistic", chunk_rows)
+
+    anon_before = _read_status_mb("RssAnon")
+    sampler = _AnonPeak()
+    sampler.start()
+    _, roc_auc = trainer.initiate_model_training()
+    anon_peak = sampler.stop()
+
+    return {
+        "x_train_mb": (data_dir / "X_train.npy").stat().st_size / 1024**2,
+        "private_peak_mb": anon_peak - anon_before,
+        "roc_auc": roc_auc,
+    }
+
+
+def check_flat_peak(row_counts: list, chunk_rows: int) -> list:
+    """
+    Trains sgd_logistic end to end at each row count.
+
+    Raises:
+        AssertionError: if the private peak grows with the rows by more
+            than FLAT_PEAK_TOLERANCE of the growth of X_train
+    """
+    spawn = multiprocessing.get_context("spawn")
+
+    results = []
+    for n_rows in sorted(row_counts):
+        with tempfile.TemporaryDirectory() as tmp:
+            _write_dataset(n_rows, Path(tmp))
+            with spawn.Pool(1) as pool:
+                results.append({"rows": n_rows, **pool.apply(_train_whole, (Path(tmp), chunk_rows))})
+
+    smallest, largest = results[0], results[-1]
+    peak_growth = largest["private_peak_mb"] - smallest["private_peak_mb"]
+    allowed = FLAT_PEAK_TOLERANCE * (largest["x_train_mb"] - smallest["x_train_mb"])
+    assert peak_growth <= allowed, (
+        f"sgd_logistic's private peak grew by {peak_growth:.1f} MB from "
+        f"{smallest['rows']:,} to {largest['rows']:,} rows, more than {allowed:.1f} MB"
+    )
+    return results
+
+
+def _print_table(results: list):
+    header = list(results[0])
+    print(" | ".join(f"{h:>20}" for h in header))
+    for row in results:
+        print(" | ".join(
+            f"{v:>20.4f}" if isinstance(v, float) else f"{v:>20}" for v in row.values()
+        ))
+
+
+def run(n_rows: int, chunk_rows: list) -> list:
+    spawn = multiprocessing.get_context("spawn")
+    runs = [("logistic_regression", 0)] + [("sgd_logistic", rows) for rows in chunk_rows]
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        _write_dataset(n_rows, Path(tmp))
+        for name, rows in runs:
+            with spawn.Pool(1) as pool:
+                results.append(pool.apply(_train, (Path(tmp), name, rows)))
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--chunk-rows", type=int, nargs="+", default=[50_000, 200_000])
+    parser.add_argument("--scaling-rows", type=int, nargs="+", default=[250_000, 1_000_000])
+    args = parser.parse_args()
+
+    logger.setLevel(logging.WARNING)
+
+    results = run(args.rows, args.chunk_rows)
+
+    print(f"\n{args.rows:,} rows")
+    _print_table(results)
+
+    scaling = check_flat_peak(args.scaling_rows, args.chunk_rows[0])
+
+    print(f"\nWhole sgd_logistic training, {args.chunk_rows[0]:,} rows a chunk")
+    _print_table(scaling)
+    print(f"Private peak flat within {FLAT_PEAK_TOLERANCE:.0%} of the growth of X_train")
@@ -0,0 +1,100 @@
+"""
+Wall time of the hyperparameter search by worker count, with and without halving.
+
+DataTransformation writes the matrices of synthetic featured customers
+once. ModelSearch then runs the params.yaml search space on the
+memory-mapped X_train with each --workers count, and once more per
+count with a halving factor as large as the grid, which fits every
+candidate on all rows (exhaustive grid search). Speedup is relative to
+the first worker count of the same mode; it can only approach the
+worker count on a machine with that many free cores.
+
+    python benchmarks/model_search.py --rows 200000 --workers 1 2 4
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from box import ConfigBox
+
+from scratch import featured_customers, transform_dataset
+from synthetic import generate_customers
+
+from mlProject import logger
+from mlProject.components.model_search import ModelSearch
+from mlProject.constants import PARAMS_FILE_PATH
+from mlProject.utils.common import load_matrix, read_yaml
+
+
+def _training_split(n_rows: int, data_dir: Path) -> tuple:
+    transform_dataset(featured_customers(generate_customers(n_rows)), data_dir)
+    return (
+        load_matrix(data_dir / "X_train.npy", mmap=True),
+        load_matrix(data_dir / "y_train.npy", mmap=True),
+    )
+
+
+def run(n_rows: int, workers: list) -> list:
+    params = read_yaml(PARAMS_FILE_PATH)
+    lr_params = params["logistic_regression"]
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        X_train, y_train = _training_split(n_rows, Path(tmp))
+
+        for mode in ("halving", "exhaustive"):
+            search_params = ConfigBox(lr_params["search"].to_dict())
+            if mode == "exhaustive":
+                candidates, _ = ModelSearch(
+                    search_params, lr_params["max_iter"], None, 1, 0, Path(tmp)
+                ).candidates()
+                search_params["halving_factor"] = len(candidates)
+
+            baseline = None
+            for n_workers in workers:
+                search = ModelSearch(
+                    search_params,
+                    max_iter=lr_params["max_iter"],
+                    random_state=params["general"]["random_state"],
+                    n_workers=n_workers,
+                    cpu_threads=0,
+                    scratch_dir=Path(tmp) / "search",
+                )
+                start = time.perf_counter()
+                leaderboard = search.run(X_train, y_train)
+                seconds = time.perf_counter() - start
+                baseline = baseline or seconds
+
+                results.append({
+                    "mode": mode,
+                    "workers": leaderboard["n_workers"],
+                    "wall_s": seconds,
+                    "speedup": baseline / seconds,
+                    "fits": sum(len(e["scores"]) for e in leaderboard["leaderboard"]),
+                    "validation_roc_auc": leaderboard["leaderboard"][0]["validation_roc_auc"],
+                    "selected": " ".join(str(v) for v in leaderboard["selected"].values()),
+                })
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    logger.setLevel(logging.WARNING)
+
+    results = run(args.rows, args.workers)
+
+    print(f"\n{args.rows:,} rows, {len(os.sched_getaffinity(0))} available cores")
+    header = list(results[0])
+    print(" | ".join(f"{h:>18}" for h in header))
+    for row in results:
+        print(" | ".join(
+            f"{v:>18.4f}" if isinstance(v, float) else f"{v:>18}" for v in row.values()
+        ))
@@ -0,0 +1,65 @@
+"""
+Compares the on-disk and in-memory stage handoff of TrainingPipeline.
+
+Each mode runs the full pipeline on the same synthetic customers in its
+own scratch directory, with the stage cache disabled so every stage runs.
+
+    python benchmarks/pipeline_handoff.py --rows 1000000
+"""
+import argparse
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+from scratch import scratch_config, working_directory
+from synthetic import write_customers
+
+from mlProject import logger
+from mlProject.pipeline.pipeline import TrainingPipeline
+
+
+MODES = {
+    "disk": {"in_memory": False, "artifact_writes": "background"},
+    "memory_background": {"in_memory": True, "artifact_writes": "background"},
+    "memory_end": {"in_memory": True, "artifact_writes": "end"},
+}
+
+
+def run(n_rows: int) -> list:
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        source_path = write_customers(tmp / "customers.csv", n_rows)
+
+        for mode, settings in MODES.items():
+            run_dir = tmp / mode
+            config_path = scratch_config(run_dir, source_path, {
+                "training_pipeline": settings,
+                "stage_cache": {"enabled": False},
+            })
+
+            with working_directory(run_dir):
+                start = time.perf_counter()
+                TrainingPipeline(config_path).run()
+                seconds = time.perf_counter() - start
+
+            results.append({"mode": mode, "seconds": seconds})
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    logger.setLevel(logging.WARNING)
+
+    results = run(args.rows)
+
+    print(f"\n{args.rows:,} rows")
+    disk_seconds = results[0]["seconds"]
+    for row in results:
+        print(f"{row['mode']:>20} | {row['seconds']:>8.2f}s | {disk_seconds / row['seconds']:>5.2f}x")
@@ -0,0 +1,118 @@
+import contextlib
+import os
+from pathlib import Path
+
+import pandas as pd
+import yaml
+
+from mlProject.components.data_cleaning import DataCleaning
+from mlProject.components.data_transformation import DataTransformation
+from mlProject.components.feature_engineering import FeatureTransformer
+from mlProject.constants import (
+    CONFIG_FILE_PATH,
+    PARAMS_FILE_PATH,
+    SCHEMA_RAW_FILE_PATH,
+    SCHEMA_PROCESSED_FILE_PATH,
+)
+from mlProject.entity.config_entity import DataTransformationConfig
+from mlProject.utils.common import read_yaml
+
+
+def scratch_config(run_dir: Path, source_path: Path, overrides: dict = None) -> Path:
+    """
+    Sets up `run_dir` to run the pipelines against `source_path` and
+    returns the path of its config.yaml.
+
+    The source is hard-linked (or copied across filesystems) to where
+    config.yaml expects the raw data, and config.yaml sections are
+    updated with `overrides`. Artifact paths stay relative, so the
+    pipelines must run with `run_dir` as the working directory.
+    """
+    run_dir = Path(run_dir)
+    with open(CONFIG_FILE_PATH) as f:
+        config = yaml.safe_load(f)
+
+    raw_path = run_dir / config["data_ingestion"]["source_data_path"]
+    raw_path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(source_path, raw_path)
+    except OSError:
+        raw_path.write_bytes(Path(source_path).read_bytes())
+
+    config["data_validation"]["schema_raw"] = str(SCHEMA_RAW_FILE_PATH)
+    config["data_validation"]["schema_processed"] = str(SCHEMA_PROCESSED_FILE_PATH)
+    for section, settings in (overrides or {}).items():
+        config[section].update(settings)
+
+    config_path = run_dir / "config.yaml"
+    with open(config_path, "w") as f:
+        yaml.safe_dump(config, f)
+    return config_path
+
+
+@contextlib.contextmanager
+def working_directory(path: Path):
+    cwd = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(cwd)
+
+
+def featured_customers(customers: pd.DataFrame) -> pd.DataFrame:
+    """Raw customers cleaned and featured as the training pipeline does"""
+    return FeatureTransformer.from_params(read_yaml(PARAMS_FILE_PATH)).fit_transform(
+        DataCleaning.clean(customers)
+    )
+
+
+def data_transformation(
+    data_dir: Path, streaming: bool = False, chunk_size: int = 250_000
+) -> DataTransformation:
+    """A DataTransformation that writes its artifacts to `data_dir`"""
+    data_dir = Path(data_dir)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    return DataTransformation(DataTransformationConfig(
+        root_dir=data_dir,
+        transformed_train=data_dir / "X_train.npy",
+        transformed_test=data_dir / "X_test.npy",
+        y_train=data_dir / "y_train.npy",
+        y_test=data_dir / "y_test.npy",
+        preprocessor_path=data_dir / "preprocessor.pkl",
+        streaming=streaming,
+        chunk_size=chunk_size,
+    ))
+
+
+def transform_dataset(
+    featured,
+    data_dir: Path,
+    streaming: bool = False,
+    chunk_size: int = 250_000,
+    params: dict = None,
+    **attributes,
+) -> DataTransformation:
+    """
+    Transforms featured customers into matrices in `data_dir`.
+
+    Args:
+        featured (pd.DataFrame | Path): featured customers or their file
+        data_dir (Path): where the matrices and preprocessor are written
+        streaming (bool): whether the featured file is streamed in chunks
+        chunk_size (int): rows per chunk when streaming
+        params (dict, optional): params.yaml sections to update first
+        **attributes: DataTransformation attributes to set first,
+            e.g. compact=True
+
+    Returns:
+        DataTransformation: the component that ran
+    """
+    transformation = data_transformation(data_dir, streaming, chunk_size)
+    for section, settings in (params or {}).items():
+        transformation.params[section].update(settings)
+    for name, value in attributes.items():
+        setattr(transformation, name, value)
+
+    transformation.initiate_data_transformation(featured)
+    return transformation
@@ -0,0 +1,122 @@
+"""
+Compares dense and sparse (CSR) design matrices from DataTransformation.
+
+For each mode the preprocessor is fitted on the same featured customers
+and the benchmark reports transform time, peak RSS growth, matrix memory,
+artifact size, save and load time, LogisticRegression fit time and the
+test ROC-AUC. --cardinality adds a synthetic one-hot column with that
+many categories, the case sparse mode is for.
+
+    python benchmarks/sparse_matrices.py --rows 1000000 --cardinality 0 1000
+"""
+import argparse
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import OneHotEncoder
+
+from scratch import data_transformation, featured_customers
+from synthetic import generate_customers
+
+from mlProject import logger
+from mlProject.pipeline.profiler import peak_rss_mb, reset_peak_rss, rss_mb
+from mlProject.utils.common import load_matrix, matrix_path, save_matrix
+
+
+def _featured_customers(n_rows: int, cardinality: int) -> pd.DataFrame:
+    df = featured_customers(generate_customers(n_rows))
+    if cardinality:
+        codes = np.random.default_rng(0).integers(cardinality, size=len(df))
+        df["Region"] = pd.Categorical.from_codes(
+            codes, categories=[f"R{i:05d}" for i in range(cardinality)]
+        )
+    return df
+
+
+def _matrix_mb(matrix) -> float:
+    if sp.issparse(matrix):
+        return (matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes) / 1e6
+    return matrix.nbytes / 1e6
+
+
+def run(df: pd.DataFrame, sparse: bool, tmp: Path) -> dict:
+    transformation = data_transformation(tmp)
+    transformation.sparse = sparse
+
+    preprocessor = transformation._get_preprocessor()
+    if "Region" in df.columns:
+        preprocessor.transformers.append(
+            ("region", OneHotEncoder(handle_unknown="ignore", sparse_output=sparse), ["Region"])
+        )
+
+    X = df.drop(columns=["Churn"])
+    y = df["Churn"].map({"Yes": 1, "No": 0}).astype(int).to_numpy()
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=42, stratify=y
+    )
+
+    reset_peak_rss()
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    X_train_t = preprocessor.fit_transform(X_train)
+    X_test_t = preprocessor.transform(X_test)
+    transform_s = time.perf_counter() - start
+    peak_growth_mb = peak_rss_mb() - rss_before
+
+    path = matrix_path(transformation.config.transformed_train, sparse)
+    start = time.perf_counter()
+    save_matrix(X_train_t, path)
+    save_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    X_train_t = load_matrix(path)
+    load_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    model = LogisticRegression(max_iter=1000, class_weight="balanced", solver="lbfgs")
+    model.fit(X_train_t, y_train)
+    fit_s = time.perf_counter() - start
+
+    return {
+        "mode": "sparse" if sparse else "dense",
+        "columns": X_train_t.shape[1],
+        "density": (X_train_t.nnz if sparse else np.count_nonzero(X_train_t)) / np.prod(X_train_t.shape),
+        "transform_s": transform_s,
+        "peak_rss_growth_mb": peak_growth_mb,
+        "matrix_mb": _matrix_mb(X_train_t) + _matrix_mb(X_test_t),
+        "file_mb": path.stat().st_size / 1e6,
+        "save_s": save_s,
+        "load_s": load_s,
+        "fit_s": fit_s,
+        "roc_auc": roc_auc_score(y_test, model.predict_proba(X_test_t)[:, 1]),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--cardinality", type=int, nargs="+", default=[0, 1000])
+    args = parser.parse_args()
+
+    logger.setLevel(logging.WARNING)
+
+    for cardinality in args.cardinality:
+        df = _featured_customers(args.rows, cardinality)
+        with tempfile.TemporaryDirectory() as tmp:
+            results = [run(df, sparse, Path(tmp)) for sparse in (False, True)]
+
+        print(f"\n{args.rows:,} rows, extra one-hot cardinality {cardinality}")
+        header = list(results[0])
+        print(" | ".join(f"{h:>18}" for h in header))
+        for row in results:
+            print(" | ".join(
+                f"{v:>18.4f}" if isinstance(v, float) else f"{v:>18}" for v in row.values()
+            ))
@@ -0,0 +1,133 @@
+"""
+Compares in-memory and streaming (out-of-core) DataTransformation.
+
+A featured Parquet file is built chunk by chunk, so its size is not
+bounded by memory. Each mode then transforms it in a fresh process and
+reports wall time and peak RSS growth; the two preprocessors are checked
+to encode identically and to agree on the scaler statistics.
+
+    python benchmarks/streaming_transformation.py --rows 2000000
+"""
+import argparse
+import logging
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from scratch import transform_dataset
+from synthetic import generate_customers
+
+from mlProject import logger
+from mlProject.components.data_cleaning import DataCleaning
+from mlProject.components.feature_engineering import FeatureTransformer
+from mlProject.constants import PARAMS_FILE_PATH
+from mlProject.pipeline.profiler import peak_rss_mb, reset_peak_rss, rss_mb
+from mlProject.utils.common import read_yaml
+
+
+GENERATE_CHUNK_ROWS = 500_000
+
+
+def write_featured(path: Path, n_rows: int):
+    transformer, writer = None, None
+    for start in range(0, n_rows, GENERATE_CHUNK_ROWS):
+        chunk = DataCleaning.clean(generate_customers(
+            min(GENERATE_CHUNK_ROWS, n_rows - start), seed=42 + start, first_id=start
+        ))
+        if transformer is None:
+            transformer = FeatureTransformer.from_params(read_yaml(PARAMS_FILE_PATH)).fit(chunk)
+        chunk = transformer.transform(chunk)
+        # Plain strings, so every chunk has the same Parquet schema
+        for col in chunk.select_dtypes("category").columns:
+            chunk[col] = chunk[col].astype(str)
+
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(path, table.schema)
+        writer.write_table(table)
+    writer.close()
+
+
+def _measure(featured_path: Path, out_dir: Path, streaming: bool, chunk_size: int) -> dict:
+    """Runs in a spawned process so the peaks of the modes are separate"""
+    logger.setLevel(logging.WARNING)
+
+    reset_peak_rss()
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    transform_dataset(featured_path, out_dir, streaming, chunk_size)
+    return {
+        "mode": "streaming" if streaming else "in_memory",
+        "seconds": time.perf_counter() - start,
+        "peak_rss_growth_mb": peak_rss_mb() - rss_before,
+        "X_train_mb": (out_dir / "X_train.npy").stat().st_size / 1e6,
+    }
+
+
+def _compare_preprocessors(in_memory_path: Path, streaming_path: Path) -> dict:
+    in_memory, streaming = joblib.load(in_memory_path), joblib.load(streaming_path)
+    categories_equal = all(
+        np.array_equal(a, b) for a, b in zip(
+            in_memory.named_transformers_["nominal"].categories_,
+            streaming.named_transformers_["nominal"].categories_,
+        )
+    )
+    mean_a = in_memory.named_transformers_["num"].mean_
+    mean_b = streaming.named_transformers_["num"].mean_
+    return {
+        "categories_equal": categories_equal,
+        "feature_names_equal": list(in_memory.get_feature_names_out())
+        == list(streaming.get_feature_names_out()),
+        # the splits differ row for row, so the statistics agree only
+        # up to sampling noise
+        "max_scaler_mean_rel_diff": float(np.max(np.abs(mean_a - mean_b) / np.abs(mean_a))),
+    }
+
+
+def run(n_rows: int, chunk_size: int) -> tuple:
+    spawn = multiprocessing.get_context("spawn")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        featured_path = tmp / "featured.parquet"
+        write_featured(featured_path, n_rows)
+
+        results = []
+        for streaming in (False, True):
+            with spawn.Pool(1) as pool:
+                results.append(pool.apply(
+                    _measure, (featured_path, tmp / str(streaming), streaming, chunk_size)
+                ))
+
+        comparison = _compare_preprocessors(
+            tmp / "False" / "preprocessor.pkl", tmp / "True" / "preprocessor.pkl"
+        )
+        featured_mb = featured_path.stat().st_size / 1e6
+
+    return results, comparison, featured_mb
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--chunk-size", type=int, default=250_000)
+    args = parser.parse_args()
+
+    logger.setLevel(logging.WARNING)
+
+    results, comparison, featured_mb = run(args.rows, args.chunk_size)
+
+    print(f"\n{args.rows:,} rows, featured Parquet {featured_mb:.0f} MB, chunks of {args.chunk_size:,}")
+    header = list(results[0])
+    print(" | ".join(f"{h:>20}" for h in header))
+    for row in results:
+        print(" | ".join(
+            f"{v:>20.2f}" if isinstance(v, float) else f"{v:>20}" for v in row.values()
+        ))
+    print(comparison)
@@ -0,0 +1,294 @@
+"""
+Scaling benchmark of the training pipeline and the scoring paths.
+
+For each size, synthetic customers are generated (and kept in --data-dir
+for later runs), the full TrainingPipeline runs in a scratch directory
+with the stage cache disabled, and its pipeline_profile.json provides
+the per-stage wall time, CPU time, peak RSS and rows per second. The
+trained artifacts are then scored through the batch prediction CLI, the
+online PredictionPipeline and the fused scorer.
+
+Results are written to --results-dir as <commit>.json. With --compare,
+every timing is checked against an earlier result and the run fails if
+any regressed by more than --threshold.
+
+    python benchmarks/suite.py --rows 10000 1000000 10000000
+    python benchmarks/suite.py --rows 10000 1000000 --compare HEAD~1
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+from scratch import scratch_config, working_directory
+from synthetic import generate_customers, write_customers
+
+from mlProject import logger
+from mlProject.components.scorer_export import FusedScorer
+from mlProject.config.configuration import ConfigurationManager
+from mlProject.pipeline.batch_prediction import BatchPredictionPipeline
+from mlProject.pipeline.pipeline import TrainingPipeline
+from mlProject.pipeline.prediction import PredictionPipeline
+from mlProject.utils.common import load_dataframe
+
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+
+SINGLE_ROW_CALLS = 200
+ONLINE_BATCH_ROWS = 10_000
+FUSED_RECORD_CALLS = 10_000
+
+# Timings shorter than this are too noisy to flag as regressions
+MIN_COMPARED_SECONDS = 0.25
+
+
+def _git(*args) -> str:
+    return subprocess.run(
+        ["git", *args], cwd=BENCHMARKS_DIR, capture_output=True, text=True, check=True
+    ).stdout.strip()
+
+
+def _revision() -> dict:
+    return {
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "subject": _git("log", "-1", "--format=%s"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+    }
+
+
+def _machine() -> dict:
+    return {
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "cpu_count": len(os.sched_getaffinity(0)),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+    }
+
+
+def _dataset(data_dir: Path, n_rows: int, seed: int) -> tuple:
+    """
+    Generated files are named after the generator's source hash, so a
+    changed generator never reuses stale data.
+    """
+    generator = hashlib.blake2b(
+        (BENCHMARKS_DIR / "synthetic.py").read_bytes(), digest_size=4
+    ).hexdigest()
+    path = Path(data_dir).resolve() / f"customers-{n_rows}-{seed}-{generator}.csv"
+    if path.exists():
+        return path, None
+
+    start = time.perf_counter()
+    write_customers(path, n_rows, seed)
+    return path, time.perf_counter() - start
+
+
+def _latency_ms(fn, items: list) -> dict:
+    latencies = []
+    for item in items:
+        start = time.perf_counter()
+        fn(item)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return {
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+    }
+
+
+def _bench_pipeline(config_path: Path) -> dict:
+    start = time.perf_counter()
+    TrainingPipeline(config_path).run()
+    wall_s = time.perf_counter() - start
+
+    config = ConfigurationManager(config_path)
+    profile_path = config.get_pipeline_profile_config().profile_path
+    with open(profile_path) as f:
+        profile = json.load(f)
+
+    stages = {
+        stage["stage"]: {
+            "wall_s": stage["wall_s"],
+            "cpu_s": stage["cpu_s"],
+            "peak_rss_mb": stage["peak_rss_mb"],
+            "rows_per_s": stage["rows_per_s"],
+        }
+        for stage in profile["stages"]
+    }
+    with open(config.get_model_evaluation_config().metrics_path) as f:
+        roc_auc = json.load(f)["roc_auc"]
+
+    return {"wall_s": wall_s, "peak_rss_mb": profile["peak_rss_mb"], "roc_auc": roc_auc, "stages": stages}
+
+
+def _bench_scoring(config_path: Path, source_path: Path, n_rows: int) -> dict:
+    config = ConfigurationManager(config_path)
+    results = {}
+
+    # Batch prediction CLI over the whole generated file
+    batch_config = config.get_batch_prediction_config()
+    start = time.perf_counter()
+    BatchPredictionPipeline(batch_config).run(input_path=source_path)
+    seconds = time.perf_counter() - start
+    results["batch_prediction"] = {"wall_s": seconds, "rows_per_s": n_rows / seconds}
+
+    # Online PredictionPipeline, without the prediction cache
+    customers = generate_customers(max(SINGLE_ROW_CALLS, min(n_rows, ONLINE_BATCH_ROWS)), seed=7)
+    online = PredictionPipeline(config.get_model_serving_config())
+    records = customers.head(SINGLE_ROW_CALLS).to_dict(orient="records")
+    results["online_single_row"] = _latency_ms(lambda record: online.predict([record]), records)
+
+    start = time.perf_counter()
+    online.predict_proba(customers)
+    seconds = time.perf_counter() - start
+    results["online_batch"] = {"wall_s": seconds, "rows_per_s": len(customers) / seconds}
+
+    # Fused scorer over featured records
+    export_config = config.get_scorer_export_config()
+    scorer = FusedScorer.load(export_config.scorer_path)
+    featured = load_dataframe(Path(export_config.featured_data_path))
+    featured_records = featured.head(FUSED_RECORD_CALLS).to_dict(orient="records")
+    start = time.perf_counter()
+    for record in featured_records:
+        scorer.score_record(record)
+    results["fused_single_row"] = {
+        "mean_us": (time.perf_counter() - start) / len(featured_records) * 1e6,
+    }
+
+    start = time.perf_counter()
+    scorer.score_batch(featured)
+    seconds = time.perf_counter() - start
+    results["fused_batch"] = {"wall_s": seconds, "rows_per_s": len(featured) / seconds}
+
+    return results
+
+
+def run(n_rows: int, data_dir: Path, seed: int) -> dict:
+    source_path, generate_s = _dataset(data_dir, n_rows, seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        run_dir = Path(tmp)
+        config_path = scratch_config(run_dir, source_path, {
+            "stage_cache": {"enabled": False},
+            "pipeline_profile": {"enabled": True, "profile_stage": None},
+        })
+
+        with working_directory(run_dir):
+            pipeline = _bench_pipeline(config_path)
+            scoring = _bench_scoring(config_path, source_path, n_rows)
+
+    return {"generate_s": generate_s, "pipeline": pipeline, "scoring": scoring}
+
+
+# ================================
+# Comparison
+# ================================
+
+def _flatten(results: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else str(key)
+        if isinstance(value, dict):
+            flat.update(_flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def _load_baseline(results_dir: Path, ref: str) -> dict:
+    path = Path(ref)
+    if not path.is_file():
+        path = Path(results_dir) / f"{_git('rev-parse', '--short', ref)}.json"
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """
+    Compares every timing measured in both runs.
+
+    Returns:
+        list: (metric, baseline, current, change) of each regression
+    """
+    before = _flatten(baseline["sizes"])
+    after = _flatten(current["sizes"])
+
+    regressions = []
+    for metric in sorted(before.keys() & after.keys()):
+        old, new = before[metric], after[metric]
+        # rows_per_s is derived from wall_s, so only timings are compared
+        if not metric.endswith(("wall_s", "_ms", "_us")):
+            continue
+        if metric.endswith("wall_s") and max(old, new) < MIN_COMPARED_SECONDS:
+            continue
+        change = new / old - 1 if old else 0.0
+
+        marker = " <-- regression" if change > threshold else ""
+        print(f"{metric:<70} {old:>14.4g} {new:>14.4g} {change:>+8.1%}{marker}")
+        if change > threshold:
+            regressions.append((metric, old, new, change))
+
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", type=Path, default=BENCHMARKS_DIR / "data")
+    parser.add_argument("--results-dir", type=Path, default=BENCHMARKS_DIR / "results")
+    parser.add_argument(
+        "--compare", metavar="REF",
+        help="commit or results file to compare against",
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=0.10,
+        help="relative slowdown reported as a regression",
+    )
+    args = parser.parse_args()
+
+    logger.setLevel(logging.WARNING)
+
+    results = {
+        **_revision(),
+        "created_at": time.time(),
+        "machine": _machine(),
+        "sizes": {},
+    }
+    for n_rows in args.rows:
+        results["sizes"][str(n_rows)] = run(n_rows, args.data_dir, args.seed)
+
+        pipeline = results["sizes"][str(n_rows)]["pipeline"]
+        print(f"\n{n_rows:,} rows: pipeline {pipeline['wall_s']:.2f}s, "
+              f"peak RSS {pipeline['peak_rss_mb']:.0f} MB, ROC-AUC {pipeline['roc_auc']:.4f}")
+        for stage, row in pipeline["stages"].items():
+            rate = f"{row['rows_per_s']:>12,.0f} rows/s" if row["rows_per_s"] else ""
+            print(f"  {stage:<22} {row['wall_s']:>8.3f}s {row['peak_rss_mb']:>8.0f} MB {rate}")
+        for path, row in results["sizes"][str(n_rows)]["scoring"].items():
+            print(f"  {path:<22} " + ", ".join(f"{k} {v:,.3f}" for k, v in row.items()))
+
+    args.results_dir.mkdir(parents=True, exist_ok=True)
+    name = results["commit"] + ("-dirty" if results["dirty"] else "")
+    results_path = args.results_dir / f"{name}.json"
+    with open(results_path, "w") as f:
+        json.dump(results, f, indent=4)
+    print(f"\nResults saved to {results_path}")
+
+    if args.compare:
+        baseline = _load_baseline(args.results_dir, args.compare)
+        print(f"\nCompared with {baseline['commit']} ({baseline['subject']})")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regressions above {args.threshold:.0%}")
+            sys.exit(1)
@@ -0,0 +1,160 @@
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+# Approximate category frequencies of the public Telco Customer Churn file
+_FREQUENCIES = {
+    "gender": {"Male": 0.505, "Female": 0.495},
+    "Partner": {"No": 0.517, "Yes": 0.483},
+    "Dependents": {"No": 0.700, "Yes": 0.300},
+    "PhoneService": {"Yes": 0.903, "No": 0.097},
+    "InternetService": {"Fiber optic": 0.440, "DSL": 0.344, "No": 0.216},
+    "Contract": {"Month-to-month": 0.550, "Two year": 0.241, "One year": 0.209},
+    "PaperlessBilling": {"Yes": 0.592, "No": 0.408},
+    "PaymentMethod": {
+        "Electronic check": 0.336,
+        "Mailed check": 0.229,
+        "Bank transfer (automatic)": 0.219,
+        "Credit card (automatic)": 0.216,
+    },
+}
+
+# Share of internet customers subscribed to each add-on
+_ADD_ON_RATES = {
+    "OnlineSecurity": 0.366,
+    "OnlineBackup": 0.440,
+    "DeviceProtection": 0.439,
+    "TechSupport": 0.370,
+    "StreamingTV": 0.491,
+    "StreamingMovies": 0.495,
+}
+
+_ADD_ON_PRICES = {
+    "OnlineSecurity": 5.0,
+    "OnlineBackup": 5.0,
+    "DeviceProtection": 5.0,
+    "TechSupport": 5.0,
+    "StreamingTV": 10.0,
+    "StreamingMovies": 10.0,
+}
+
+# Share of rows with tenure 0 and a blank TotalCharges (11 of 7043)
+_BLANK_TOTAL_CHARGES_RATE = 11 / 7043
+
+
+def _choice(rng, n_rows: int, frequencies: dict) -> np.ndarray:
+    return rng.choice(list(frequencies), size=n_rows, p=list(frequencies.values()))
+
+
+def generate_customers(n_rows: int, seed: int = 42, first_id: int = 0) -> pd.DataFrame:
+    """
+    Generates schema-conformant raw Telco customers.
+
+    Categorical frequencies, service dependencies ("No internet service",
+    "No phone service"), blank TotalCharges for new customers and the
+    churn rate follow the public dataset closely enough for scaling work.
+
+    Args:
+        n_rows (int): number of customers
+        seed (int, optional): random seed. Defaults to 42.
+        first_id (int, optional): number of the first customerID, so
+            chunks of one file get distinct IDs. Defaults to 0.
+
+    Returns:
+        pd.DataFrame: customers in the raw `schema.yaml` layout
+    """
+    rng = np.random.default_rng(seed)
+
+    df = pd.DataFrame({
+        "customerID": [f"{i:07d}-SYNTH" for i in range(first_id, first_id + n_rows)],
+        "gender": _choice(rng, n_rows, _FREQUENCIES["gender"]),
+        "SeniorCitizen": (rng.random(n_rows) < 0.162).astype(np.int64),
+        "Partner": _choice(rng, n_rows, _FREQUENCIES["Partner"]),
+        "Dependents": _choice(rng, n_rows, _FREQUENCIES["Dependents"]),
+    })
+
+    contract = _choice(rng, n_rows, _FREQUENCIES["Contract"])
+    max_tenure = np.select(
+        [contract == "Month-to-month", contract == "One year"], [40, 60], 72
+    )
+    tenure = np.minimum(rng.exponential(0.6, n_rows) * max_tenure, 71).astype(np.int64) + 1
+    tenure[rng.random(n_rows) < _BLANK_TOTAL_CHARGES_RATE] = 0
+    df["tenure"] = tenure
+
+    phone = _choice(rng, n_rows, _FREQUENCIES["PhoneService"])
+    df["PhoneService"] = phone
+    df["MultipleLines"] = np.where(
+        phone == "No", "No phone service",
+        np.where(rng.random(n_rows) < 0.467, "Yes", "No")
+    )
+
+    internet = _choice(rng, n_rows, _FREQUENCIES["InternetService"])
+    df["InternetService"] = internet
+
+    monthly = np.where(phone == "Yes", 20.0, 0.0)
+    monthly += np.where(df["MultipleLines"] == "Yes", 5.0, 0.0)
+    monthly += np.select([internet == "Fiber optic", internet == "DSL"], [50.0, 25.0], 0.0)
+
+    for col, rate in _ADD_ON_RATES.items():
+        subscribed = rng.random(n_rows) < rate
+        df[col] = np.where(
+            internet == "No", "No internet service",
+            np.where(subscribed, "Yes", "No")
+        )
+        monthly += np.where((internet != "No") & subscribed, _ADD_ON_PRICES[col], 0.0)
+
+    df["Contract"] = contract
+    df["PaperlessBilling"] = _choice(rng, n_rows, _FREQUENCIES["PaperlessBilling"])
+    df["PaymentMethod"] = _choice(rng, n_rows, _FREQUENCIES["PaymentMethod"])
+
+    monthly = np.maximum(monthly + rng.normal(0, 2.5, n_rows), 18.25)
+    df["MonthlyCharges"] = np.round(monthly, 2)
+
+    total = np.round(monthly * tenure * rng.uniform(0.95, 1.05, n_rows), 2)
+    df["TotalCharges"] = np.where(tenure == 0, " ", total.astype(str))
+
+    logit = (
+        -1.6
+        + 1.4 * (contract == "Month-to-month")
+        + 0.6 * (internet == "Fiber optic")
+        + 0.4 * (df["PaymentMethod"] == "Electronic check")
+        + 0.3 * df["SeniorCitizen"]
+        - 0.035 * tenure
+        + 0.5 * ((df["OnlineSecurity"] == "No") & (df["TechSupport"] == "No"))
+    )
+    churn = rng.random(n_rows) < 1 / (1 + np.exp(-logit))
+    df["Churn"] = np.where(churn, "Yes", "No")
+
+    return df
+
+
+def write_customers(path: Path, n_rows: int, seed: int = 42, chunk_rows: int = 1_000_000) -> Path:
+    """
+    Writes `n_rows` synthetic customers to a CSV in chunks, so files far
+    larger than memory can be generated. Each chunk has its own seed and
+    ID range; a file of up to `chunk_rows` rows equals
+    `generate_customers(n_rows, seed)`.
+
+    Args:
+        path (Path): CSV to write
+        n_rows (int): number of customers
+        seed (int, optional): random seed of the first chunk. Defaults to 42.
+        chunk_rows (int, optional): rows generated at a time
+
+    Returns:
+        Path: path to the CSV
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+
+    with open(tmp, "w", newline="") as f:
+        for i, start in enumerate(range(0, n_rows, chunk_rows)):
+            chunk = generate_customers(min(chunk_rows, n_rows - start), seed + i, first_id=start)
+            chunk.to_csv(f, index=False, header=i == 0)
+
+    os.replace(tmp, path)
+    return path
@@ -0,0 +1,117 @@
+"""
+Compares a plain `pd.read_csv` with the schema-driven `read_dataset` loader.
+
+For each loader it reports parse time, the DataFrame's deep memory, the
+peak RSS growth of a fresh process that parses the file, and the time
+to clean the result. The plain path cleans the way DataCleaning did
+before the loader existed, with a full-frame replace of blank strings.
+
+    python benchmarks/typed_loader.py --rows 1000000
+"""
+import argparse
+import logging
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from synthetic import generate_customers
+
+from mlProject import logger
+from mlProject.components.data_cleaning import DataCleaning
+from mlProject.constants import SCHEMA_RAW_FILE_PATH
+from mlProject.utils.common import read_dataset, read_yaml
+
+
+def _load_plain(path: Path) -> pd.DataFrame:
+    return pd.read_csv(path)
+
+
+def _load_typed(path: Path) -> pd.DataFrame:
+    return read_dataset(path, read_yaml(SCHEMA_RAW_FILE_PATH))
+
+
+def _clean_plain(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.replace(" ", np.nan)
+    df = df.dropna(subset=["TotalCharges"])
+    df["TotalCharges"] = df["TotalCharges"].astype(float)
+    return df.drop(columns=["customerID"])
+
+
+LOADERS = {
+    "read_csv": (_load_plain, _clean_plain),
+    "read_dataset": (_load_typed, DataCleaning.clean),
+}
+
+
+def _high_water_mark_mb() -> float:
+    # VmHWM, unlike ru_maxrss, is reset by exec and so is not inherited
+    # from the benchmark process that already holds both frames (Linux only)
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    raise RuntimeError("VmHWM not found in /proc/self/status")
+
+
+def _peak_rss_mb(loader: str, path: Path) -> float:
+    """Runs in a spawned process so the peak is not shared between loaders"""
+    logger.setLevel(logging.WARNING)
+    before = _high_water_mark_mb()
+    LOADERS[loader][0](path)
+    return _high_water_mark_mb() - before
+
+
+def run(n_rows: int) -> list:
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        raw_path = Path(tmp) / "raw.csv"
+        generate_customers(n_rows).to_csv(raw_path, index=False)
+
+        spawn = multiprocessing.get_context("spawn")
+
+        for name, (load, clean) in LOADERS.items():
+            start = time.perf_counter()
+            df = load(raw_path)
+            load_s = time.perf_counter() - start
+            memory_mb = df.memory_usage(deep=True).sum() / 1e6
+
+            start = time.perf_counter()
+            clean(df)
+            clean_s = time.perf_counter() - start
+
+            with spawn.Pool(1) as pool:
+                peak_rss_mb = pool.apply(_peak_rss_mb, (name, raw_path))
+
+            results.append({
+                "loader": name,
+                "load_s": load_s,
+                "rows_per_s": n_rows / load_s,
+                "memory_mb": memory_mb,
+                "peak_rss_growth_mb": peak_rss_mb,
+                "clean_s": clean_s,
+            })
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    logger.setLevel(logging.WARNING)
+
+    results = run(args.rows)
+
+    print(f"\n{args.rows:,} rows")
+    header = list(results[0])
+    print(" | ".join(f"{h:>20}" for h in header))
+    for row in results:
+        print(" | ".join(
+            f"{v:>20.2f}" if isinstance(v, float) else f"{v:>20}" for v in row.values()
+        ))
@@ -0,0 +1,117 @@
+"""
+Iterations and training time warm start saves on successive retrains.
+
+Each month is a fresh sample of synthetic customers from the same
+distribution, transformed and trained on the artifacts of the previous
+month with warm start enabled. The first month starts cold as there is
+no previous model. One more month then introduces a new PaymentMethod
+category, which changes the feature layout and must fall back to a cold
+start.
+
+Reported per month are whether the preprocessor was reused, whether the
+model was warm-started, the iterations and training seconds of that fit
+and of the comparison cold fit, and both test ROC-AUCs.
+
+    python benchmarks/warm_start.py --rows 500000 --months 3
+"""
+import argparse
+import logging
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from scratch import featured_customers, transform_dataset
+from synthetic import generate_customers
+
+from mlProject import logger
+from mlProject.components.model_trainer import ModelTrainer
+from mlProject.entity.config_entity import ModelTrainerConfig
+from mlProject.utils.common import load_json
+
+
+NEW_CATEGORY_SHARE = 0.05
+
+
+def _featured(n_rows: int, seed: int, new_category: bool):
+    customers = generate_customers(n_rows, seed=seed)
+    if new_category:
+        rows = np.random.default_rng(seed).random(n_rows) < NEW_CATEGORY_SHARE
+        customers.loc[rows, "PaymentMethod"] = "Digital wallet"
+    return featured_customers(customers)
+
+
+def _retrain(featured, data_dir: Path) -> dict:
+    warm_start = {"enabled": True, "compare_cold_start": True}
+    transformation = transform_dataset(featured, data_dir, params={"warm_start": warm_start})
+
+    trainer = ModelTrainer(ModelTrainerConfig(
+        root_dir=data_dir,
+        model_path=data_dir / "model.pkl",
+        leaderboard_path=data_dir / "leaderboard.json",
+        report_path=data_dir / "model_report.json",
+        cv_report_path=data_dir / "cv_report.json",
+        featured_data_path=data_dir / "featured.parquet",
+        preprocessor_path=data_dir / "preprocessor.pkl",
+        train_data_path=data_dir / "X_train.npy",
+        test_data_path=data_dir / "X_test.npy",
+        y_train=data_dir / "y_train.npy",
+        y_test=data_dir / "y_test.npy",
+        n_workers=0,
+        cpu_threads=0,
+    ))
+    trainer.params["warm_start"].update(warm_start)
+    trainer.initiate_model_training()
+
+    report = load_json(data_dir / "model_report.json")
+    warm_start = report["warm_start"]
+    roc_auc = report["models"]["logistic_regression"]["roc_auc"]
+    return {
+        "preprocessor_reused": transformation.preprocessor_reused,
+        "warm": warm_start["warm"],
+        "n_iter": warm_start["n_iter"],
+        "cold_n_iter": warm_start.get("cold_n_iter", warm_start["n_iter"]),
+        "train_s": warm_start["train_s"],
+        "cold_train_s": warm_start.get("cold_train_s", warm_start["train_s"]),
+        "roc_auc": roc_auc,
+        "cold_roc_auc": warm_start.get("cold_roc_auc", roc_auc),
+    }
+
+
+def run(n_rows: int, months: int) -> list:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for month in range(months + 1):
+            new_category = month == months
+            featured = _featured(n_rows, seed=42 + month, new_category=new_category)
+            results.append({
+                "month": f"{month}{' (new category)' if new_category else ''}",
+                **_retrain(featured, Path(tmp)),
+            })
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--months", type=int, default=3)
+    args = parser.parse_args()
+
+    logger.setLevel(logging.WARNING)
+
+    results = run(args.rows, args.months)
+
+    print(f"\n{args.rows:,} rows a month")
+    header = list(results[0])
+    print(" | ".join(f"{h:>19}" for h in header))
+    for row in results:
+        print(" | ".join(
+            f"{v:>19.4f}" if isinstance(v, float) else f"{str(v):>19}" for v in row.values()
+        ))
+
+    # Regular months must warm-start, the new category must not
+    expected = [False] + [True] * (args.months - 1) + [False]
+    if [row["warm"] for row in results] != expected:
+        print("Unexpected warm starts")
+        sys.exit(1)
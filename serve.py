@@ -0,0 +1,17 @@
+from mlProject.pipeline.prefork import PreforkServer
+from mlProject import logger
+
+STAGE_NAME = "Prefork Serving"
+
+if __name__ == '__main__':
+    try:
+        logger.info(f">>>>>> Stage {STAGE_NAME} started <<<<<<")
+        # Importing the app loads the preprocessor and model once, in the
+        # parent, before any worker is forked
+        from app import app, serving_config
+        if PreforkServer(app, serving_config).serve_forever():
+            raise RuntimeError("Every serving worker failed to start")
+        logger.info(f">>>>>> Stage {STAGE_NAME} completed <<<<<<\n\nx==========x")
+    except Exception as e:
+        logger.exception(e)
+        raise e
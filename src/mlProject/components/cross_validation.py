@@ -0,0 +1,278 @@
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from box import ConfigBox
+from sklearn.base import clone
+from sklearn.metrics import (
+    roc_auc_score,
+    accuracy_score,
+    precision_score,
+    recall_score,
+    f1_score
+)
+from sklearn.model_selection import RepeatedStratifiedKFold, train_test_split
+from threadpoolctl import threadpool_limits
+
+from mlProject import logger
+from mlProject.utils.common import load_dataframe
+
+
+# Rows converted from pandas, or decoded from Parquet, per IPC batch
+WRITE_CHUNK_ROWS = 500_000
+
+METRICS = {
+    "roc_auc": lambda y, pred, proba: roc_auc_score(y, proba),
+    "accuracy": lambda y, pred, proba: accuracy_score(y, pred),
+    "precision": lambda y, pred, proba: precision_score(y, pred),
+    "recall": lambda y, pred, proba: recall_score(y, pred),
+    "f1_score": lambda y, pred, proba: f1_score(y, pred),
+}
+
+
+def _labels(target: pd.Series) -> np.ndarray:
+    return target.map({"Yes": 1, "No": 0}).astype(np.int8).to_numpy()
+
+
+# Featured data memory-mapped once per worker process by `_init_worker`
+_worker_state = {}
+
+
+def _init_worker(data_path: Path, target_column: str, n_splits: int, n_repeats: int,
+                 random_state: int, threads: int):
+    _worker_state["threadpool_limits"] = threadpool_limits(limits=threads)
+
+    # Record batches reference the mapped file, nothing is read up front
+    table = pa.ipc.open_stream(pa.memory_map(str(data_path))).read_all()
+    y = _labels(table.column(target_column).to_pandas())
+
+    # Fold of every row per repeat, n_repeats bytes a row instead of the
+    # index arrays of every split
+    folds = np.empty((n_repeats, len(y)), dtype=np.int8)
+    splitter = RepeatedStratifiedKFold(
+        n_splits=n_splits, n_repeats=n_repeats, random_state=random_state
+    )
+    for index, (_, test_rows) in enumerate(splitter.split(np.zeros(len(y)), y)):
+        folds[index // n_splits, test_rows] = index % n_splits
+
+    _worker_state["table"] = table
+    _worker_state["target_column"] = target_column
+    _worker_state["folds"] = folds
+
+
+def _take(rows: np.ndarray) -> tuple:
+    target_column = _worker_state["target_column"]
+    df = _worker_state["table"].take(rows).to_pandas()
+    return df.drop(columns=[target_column]), _labels(df[target_column])
+
+
+def _run_fold(repeat: int, fold: int, preprocessor, model, compact: bool) -> dict:
+    """
+    Refits the preprocessor and the model on the other folds and scores
+    fold `fold` of repeat `repeat`.
+
+    Returns:
+        dict: the fold's sizes, stage timings and metrics
+    """
+    in_fold = _worker_state["folds"][repeat] == fold
+
+    start = time.perf_counter()
+    X_train, y_train = _take(np.flatnonzero(~in_fold))
+    X_test, y_test = _take(np.flatnonzero(in_fold))
+    load_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    preprocessor = clone(preprocessor)
+    X_train = preprocessor.fit_transform(X_train)
+    X_test = preprocessor.transform(X_test)
+    if compact:
+        X_train, X_test = X_train.astype(np.float32), X_test.astype(np.float32)
+    transform_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    model = clone(model).fit(X_train, y_train)
+    fit_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    y_pred = model.predict(X_test)
+    y_pred_proba = model.predict_proba(X_test)[:, 1]
+    metrics = {name: float(fn(y_test, y_pred, y_pred_proba)) for name, fn in METRICS.items()}
+    score_s = time.perf_counter() - start
+
+    return {
+        "repeat": repeat,
+        "fold": fold,
+        "train_rows": len(y_train),
+        "test_rows": len(y_test),
+        "load_s": load_s,
+        "transform_s": transform_s,
+        "fit_s": fit_s,
+        "score_s": score_s,
+        **metrics,
+    }
+
+
+class CrossValidation:
+    """
+    Repeated stratified k-fold cross-validation of the preprocessor and
+    model, refitting both inside every fold so no statistic of a test
+    fold leaks into its training.
+
+    The featured data (a stratified sample of `max_rows` rows when it is
+    larger) is written once to an Arrow IPC stream in `scratch_dir`.
+    Folds run on a process pool whose workers memory-map that file and
+    copy out only the rows of the fold at hand, so the data is in memory
+    once however many workers there are.
+    """
+
+    def __init__(self, cv_params: ConfigBox, target_column: str, random_state: int,
+                 cpu_threads: int, scratch_dir: Path):
+        self.cv_params = cv_params
+        self.target_column = target_column
+        self.random_state = random_state
+        self.cpu_threads = cpu_threads or os.cpu_count()
+        self.scratch_dir = Path(scratch_dir)
+
+    def _sample_mask(self, y: np.ndarray):
+        """Rows kept for cross-validation, None to keep them all"""
+        max_rows = self.cv_params.get("max_rows")
+        if not max_rows or len(y) <= max_rows:
+            return None
+        kept, _ = train_test_split(
+            np.arange(len(y)), train_size=max_rows, stratify=y, random_state=self.random_state
+        )
+        mask = np.zeros(len(y), dtype=bool)
+        mask[kept] = True
+        return mask
+
+    def _batches(self, featured_data):
+        if isinstance(featured_data, pd.DataFrame):
+            for start in range(0, len(featured_data), WRITE_CHUNK_ROWS):
+                yield pa.RecordBatch.from_pandas(
+                    featured_data.iloc[start:start + WRITE_CHUNK_ROWS], preserve_index=False
+                )
+        else:
+            yield from pq.ParquetFile(featured_data).iter_batches(batch_size=WRITE_CHUNK_ROWS)
+
+    def _labels_of(self, featured_data) -> np.ndarray:
+        if isinstance(featured_data, pd.DataFrame):
+            return _labels(featured_data[self.target_column])
+        column = pq.read_table(featured_data, columns=[self.target_column])
+        return _labels(column.column(self.target_column).to_pandas())
+
+    def _write_shared(self, featured_data) -> tuple:
+        """
+        Writes the rows to cross-validate as an Arrow IPC stream, which,
+        unlike the IPC file format, takes a new dictionary per batch.
+
+        Returns:
+            tuple: path of the stream, rows written, rows available
+        """
+        # Parquet is streamed batch by batch, other formats are loaded
+        if not isinstance(featured_data, pd.DataFrame) and \
+                Path(featured_data).suffix.lower() != ".parquet":
+            featured_data = load_dataframe(Path(featured_data))
+
+        mask = self._sample_mask(self._labels_of(featured_data))
+
+        self.scratch_dir.mkdir(parents=True, exist_ok=True)
+        path = self.scratch_dir / "featured.arrows"
+        writer, offset, n_rows = None, 0, 0
+        try:
+            for batch in self._batches(featured_data):
+                if mask is not None:
+                    kept = mask[offset:offset + batch.num_rows]
+                    offset += batch.num_rows
+                    batch = batch.filter(pa.array(kept))
+                if writer is None:
+                    writer = pa.ipc.new_stream(str(path), batch.schema)
+                writer.write_batch(batch)
+                n_rows += batch.num_rows
+        finally:
+            if writer is not None:
+                writer.close()
+
+        return path, n_rows, len(mask) if mask is not None else n_rows
+
+    @staticmethod
+    def _summary(folds: list) -> dict:
+        """Mean, standard deviation and range of every metric and timing"""
+        summary = {}
+        for key in [*METRICS, "load_s", "transform_s", "fit_s", "score_s"]:
+            values = np.array([fold[key] for fold in folds])
+            summary[key] = {
+                "mean": float(values.mean()),
+                "std": float(values.std(ddof=1)) if len(values) > 1 else 0.0,
+                "min": float(values.min()),
+                "max": float(values.max()),
+            }
+        return summary
+
+    def run(self, featured_data, preprocessor, model, compact: bool = False) -> dict:
+        """
+        Cross-validates an unfitted preprocessor and model.
+
+        Args:
+            featured_data (Path | pd.DataFrame): featured dataset or its path
+            preprocessor: unfitted preprocessor, cloned for every fold
+            model: unfitted classifier, cloned for every fold
+            compact (bool, optional): cast the features to float32 as the
+                compact storage does. Defaults to False.
+
+        Returns:
+            dict: settings, per-fold results and their summary
+        """
+        start = time.perf_counter()
+        n_splits = self.cv_params["n_splits"]
+        n_repeats = self.cv_params["n_repeats"]
+        tasks = [(repeat, fold) for repeat in range(n_repeats) for fold in range(n_splits)]
+
+        n_workers = min(self.cpu_threads, len(tasks))
+        threads = max(1, self.cpu_threads // n_workers)
+
+        try:
+            data_path, n_rows, n_available = self._write_shared(featured_data)
+            logger.info(
+                f"Cross-validating {n_repeats}x{n_splits} folds over {n_rows} of "
+                f"{n_available} rows on {n_workers} workers"
+            )
+
+            folds = []
+            with ProcessPoolExecutor(
+                max_workers=n_workers,
+                initializer=_init_worker,
+                initargs=(data_path, self.target_column, n_splits, n_repeats,
+                          self.random_state, threads),
+            ) as executor:
+                futures = [
+                    executor.submit(_run_fold, repeat, fold, preprocessor, model, compact)
+                    for repeat, fold in tasks
+                ]
+                for future in as_completed(futures):
+                    result = future.result()
+                    folds.append(result)
+                    logger.info(
+                        f"Fold {result['repeat']}.{result['fold']}: ROC-AUC "
+                        f"{result['roc_auc']:.4f}, fit {result['fit_s']:.2f}s"
+                    )
+        finally:
+            shutil.rmtree(self.scratch_dir, ignore_errors=True)
+
+        folds.sort(key=lambda fold: (fold["repeat"], fold["fold"]))
+        return {
+            "n_splits": n_splits,
+            "n_repeats": n_repeats,
+            "rows": n_rows,
+            "rows_available": n_available,
+            "n_workers": n_workers,
+            "threads_per_worker": threads,
+            "wall_s": time.perf_counter() - start,
+            "summary": self._summary(folds),
+            "folds": folds,
+        }
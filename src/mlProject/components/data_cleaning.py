@@ -1,47 +1,92 @@
 from pathlib import Path
 import pandas as pd
-import numpy as np
+from pandas.api.types import is_numeric_dtype
 
 from mlProject import logger
 from mlProject.entity.config_entity import DataCleaningConfig
+from mlProject.utils.artifact_writer import ArtifactWriter
+from mlProject.constants import SCHEMA_RAW_FILE_PATH
+from mlProject.utils.common import save_dataframe, read_dataset, read_yaml
+
+
+# A blank TotalCharges belongs to a customer in their first month, who has
+# not been billed yet. Training drops these rows, but every customer sent
+# for scoring, in batch or online, is scored with TotalCharges of 0.
+BLANK_TOTAL_CHARGES = 0.0
 
 
 class DataCleaning:
-    def __init__(self, config: DataCleaningConfig):
+    def __init__(self, config: DataCleaningConfig, writer: ArtifactWriter = None):
         self.config = config
+        self.writer = writer
 
-    def initiate_data_cleaning(self, raw_data_path: Path) -> Path:
+    @staticmethod
+    def clean(
+        df: pd.DataFrame, drop_identifier: bool = True, fill_blank_total_charges: bool = False
+    ) -> pd.DataFrame:
         """
-        Cleans raw data and saves cleaned dataset.
+        Cleans a raw customer dataframe.
 
         Args:
-            raw_data_path (Path): path to validated raw data
+            df (pd.DataFrame): raw customer records
+            drop_identifier (bool, optional): drop customerID. Defaults to True.
+            fill_blank_total_charges (bool, optional): set blank TotalCharges
+                to `BLANK_TOTAL_CHARGES` instead of dropping the row, as
+                scoring does. Defaults to False.
 
         Returns:
-            Path: path to cleaned dataset
+            pd.DataFrame: cleaned dataframe
         """
-        logger.info("Starting data cleaning process")
+        # Frames from `read_dataset` arrive with TotalCharges already parsed
+        # and blanks as NaN; anything else is converted here, column only.
+        if not is_numeric_dtype(df["TotalCharges"]):
+            logger.info("Converting TotalCharges to float")
+            df["TotalCharges"] = pd.to_numeric(
+                df["TotalCharges"].replace(" ", None), errors="raise"
+            )
 
-        df = pd.read_csv(raw_data_path)
+        if fill_blank_total_charges:
+            df["TotalCharges"] = df["TotalCharges"].fillna(BLANK_TOTAL_CHARGES)
+        else:
+            logger.info("Dropping rows with missing TotalCharges")
+            df = df.dropna(subset=["TotalCharges"])
 
-        logger.info("Replacing blank strings with NaN")
-        df.replace(" ", np.nan, inplace=True)
+        if drop_identifier:
+            logger.info("Dropping identifier column: customerID")
+            df = df.drop(columns=["customerID"])
+
+        return df
+
+    def initiate_data_cleaning(self, raw_data_path: Path, keep_identifier: bool = False):
+        """
+        Cleans raw data and saves cleaned dataset.
 
-        logger.info("Dropping rows with missing TotalCharges")
-        df = df.dropna(subset=["TotalCharges"])
+        Args:
+            raw_data_path (Path): path to validated raw data
+            keep_identifier (bool, optional): keep customerID, needed to
+                merge incremental deltas. Defaults to False.
 
-        logger.info("Converting TotalCharges to float")
-        df["TotalCharges"] = df["TotalCharges"].astype(float)
+        Returns:
+            Path: path to cleaned dataset, or with a writer the cleaned
+                dataframe itself while the artifact is written
+        """
+        logger.info("Starting data cleaning process")
 
-        logger.info("Dropping identifier column: customerID")
-        df.drop(columns=["customerID"], inplace=True)
+        df = read_dataset(Path(raw_data_path), read_yaml(SCHEMA_RAW_FILE_PATH))
+        df = self.clean(df, drop_identifier=not keep_identifier)
 
         output_path = Path(self.config.cleaned_data_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        df.to_csv(output_path, index=False)
+        logger.info(f"Cleaned dataset shape: {df.shape}")
+
+        if self.writer is not None:
+            self.writer.submit(save_dataframe, df, output_path)
+            logger.info(f"Data cleaning completed. Cleaned data queued for: {output_path}")
+            return df
+
+        save_dataframe(df, output_path)
 
         logger.info(f"Data cleaning completed. Cleaned data saved at: {output_path}")
-        logger.info(f"Cleaned dataset shape: {df.shape}")
 
         return output_path
@@ -1,8 +1,15 @@
+import os
 import shutil
+import uuid
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
+
 from mlProject import logger
 from mlProject.entity.config_entity import DataIngestionConfig
+from mlProject.utils.common import read_yaml, save_json, load_json, hash_file
+from mlProject.constants import SCHEMA_RAW_FILE_PATH
 
 
 class DataIngestion:
@@ -29,3 +36,210 @@ class DataIngestion:
         logger.info(f"Data ingestion completed. File saved at: {destination_path}")
 
         return destination_path
+
+    # ================================
+    # Incremental Ingestion
+    # ================================
+
+    @property
+    def _manifest_path(self) -> Path:
+        return Path(self.config.state_dir) / "manifest.json"
+
+    @property
+    def _pending_manifest_path(self) -> Path:
+        return Path(self.config.state_dir) / "manifest.pending.json"
+
+    def _changed_extracts(self, extracts: dict) -> list:
+        """
+        Extracts that are new or whose content changed since the last run.
+        Size and mtime are checked first so unchanged files are not re-read.
+        """
+        changed = []
+        for path in sorted(Path(self.config.source_data_dir).glob("*.csv")):
+            stat = path.stat()
+            entry = extracts.get(path.name)
+
+            if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+                continue
+
+            fingerprint = hash_file(path)
+            extracts[path.name] = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "fingerprint": fingerprint,
+            }
+            if entry is None or entry["fingerprint"] != fingerprint:
+                changed.append(path)
+
+        return changed
+
+    @staticmethod
+    def _read_extract(path: Path, identifier: str, ids=None) -> pd.DataFrame:
+        # Read as text so the row hash does not depend on type inference
+        df = pd.read_csv(path, dtype=str, keep_default_na=False)
+        if ids is not None:
+            df = df[df[identifier].isin(ids)]
+        return df.drop_duplicates(subset=[identifier], keep="last")
+
+    @staticmethod
+    def _winners(row_index: pd.DataFrame, identifier: str) -> pd.DataFrame:
+        """Each customer's row from the latest extract (by file name) holding it"""
+        return (
+            row_index.sort_values("extract", kind="stable")
+            .drop_duplicates(subset=[identifier], keep="last")
+        )
+
+    def _load_state(self, identifier: str) -> tuple:
+        """
+        Committed manifest, row index and row index file name. State
+        staged by a run that did not complete is discarded, so its delta
+        is ingested again.
+        """
+        state_dir = Path(self.config.state_dir)
+
+        if self._pending_manifest_path.exists():
+            logger.warning("Discarding ingestion state of a run that did not complete")
+            self._pending_manifest_path.unlink()
+
+        manifest = dict(load_json(self._manifest_path)) if self._manifest_path.exists() else {}
+        row_index_name = manifest.get("row_index")
+        for path in state_dir.glob("row_index*.parquet"):
+            if path.name != row_index_name:
+                path.unlink()
+
+        if "extracts" not in manifest:
+            if manifest:
+                logger.info("Ingestion state predates extract order, ingesting every extract again")
+            return {}, pd.DataFrame({
+                identifier: pd.Series(dtype=str),
+                "extract": pd.Series(dtype=str),
+                "row_hash": pd.Series(dtype=np.uint64),
+            }), None
+
+        return (
+            dict(manifest["extracts"]),
+            pd.read_parquet(state_dir / row_index_name),
+            row_index_name,
+        )
+
+    def initiate_incremental_ingestion(self):
+        """
+        Ingests a directory of customer extracts and keeps only the rows
+        that are new or changed since the previous run.
+
+        Each extract is fingerprinted, and only new or modified extracts
+        are read. The row index holds the customerID and row hash of
+        every row of every extract; a customer's row comes from the latest
+        extract (by file name) holding it, so a re-delivered older extract
+        does not override newer ones. Customers whose winning row changed
+        form the delta, read from whichever extract now holds it.
+
+        The new manifest and row index are only staged. The pipeline
+        commits them with `commit_incremental_ingestion` once the delta
+        has been processed, and a run that fails before that ingests the
+        same delta again.
+
+        Returns:
+            Path | None: path to the delta file, or None if nothing changed
+        """
+        logger.info("Starting incremental data ingestion")
+
+        source_dir = Path(self.config.source_data_dir)
+        if not source_dir.is_dir():
+            raise FileNotFoundError(f"Source extract directory not found at: {source_dir}")
+
+        state_dir = Path(self.config.state_dir)
+        state_dir.mkdir(parents=True, exist_ok=True)
+
+        identifier = read_yaml(SCHEMA_RAW_FILE_PATH)["identifier_column"]
+        extracts, row_index, row_index_name = self._load_state(identifier)
+        changed = self._changed_extracts(extracts)
+
+        if not changed:
+            # Refreshed sizes and mtimes only, the row index is unchanged
+            self._stage(extracts, row_index if row_index_name is None else None, row_index_name)
+            logger.info("No new or changed extracts, nothing to ingest")
+            return None
+
+        logger.info(f"Reading {len(changed)} new or changed extracts: {[p.name for p in changed]}")
+
+        rows = {path.name: self._read_extract(path, identifier) for path in changed}
+        incoming = pd.concat(
+            [
+                pd.DataFrame({
+                    identifier: df[identifier].to_numpy(),
+                    "extract": name,
+                    "row_hash": pd.util.hash_pandas_object(df, index=False).to_numpy(),
+                })
+                for name, df in rows.items()
+            ],
+            ignore_index=True,
+        )
+        new_index = pd.concat(
+            [row_index[~row_index["extract"].isin(rows)], incoming], ignore_index=True
+        )
+
+        # Customers whose winning row is not the one ingested before
+        known = self._winners(new_index, identifier).merge(
+            self._winners(row_index, identifier)[[identifier, "row_hash"]],
+            on=[identifier, "row_hash"], how="left", indicator=True,
+        )
+        delta_rows = known[known["_merge"] == "left_only"]
+
+        # A winner can sit in an unchanged extract, e.g. when a newer
+        # extract no longer holds the customer; only those rows are read
+        parts = []
+        for name, winners in delta_rows.groupby("extract", sort=True):
+            df = rows[name] if name in rows else self._read_extract(
+                source_dir / name, identifier, ids=winners[identifier]
+            )
+            parts.append(df[df[identifier].isin(winners[identifier])])
+        delta = pd.concat(parts, ignore_index=True) if parts else next(iter(rows.values())).iloc[:0]
+
+        delta_path = Path(self.config.delta_data_file)
+        delta.to_csv(delta_path, index=False)
+        self._stage(extracts, new_index)
+
+        n_incoming = incoming[identifier].nunique()
+        logger.info(
+            f"Incremental ingestion completed. {len(delta)} of {n_incoming} customers read "
+            f"are new or changed, delta saved at: {delta_path}"
+        )
+
+        if delta.empty:
+            return None
+
+        return delta_path
+
+    def _stage(self, extracts: dict, row_index: pd.DataFrame = None, row_index_name: str = None):
+        """
+        Writes a pending manifest naming the row index. A new `row_index`
+        is written beside the committed one first; without it the
+        manifest names the committed `row_index_name`.
+        """
+        if row_index is not None:
+            row_index_name = f"row_index-{uuid.uuid4().hex[:12]}.parquet"
+            row_index.to_parquet(Path(self.config.state_dir) / row_index_name, index=False)
+        save_json(
+            self._pending_manifest_path,
+            {"extracts": extracts, "row_index": row_index_name},
+        )
+
+    def commit_incremental_ingestion(self):
+        """
+        Publishes the state staged by `initiate_incremental_ingestion`,
+        once the run that consumed its delta has succeeded. Replacing the
+        manifest is a single rename, so the manifest and the row index it
+        names always change together.
+        """
+        if not self._pending_manifest_path.exists():
+            return
+
+        previous = load_json(self._manifest_path).get("row_index") \
+            if self._manifest_path.exists() else None
+        staged = load_json(self._pending_manifest_path)["row_index"]
+        os.replace(self._pending_manifest_path, self._manifest_path)
+        if previous not in (None, staged):
+            (Path(self.config.state_dir) / previous).unlink(missing_ok=True)
+
+        logger.info("Committed incremental ingestion state")
@@ -1,7 +1,9 @@
 from pathlib import Path
 import pandas as pd
 import numpy as np
+import scipy.sparse as sp
 import joblib
+from box import ConfigBox
 
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler, OneHotEncoder, OrdinalEncoder
@@ -9,75 +11,195 @@ from sklearn.compose import ColumnTransformer
 
 from mlProject import logger
 from mlProject.entity.config_entity import DataTransformationConfig
-from mlProject.utils.common import read_yaml
+from mlProject.utils.artifact_writer import ArtifactWriter
+from mlProject.utils.common import (
+    read_yaml,
+    save_bin_atomic,
+    load_dataframe,
+    iter_dataframe,
+    load_matrix,
+    matrix_path,
+    save_matrix,
+)
 from mlProject.constants import PARAMS_FILE_PATH, SCHEMA_PROCESSED_FILE_PATH
 
 
+def build_preprocessor(params: ConfigBox, schema: ConfigBox, sparse: bool,
+                       nominal_categories="auto") -> ColumnTransformer:
+    """
+    Unfitted preprocessor of DataTransformation. Cross-validation builds
+    it too, to refit it inside each fold.
+    """
+    # 1. Get column lists from schema
+    numerical_cols = schema["numerical_columns"]
+    
+    # Define the specific columns as per your requirements
+    nominal_cols = [
+        'gender', 'Partner', 'Dependents', 'PhoneService', 'MultipleLines', 
+        'InternetService', 'OnlineSecurity', 'OnlineBackup', 'DeviceProtection', 
+        'TechSupport', 'StreamingTV', 'StreamingMovies', 'PaperlessBilling', 
+        'PaymentMethod', 'HasInternet'
+    ]
+
+    ordinal_cols = ['Contract', 'TenureGroup', 'MonthlyChargeLevel', 'SupportRisk', 'ContractRisk']
+
+    # 2. Define Ordinal Hierarchies
+    # These lists ensure the OrdinalEncoder assigns 0, 1, 2 in the correct order
+    contract_categories = ['Month-to-month', 'One year', 'Two year']
+    tenure_categories = ['0-1 Year', '1-2 Years', '2-4 Years', '4+ Years']
+    charge_categories = ['Low', 'Medium', 'High']
+    support_risk_categories = ['LowRisk', 'HighRisk']
+    contract_risk_categories = ['Low', 'Medium', 'High']
+
+    # 3. Create Scaler and Encoders
+    scaler_type = params["data_transformation"]["scaling"]["numerical_scaler"]
+    scaler = StandardScaler() if scaler_type == "standard" else "passthrough"
+
+    nominal_transformer = OneHotEncoder(
+        drop="first" if params["data_transformation"]["encoding"]["drop_first"] else None,
+        categories=nominal_categories,
+        handle_unknown="ignore",
+        sparse_output=sparse # Updated from 'sparse' for newer sklearn versions
+    )
+
+    ordinal_transformer = OrdinalEncoder(categories=[
+        contract_categories,
+        tenure_categories,
+        charge_categories,
+        support_risk_categories,
+        contract_risk_categories
+    ])
+
+    # 4. Build the final ColumnTransformer
+    preprocessor = ColumnTransformer(
+        transformers=[
+            ("num", scaler, numerical_cols),
+            ("nominal", nominal_transformer, nominal_cols),
+            ("ordinal", ordinal_transformer, ordinal_cols)
+        ],
+        # Sparse mode keeps the stacked output CSR whatever its density
+        sparse_threshold=1.0 if sparse else 0.0,
+    )
+
+    return preprocessor
+
+
 class DataTransformation:
-    def __init__(self, config: DataTransformationConfig):
+    def __init__(self, config: DataTransformationConfig, writer: ArtifactWriter = None):
         self.config = config
+        self.writer = writer
+        self.preprocessor = None
+        # Whether the last transformation kept the previous preprocessor
+        self.preprocessor_reused = False
         self.params = read_yaml(PARAMS_FILE_PATH)
         self.schema = read_yaml(SCHEMA_PROCESSED_FILE_PATH)
+        self.sparse = bool(self.params["data_transformation"]["encoding"]["sparse_output"])
+        self.compact = bool(self.params["data_transformation"]["storage"]["compact"])
 
-    def _get_preprocessor(self):
-        # 1. Get column lists from schema
-        numerical_cols = self.schema["numerical_columns"]
-        
-        # Define the specific columns as per your requirements
-        nominal_cols = [
-            'gender', 'Partner', 'Dependents', 'PhoneService', 'MultipleLines', 
-            'InternetService', 'OnlineSecurity', 'OnlineBackup', 'DeviceProtection', 
-            'TechSupport', 'StreamingTV', 'StreamingMovies', 'PaperlessBilling', 
-            'PaymentMethod', 'HasInternet'
-        ]
-
-        ordinal_cols = ['Contract', 'TenureGroup', 'MonthlyChargeLevel', 'SupportRisk', 'ContractRisk']
-
-        # 2. Define Ordinal Hierarchies
-        # These lists ensure the OrdinalEncoder assigns 0, 1, 2 in the correct order
-        contract_categories = ['Month-to-month', 'One year', 'Two year']
-        tenure_categories = ['0-1 Year', '1-2 Years', '2-4 Years', '4+ Years']
-        charge_categories = ['Low', 'Medium', 'High']
-        support_risk_categories = ['LowRisk', 'HighRisk']
-        contract_risk_categories = ['Low', 'Medium', 'High']
-
-        # 3. Create Scaler and Encoders
-        scaler_type = self.params["data_transformation"]["scaling"]["numerical_scaler"]
-        scaler = StandardScaler() if scaler_type == "standard" else "passthrough"
-
-        nominal_transformer = OneHotEncoder(
-            drop="first" if self.params["data_transformation"]["encoding"]["drop_first"] else None,
-            handle_unknown="ignore",
-            sparse_output=False # Updated from 'sparse' for newer sklearn versions
-        )
+    def _get_preprocessor(self, nominal_categories="auto"):
+        return build_preprocessor(self.params, self.schema, self.sparse, nominal_categories)
 
-        ordinal_transformer = OrdinalEncoder(categories=[
-            contract_categories,
-            tenure_categories,
-            charge_categories,
-            support_risk_categories,
-            contract_risk_categories
-        ])
-
-        # 4. Build the final ColumnTransformer
-        preprocessor = ColumnTransformer(
-            transformers=[
-                ("num", scaler, numerical_cols),
-                ("nominal", nominal_transformer, nominal_cols),
-                ("ordinal", ordinal_transformer, ordinal_cols)
-            ]
-        )
+    @property
+    def warm_start(self) -> bool:
+        warm_start = self.params.get("warm_start")
+        return bool(warm_start and warm_start["enabled"])
+
+    @staticmethod
+    def _settings(transformer):
+        if isinstance(transformer, str):
+            return transformer
+        return type(transformer), transformer.get_params()
+
+    def _changes(self, previous, columns: list, categories: dict):
+        """Why `previous` cannot encode the training split as a refit would, None if it can"""
+        template = self._get_preprocessor()
+        if list(getattr(previous, "feature_names_in_", [])) != list(columns):
+            return "the feature columns changed"
+        if previous.sparse_threshold != template.sparse_threshold:
+            return "the encoding settings changed"
+
+        fitted = {name: (transformer, cols) for name, transformer, cols in previous.transformers_}
+        for name, transformer, cols in template.transformers:
+            if name not in fitted or list(fitted[name][1]) != list(cols):
+                return f"the {name} columns changed"
+            settings, previous_settings = self._settings(transformer), self._settings(fitted[name][0])
+            if name == "nominal":
+                # Only the fitted categories may differ from "auto"
+                settings[1].pop("categories")
+                previous_settings[1].pop("categories")
+            # Hashed, as NaN parameters never compare equal
+            if joblib.hash(settings) != joblib.hash(previous_settings):
+                return f"the {name} settings changed"
+
+        encoder = fitted["nominal"][0]
+        for col, cats in zip(fitted["nominal"][1], encoder.categories_):
+            if {cat for cat in cats if not pd.isna(cat)} != categories[col]:
+                return f"the categories of {col} changed"
+        return None
 
-        return preprocessor
+    def _reusable_preprocessor(self, columns: list, categories: dict):
+        """
+        The previous run's fitted preprocessor, when warm start is enabled
+        and it encodes the same columns with the same settings and the
+        same nominal categories as a refit on this training split would.
+        Keeping it keeps the feature layout, and the scaling, that the
+        previous model's coefficients were fitted on.
 
-    def initiate_data_transformation(self, featured_data_path: Path):
+        Args:
+            columns (list): feature columns of the training split
+            categories (dict): nominal column -> set of its training categories
+
+        Returns:
+            ColumnTransformer: fitted preprocessor to reuse, None to refit
+        """
+        self.preprocessor_reused = False
+        path = Path(self.config.preprocessor_path)
+        if not self.warm_start or not path.exists():
+            return None
+
+        previous = joblib.load(path)
+        reason = self._changes(previous, columns, categories)
+        if reason is not None:
+            logger.info(f"Refitting the preprocessor, {reason}")
+            return None
+
+        logger.info("Reusing the previous preprocessor, the nominal categories are unchanged")
+        self.preprocessor_reused = True
+        return previous
+
+    def initiate_data_transformation(self, featured_data):
+        """
+        Splits the featured data, fits the preprocessor on the training
+        split and transforms both splits. With warm start enabled, the
+        previous run's preprocessor is reused instead of refitted when
+        the training split has the columns and nominal categories it was
+        fitted on.
+
+        In streaming mode a featured dataset given by path is processed
+        out of core, see `_initiate_streaming_transformation`.
+
+        Args:
+            featured_data (Path | pd.DataFrame): featured dataset or its path
+
+        Returns:
+            tuple: paths to X_train, X_test, y_train and y_test, or with a
+                writer the arrays themselves while the artifacts are
+                written. X is CSR with `sparse_output`, dense otherwise.
+                The fitted preprocessor is kept on `self.preprocessor`.
+        """
         logger.info("Starting data transformation")
 
-        df = pd.read_csv(featured_data_path)
+        if self.config.streaming and not isinstance(featured_data, pd.DataFrame):
+            return self._initiate_streaming_transformation(Path(featured_data))
+
+        if isinstance(featured_data, pd.DataFrame):
+            df = featured_data
+        else:
+            df = load_dataframe(Path(featured_data))
 
         target_col = self.schema["target_column"]
         X = df.drop(columns=[target_col])
-        y = df[target_col].map({"Yes": 1, "No": 0})
+        y = df[target_col].map({"Yes": 1, "No": 0}).astype(int)
 
         split_cfg = self.params["data_split"]
 
@@ -90,25 +212,205 @@ class DataTransformation:
         )
 
         preprocessor = self._get_preprocessor()
+        nominal_cols = {name: cols for name, _, cols in preprocessor.transformers}["nominal"]
+        previous = self._reusable_preprocessor(
+            X_train.columns, {col: set(X_train[col].dropna().unique()) for col in nominal_cols}
+        )
 
-        logger.info("Fitting and applying preprocessor on training data")
-        # Use fit_transform on train and transform on test to avoid data leakage
-        X_train_transformed = preprocessor.fit_transform(X_train)
+        if previous is not None:
+            preprocessor = previous
+            X_train_transformed = preprocessor.transform(X_train)
+        else:
+            logger.info("Fitting and applying preprocessor on training data")
+            # Use fit_transform on train and transform on test to avoid data leakage
+            X_train_transformed = preprocessor.fit_transform(X_train)
         X_test_transformed = preprocessor.transform(X_test)
 
+        self.preprocessor = preprocessor
+        arrays = (X_train_transformed, X_test_transformed, y_train.to_numpy(), y_test.to_numpy())
+        if self.compact:
+            arrays = self._compact(*arrays)
+
+        if self.writer is not None:
+            self.writer.submit(save_bin_atomic, preprocessor, Path(self.config.preprocessor_path))
+            for path, array in zip(self._array_paths(), arrays):
+                self.writer.submit(save_matrix, array, Path(path))
+            logger.info("Data transformation completed. Artifacts queued for writing")
+            return arrays
+
         # Save the preprocessor and the numpy arrays
-        joblib.dump(preprocessor, self.config.preprocessor_path)
+        save_bin_atomic(preprocessor, Path(self.config.preprocessor_path))
 
-        np.save(self.config.transformed_train, X_train_transformed)
-        np.save(self.config.transformed_test, X_test_transformed)
-        np.save(self.config.y_train, y_train.values)
-        np.save(self.config.y_test, y_test.values)
+        for path, array in zip(self._array_paths(), arrays):
+            save_matrix(array, Path(path))
 
         logger.info(f"Data transformation completed. Preprocessor saved at: {self.config.preprocessor_path}")
 
+        return self._array_paths()
+
+    @staticmethod
+    def _compact(X_train, X_test, y_train, y_test) -> tuple:
+        """float32 features and int8 labels, for dense and CSR matrices alike"""
+        return (
+            X_train.astype(np.float32),
+            X_test.astype(np.float32),
+            y_train.astype(np.int8),
+            y_test.astype(np.int8),
+        )
+
+    def _array_paths(self) -> tuple:
         return (
-            self.config.transformed_train,
-            self.config.transformed_test,
+            matrix_path(Path(self.config.transformed_train), self.sparse),
+            matrix_path(Path(self.config.transformed_test), self.sparse),
             self.config.y_train,
             self.config.y_test
-        )
\ No newline at end of file
+        )
+
+    # ================================
+    # Streaming
+    # ================================
+
+    def _split_chunk(self, chunk: pd.DataFrame, index: int) -> tuple:
+        """
+        Splits one chunk into train and test rows, stratified when the
+        chunk allows it, with a seed derived from the chunk's position so
+        that every pass over the file splits it the same way.
+        """
+        target_col = self.schema["target_column"]
+        X = chunk.drop(columns=[target_col])
+        y = chunk[target_col].map({"Yes": 1, "No": 0}).astype(int)
+
+        split_cfg = self.params["data_split"]
+        seed = self.params["general"]["random_state"] + index
+
+        for stratify in ([y, None] if split_cfg["stratify"] else [None]):
+            try:
+                return train_test_split(
+                    X, y, test_size=split_cfg["test_size"], random_state=seed, stratify=stratify
+                )
+            except ValueError:
+                # too few rows, or too few of a class, to split this chunk
+                continue
+
+        return X, X.iloc[:0], y, y.iloc[:0]
+
+    def _iter_splits(self, featured_path: Path):
+        chunks = iter_dataframe(featured_path, self.config.chunk_size, self.schema)
+        for index, chunk in enumerate(chunks):
+            yield self._split_chunk(chunk, index)
+
+    def _fit_streaming(self, featured_path: Path) -> tuple:
+        """
+        First pass: fits the scaler with `partial_fit` and collects the
+        categories of every nominal column over the training rows. With
+        warm start, the previous preprocessor is kept instead when those
+        categories are unchanged.
+
+        Returns:
+            tuple: fitted preprocessor, training and test row counts
+        """
+        template = self._get_preprocessor()
+        columns = {name: cols for name, _, cols in template.transformers}
+        scaler = {name: transformer for name, transformer, _ in template.transformers}["num"]
+        categories = {col: set() for col in columns["nominal"]}
+        n_train, n_test, sample = 0, 0, None
+
+        for X_train, X_test, _, _ in self._iter_splits(featured_path):
+            n_train += len(X_train)
+            n_test += len(X_test)
+            if not len(X_train):
+                continue
+
+            if isinstance(scaler, StandardScaler):
+                scaler.partial_fit(X_train[columns["num"]])
+            for col in columns["nominal"]:
+                categories[col].update(X_train[col].dropna().unique())
+            if sample is None:
+                sample = X_train
+
+        if sample is None:
+            raise ValueError(f"No training rows found in {featured_path}")
+
+        previous = self._reusable_preprocessor(sample.columns, categories)
+        if previous is not None:
+            return previous, n_train, n_test
+
+        # Sorted like OneHotEncoder's own categories, so the encoding is
+        # the one a fit on the whole training split would produce
+        preprocessor = self._get_preprocessor(
+            nominal_categories=[sorted(categories[col]) for col in columns["nominal"]]
+        )
+        preprocessor.fit(sample)
+
+        # The scaler fitted on the sample is replaced by the one fitted
+        # over every chunk
+        for i, (name, transformer, cols) in enumerate(preprocessor.transformers_):
+            if name == "num" and isinstance(transformer, StandardScaler):
+                preprocessor.transformers_[i] = (name, scaler, cols)
+
+        return preprocessor, n_train, n_test
+
+    def _initiate_streaming_transformation(self, featured_path: Path):
+        """
+        Transforms a featured dataset larger than memory in two passes
+        over chunks of `chunk_size` rows. Each chunk is split on its own,
+        so the split matches the in-memory one in proportions but not
+        row for row. Dense matrices are written straight into .npy
+        memory maps; sparse ones are stacked from CSR chunks, so they
+        are bounded by their non-zeros rather than by the dataset.
+        """
+        preprocessor, n_train, n_test = self._fit_streaming(featured_path)
+        logger.info(f"Preprocessor fitted over chunks: {n_train} train and {n_test} test rows")
+
+        n_features = len(preprocessor.get_feature_names_out())
+        X_dtype = np.float32 if self.compact else np.float64
+        y_dtype = np.int8 if self.compact else np.int64
+        X_train_path, X_test_path, y_train_path, y_test_path = self._array_paths()
+
+        y_train = np.lib.format.open_memmap(y_train_path, mode="w+", dtype=y_dtype, shape=(n_train,))
+        y_test = np.lib.format.open_memmap(y_test_path, mode="w+", dtype=y_dtype, shape=(n_test,))
+        if self.sparse:
+            X_train, X_test = [], []
+        else:
+            X_train = np.lib.format.open_memmap(
+                X_train_path, mode="w+", dtype=X_dtype, shape=(n_train, n_features)
+            )
+            X_test = np.lib.format.open_memmap(
+                X_test_path, mode="w+", dtype=X_dtype, shape=(n_test, n_features)
+            )
+
+        train_offset, test_offset = 0, 0
+        for X_train_chunk, X_test_chunk, y_train_chunk, y_test_chunk in self._iter_splits(featured_path):
+            for X_chunk, y_chunk, X_out, y_out, offset in (
+                (X_train_chunk, y_train_chunk, X_train, y_train, train_offset),
+                (X_test_chunk, y_test_chunk, X_test, y_test, test_offset),
+            ):
+                if not len(X_chunk):
+                    continue
+                transformed = preprocessor.transform(X_chunk).astype(X_dtype)
+                if self.sparse:
+                    X_out.append(sp.csr_matrix(transformed))
+                else:
+                    X_out[offset:offset + len(X_chunk)] = transformed
+                y_out[offset:offset + len(y_chunk)] = y_chunk.to_numpy()
+
+            train_offset += len(X_train_chunk)
+            test_offset += len(X_test_chunk)
+
+        if self.sparse:
+            save_matrix(sp.vstack(X_train, format="csr"), Path(X_train_path))
+            save_matrix(sp.vstack(X_test, format="csr"), Path(X_test_path))
+        for array in (X_train, X_test, y_train, y_test):
+            if isinstance(array, np.memmap):
+                array.flush()
+        del X_train, X_test, y_train, y_test
+
+        save_bin_atomic(preprocessor, Path(self.config.preprocessor_path))
+        self.preprocessor = preprocessor
+
+        logger.info(f"Streaming data transformation completed. Preprocessor saved at: {self.config.preprocessor_path}")
+
+        if self.writer is not None:
+            # Callers that expect arrays get read-only maps of the artifacts
+            return tuple(load_matrix(Path(path), mmap=True) for path in self._array_paths())
+        return self._array_paths()
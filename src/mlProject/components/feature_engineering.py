@@ -1,94 +1,432 @@
+from bisect import bisect_left
 from pathlib import Path
 import pandas as pd
 import numpy as np
+import joblib
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.utils.validation import check_is_fitted
 
 from mlProject import logger
+from mlProject.constants import PARAMS_FILE_PATH, SCHEMA_PROCESSED_FILE_PATH
 from mlProject.entity.config_entity import FeatureEngineeringConfig
+from mlProject.utils.artifact_writer import ArtifactWriter
+from mlProject.utils.common import (
+    save_bin_atomic,
+    save_dataframe,
+    load_dataframe,
+    read_yaml,
+)
 
 
-class FeatureEngineering:
-    def __init__(self, config: FeatureEngineeringConfig):
-        self.config = config
+# Partitions are compacted into one once there are more than this many
+MAX_PARTITIONS = 12
+
+# FeatureTransformer switches to the per-record path at or below this size
+RECORD_PATH_MAX_ROWS = 64
+
+
+class FeatureSpec:
+    """
+    Engineered features declared under `feature_engineering.features` in
+    params.yaml, compiled into column-wise NumPy/pandas operations.
+
+    Every feature has a `type`:
+
+    - bin: fixed `edges` on a numeric `column`, right-inclusive like `pd.cut`
+    - quantile_bin: `quantiles` equal-frequency bins learned by `fit`
+    - count: number of `columns` equal to `value`
+    - mask: `then` where every `when` column equals its value, else `else`
+    - map: `mapping` of the values of `column`
+    - ratio: `numerator` / `denominator`, infinities replaced by `fill`
+
+    `edges` and `quantiles` may name another key of the section, e.g.
+    `tenure_bins`, so the tunable numbers stay in one place.
+    """
+
+    TYPES = ("bin", "quantile_bin", "count", "mask", "map", "ratio")
+
+    def __init__(self, features: dict):
+        self.features = features
+        self._steps = [(name, *self._compile(name, f)) for name, f in features.items()]
+
+    def __getstate__(self):
+        # The compiled steps are closures; rebuild them after unpickling
+        return {"features": self.features}
+
+    def __setstate__(self, state):
+        self.__init__(state["features"])
+
+    @classmethod
+    def from_params(cls, params: dict) -> "FeatureSpec":
+        section = params["feature_engineering"]
+
+        features = {}
+        for name, feature in section["features"].items():
+            feature = dict(feature)
+            for key in ("edges", "quantiles"):
+                if isinstance(feature.get(key), str):
+                    feature[key] = section[feature[key]]
+            features[name] = feature
+
+        return cls(features)
+
+    @property
+    def fitted_features(self) -> list:
+        return [name for name, f in self.features.items() if f["type"] == "quantile_bin"]
+
+    @property
+    def input_columns(self) -> list:
+        columns = []
+        for feature in self.features.values():
+            columns.extend(
+                feature.get("columns", [])
+                + list(feature.get("when", {}))
+                + [feature[key] for key in ("column", "numerator", "denominator") if key in feature]
+            )
+        return list(dict.fromkeys(columns))
+
+    # ================================
+    # Compilation
+    # ================================
 
     @staticmethod
-    def _tenure_group(tenure: int) -> str:
-        if tenure <= 12:
-            return "0-1 Year"
-        elif tenure <= 24:
-            return "1-2 Years"
-        elif tenure <= 48:
-            return "2-4 Years"
-        else:
-            return "4+ Years"
+    def _bin(values: pd.Series, edges: list, labels: list) -> pd.Categorical:
+        values = values.to_numpy(dtype=np.float64)
+        codes = np.searchsorted(np.asarray(edges, dtype=np.float64), values, side="left")
+        codes[np.isnan(values)] = -1
+        return pd.Categorical.from_codes(codes, categories=labels, ordered=True)
 
-    def initiate_feature_engineering(self, cleaned_data_path: Path) -> Path:
+    @staticmethod
+    def _bin_record(value, edges: list, labels: list):
+        if value is None or value != value:
+            return None
+        return labels[bisect_left(edges, value)]
+
+    def _compile(self, name: str, feature: dict) -> tuple:
+        """
+        Returns the column-wise function of a feature and its pure-Python
+        counterpart for a single record dict.
+        """
+        kind = feature.get("type")
+
+        if kind == "bin":
+            col, edges, labels = feature["column"], list(feature["edges"]), feature["labels"]
+            if len(labels) != len(edges) + 1:
+                raise ValueError(f"Feature '{name}' needs {len(edges) + 1} labels")
+            return (
+                lambda df, fitted: self._bin(df[col], edges, labels),
+                lambda record, fitted: self._bin_record(record[col], edges, labels),
+            )
+
+        if kind == "quantile_bin":
+            col, labels = feature["column"], feature["labels"]
+            if len(labels) != feature["quantiles"]:
+                raise ValueError(f"Feature '{name}' needs {feature['quantiles']} labels")
+            return (
+                lambda df, fitted: self._bin(df[col], fitted[name], labels),
+                lambda record, fitted: self._bin_record(record[col], fitted[name], labels),
+            )
+
+        if kind == "count":
+            columns, value = feature["columns"], feature["value"]
+
+            def count(df, fitted):
+                total = np.zeros(len(df), dtype=np.int64)
+                for col in columns:
+                    total += (df[col] == value).to_numpy()
+                return total
+
+            return (
+                count,
+                lambda record, fitted: sum(record[col] == value for col in columns),
+            )
+
+        if kind == "mask":
+            when = dict(feature["when"])
+            then, otherwise = feature["then"], feature["else"]
+
+            def mask(df, fitted):
+                matched = np.ones(len(df), dtype=bool)
+                for col, value in when.items():
+                    matched &= (df[col] == value).to_numpy()
+                return pd.Categorical.from_codes(
+                    matched.astype(np.int8), categories=[otherwise, then]
+                )
+
+            return (
+                mask,
+                lambda record, fitted: (
+                    then if all(record[col] == value for col, value in when.items())
+                    else otherwise
+                ),
+            )
+
+        if kind == "map":
+            col, mapping = feature["column"], dict(feature["mapping"])
+            return (
+                lambda df, fitted: df[col].map(mapping),
+                lambda record, fitted: mapping.get(record[col]),
+            )
+
+        if kind == "ratio":
+            numerator, denominator = feature["numerator"], feature["denominator"]
+            fill = feature.get("fill", 0.0)
+
+            def ratio(df, fitted):
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    result = (
+                        df[numerator].to_numpy(dtype=np.float64)
+                        / df[denominator].to_numpy(dtype=np.float64)
+                    )
+                result[np.isinf(result)] = fill
+                return result
+
+            def ratio_record(record, fitted):
+                # Same IEEE results as the column-wise division
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    result = np.float64(record[numerator]) / np.float64(record[denominator])
+                return fill if np.isinf(result) else float(result)
+
+            return ratio, ratio_record
+
+        raise ValueError(f"Feature '{name}' has unknown type {kind!r}, expected one of {self.TYPES}")
+
+    # ================================
+    # Fit / Apply
+    # ================================
+
+    def fit(self, df: pd.DataFrame) -> dict:
+        """
+        Learns the data-dependent bin edges.
+
+        Args:
+            df (pd.DataFrame): cleaned customer records
+
+        Returns:
+            dict: inner bin edges per quantile_bin feature
+        """
+        fitted = {}
+        for name in self.fitted_features:
+            feature = self.features[name]
+            probabilities = np.linspace(0, 1, feature["quantiles"] + 1)
+            edges = np.nanquantile(
+                df[feature["column"]].to_numpy(dtype=np.float64), probabilities
+            )
+            if len(np.unique(edges)) != len(edges):
+                raise ValueError(f"Bin edges of feature '{name}' are not unique: {edges}")
+            fitted[name] = edges[1:-1].tolist()
+        return fitted
+
+    def apply(self, df: pd.DataFrame, fitted: dict) -> pd.DataFrame:
+        """
+        Adds the engineered features to a cleaned dataframe.
+
+        Args:
+            df (pd.DataFrame): cleaned customer records
+            fitted (dict): bin edges returned by `fit`
+
+        Returns:
+            pd.DataFrame: dataframe with engineered features
+        """
+        for name, step, _ in self._steps:
+            df[name] = step(df, fitted)
+        return df
+
+    def apply_record(self, record: dict, fitted: dict) -> dict:
+        """
+        Adds the engineered features to one cleaned customer record.
+
+        Args:
+            record (dict): cleaned customer record
+            fitted (dict): bin edges returned by `fit`
+
+        Returns:
+            dict: the record with engineered features
+        """
+        for name, _, step in self._steps:
+            record[name] = step(record, fitted)
+        return record
+
+
+class FeatureTransformer(TransformerMixin, BaseEstimator):
+    """
+    Feature engineering as a fitted sklearn transformer.
+
+    `fit` learns the quantile bin edges once; the fitted transformer is
+    pickled next to the preprocessor so serving applies exactly the
+    features the model was trained on, one customer at a time if need be.
+    It composes with the preprocessor and model in a `Pipeline`.
+    Batches of up to `RECORD_PATH_MAX_ROWS` rows are transformed record by
+    record in plain Python, which beats the column-wise path's per-call
+    pandas overhead at that size.
+    """
+
+    def __init__(self, features: dict = None):
+        self.features = features
+
+    @classmethod
+    def from_params(cls, params: dict) -> "FeatureTransformer":
+        return cls(features=FeatureSpec.from_params(params).features)
+
+    def fit(self, X: pd.DataFrame, y=None):
+        self.spec_ = FeatureSpec(self.features)
+        self.edges_ = self.spec_.fit(X)
+        self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        self.n_features_in_ = len(self.feature_names_in_)
+        return self
+
+    def transform(self, X: pd.DataFrame) -> pd.DataFrame:
+        check_is_fitted(self, "edges_")
+
+        if len(X) > RECORD_PATH_MAX_ROWS:
+            # Shallow copy, the new columns do not touch the caller's frame
+            return self.spec_.apply(X.copy(deep=False), self.edges_)
+
+        columns = {col: X[col].tolist() for col in self.spec_.input_columns}
+        records = [
+            self.spec_.apply_record(dict(zip(columns, values)), self.edges_)
+            for values in zip(*columns.values())
+        ]
+        features = pd.DataFrame(
+            {name: [record[name] for record in records] for name in self.features},
+            index=X.index,
+        )
+        return pd.concat(
+            [X.drop(columns=list(self.features), errors="ignore"), features], axis=1
+        )
+
+    def transform_record(self, record: dict) -> dict:
+        """
+        Engineered features for one cleaned customer record.
+
+        Args:
+            record (dict): cleaned customer record
+
+        Returns:
+            dict: a copy of the record with engineered features
+        """
+        return self.spec_.apply_record(dict(record), self.edges_)
+
+    def get_feature_names_out(self, input_features=None) -> np.ndarray:
+        check_is_fitted(self, "edges_")
+        input_features = self.feature_names_in_ if input_features is None else input_features
+        new_features = [name for name in self.features if name not in set(input_features)]
+        return np.asarray([*input_features, *new_features], dtype=object)
+
+
+class FeatureEngineering:
+    def __init__(self, config: FeatureEngineeringConfig, writer: ArtifactWriter = None):
+        self.config = config
+        self.writer = writer
+        self.params = read_yaml(PARAMS_FILE_PATH)
+
+    def initiate_feature_engineering(self, cleaned_data):
         """
         Applies feature engineering and saves featured dataset.
 
         Args:
-            cleaned_data_path (Path): path to cleaned dataset
+            cleaned_data (Path | pd.DataFrame): cleaned dataset or its path
 
         Returns:
-            Path: path to feature-engineered dataset
+            Path: path to feature-engineered dataset, or with a writer the
+                featured dataframe itself while the artifacts are written
         """
         logger.info("Starting feature engineering process")
 
-        df = pd.read_csv(cleaned_data_path)
+        if isinstance(cleaned_data, pd.DataFrame):
+            df = cleaned_data
+        else:
+            df = load_dataframe(Path(cleaned_data), read_yaml(SCHEMA_PROCESSED_FILE_PATH))
+
+        transformer = FeatureTransformer.from_params(self.params)
+        logger.info(f"Building features: {list(transformer.features)}")
+        df = transformer.fit_transform(df)
 
-        logger.info("Creating TenureGroup feature")
-        df["TenureGroup"] = df["tenure"].apply(self._tenure_group)
+        output_path = Path(self.config.featured_data_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        logger.info("Creating MonthlyChargeLevel feature")
-        df["MonthlyChargeLevel"] = pd.qcut(
-            df["MonthlyCharges"],
-            q=3,
-            labels=["Low", "Medium", "High"]
-        )
+        logger.info(f"Featured dataset shape: {df.shape}")
 
-        service_cols = [
-            "PhoneService",
-            "MultipleLines",
-            "OnlineSecurity",
-            "OnlineBackup",
-            "DeviceProtection",
-            "TechSupport",
-            "StreamingTV",
-            "StreamingMovies"
-        ]
+        if self.writer is not None:
+            self.writer.submit(save_dataframe, df, output_path)
+            self.writer.submit(
+                save_bin_atomic, transformer, Path(self.config.feature_transformer_path)
+            )
+            logger.info(f"Feature engineering completed. Data queued for: {output_path}")
+            return df
 
-        logger.info("Creating TotalServices feature")
-        df["TotalServices"] = df[service_cols].apply(
-            lambda x: sum(x == "Yes"), axis=1
-        )
+        save_dataframe(df, output_path)
 
-        logger.info("Creating HasInternet feature")
-        df["HasInternet"] = df["InternetService"].apply(
-            lambda x: "No" if x == "No" else "Yes"
-        )
+        save_bin_atomic(transformer, Path(self.config.feature_transformer_path))
+
+        logger.info(f"Feature engineering completed. Data saved at: {output_path}")
+
+        return output_path
+
+    def initiate_incremental_feature_engineering(self, cleaned_delta_path: Path) -> Path:
+        """
+        Applies feature engineering to an ingestion delta only and merges
+        it with the previously processed partitions.
 
-        logger.info("Creating SupportRisk feature")
-        df["SupportRisk"] = df[["OnlineSecurity", "TechSupport"]].apply(
-            lambda x: "HighRisk" if all(x == "No") else "LowRisk",
-            axis=1
+        The delta is stored as a new partition keyed by customerID; a
+        customer's latest partition wins. Quantile-binned features such as
+        MonthlyChargeLevel depend on the whole dataset, so they are refit
+        over the merged data.
+
+        Args:
+            cleaned_delta_path (Path): cleaned delta, including customerID
+
+        Returns:
+            Path: path to the merged feature-engineered dataset
+        """
+        logger.info("Starting incremental feature engineering process")
+
+        identifier = "customerID"
+        df = load_dataframe(Path(cleaned_delta_path), read_yaml(SCHEMA_PROCESSED_FILE_PATH))
+
+        transformer_path = Path(self.config.feature_transformer_path)
+        if transformer_path.exists():
+            df = joblib.load(transformer_path).transform(df)
+        else:
+            df = FeatureTransformer.from_params(self.params).fit_transform(df)
+
+        partitions_dir = Path(self.config.partitions_dir)
+        partitions_dir.mkdir(parents=True, exist_ok=True)
+        partitions = sorted(partitions_dir.glob("part-*.parquet"))
+
+        next_index = int(partitions[-1].stem.split("-")[1]) + 1 if partitions else 0
+        new_partition = partitions_dir / f"part-{next_index:05d}.parquet"
+        save_dataframe(df, new_partition)
+        partitions.append(new_partition)
+
+        logger.info(f"Merging delta of {len(df)} rows with {len(partitions) - 1} partitions")
+        # Sorted by customerID so the row order, and with it the train/test
+        # split, does not depend on the history of deltas
+        merged = (
+            pd.concat([load_dataframe(path) for path in partitions], ignore_index=True)
+            .drop_duplicates(subset=[identifier], keep="last")
+            .sort_values(identifier, kind="stable")
         )
 
-        logger.info("Creating ContractRisk feature")
-        df["ContractRisk"] = df["Contract"].map({
-            "Month-to-month": "High",
-            "One year": "Medium",
-            "Two year": "Low"
-        })
+        transformer = FeatureTransformer.from_params(self.params)
+        merged = transformer.fit_transform(merged)
 
-        logger.info("Creating AvgMonthlySpend feature")
-        df["AvgMonthlySpend"] = df["TotalCharges"] / df["tenure"]
-        df["AvgMonthlySpend"].replace([np.inf, -np.inf], 0, inplace=True)
+        if len(partitions) > MAX_PARTITIONS:
+            logger.info(f"Compacting {len(partitions)} partitions")
+            compacted = partitions_dir / f"part-{next_index + 1:05d}.parquet"
+            save_dataframe(merged.reset_index(drop=True), compacted)
+            for path in partitions:
+                path.unlink()
 
         output_path = Path(self.config.featured_data_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        df.to_csv(output_path, index=False)
+        merged = merged.drop(columns=[identifier]).reset_index(drop=True)
+        save_dataframe(merged, output_path)
 
-        logger.info(f"Feature engineering completed. Data saved at: {output_path}")
-        logger.info(f"Featured dataset shape: {df.shape}")
+        save_bin_atomic(transformer, transformer_path)
+
+        logger.info(f"Incremental feature engineering completed. Data saved at: {output_path}")
+        logger.info(f"Featured dataset shape: {merged.shape}")
 
         return output_path
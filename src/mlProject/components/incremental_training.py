@@ -0,0 +1,91 @@
+import time
+
+import numpy as np
+from box import ConfigBox
+
+from mlProject import logger
+
+
+class IncrementalTraining:
+    """
+    Out-of-core training of an SGDClassifier with `partial_fit`.
+
+    The training matrices are read `chunk_rows` rows at a time, so with
+    memory-mapped X_train and y_train only one chunk is ever resident
+    besides the model. Every epoch visits the chunks in a new random
+    order and shuffles the rows within each chunk, which stands in for
+    the full shuffle `fit` would do over rows held in memory.
+    """
+
+    def __init__(self, sgd_params: ConfigBox, random_state: int):
+        self.epochs = sgd_params["epochs"]
+        self.chunk_rows = sgd_params["chunk_rows"]
+        self.shuffle = bool(sgd_params["shuffle"])
+        self.class_weight = sgd_params["class_weight"]
+        self.random_state = random_state
+
+    def _chunks(self, n_rows: int) -> list:
+        return [
+            (start, min(start + self.chunk_rows, n_rows))
+            for start in range(0, n_rows, self.chunk_rows)
+        ]
+
+    def _class_counts(self, y) -> np.ndarray:
+        counts = np.zeros(2, dtype=np.int64)
+        for start, stop in self._chunks(len(y)):
+            chunk = np.bincount(np.asarray(y[start:stop]), minlength=len(counts))
+            counts = np.pad(counts, (0, len(chunk) - len(counts))) + chunk
+        return counts
+
+    def _class_weight(self, classes: np.ndarray, counts: np.ndarray):
+        """
+        `partial_fit` cannot compute "balanced" weights itself, as it
+        never sees all of y at once; they are computed from the counts
+        of a first pass over y, as compute_class_weight would.
+        """
+        if self.class_weight != "balanced":
+            return self.class_weight
+        n_rows = counts.sum()
+        return {
+            int(label): float(n_rows / (len(classes) * counts[label]))
+            for label in classes
+        }
+
+    def fit(self, model, X, y):
+        """
+        Trains `model` for `epochs` passes over X and y.
+
+        Args:
+            model: unfitted SGDClassifier
+            X (np.ndarray | scipy.sparse.csr_matrix): training matrix,
+                typically memory-mapped
+            y (np.ndarray): training labels, typically memory-mapped
+
+        Returns:
+            SGDClassifier: fitted model, a drop-in for one fitted with `fit`
+        """
+        counts = self._class_counts(y)
+        classes = np.flatnonzero(counts)
+        model.set_params(class_weight=self._class_weight(classes, counts))
+
+        rng = np.random.default_rng(self.random_state)
+        chunks = self._chunks(X.shape[0])
+
+        for epoch in range(self.epochs):
+            start = time.perf_counter()
+            order = rng.permutation(len(chunks)) if self.shuffle else range(len(chunks))
+            for index in order:
+                chunk_start, chunk_stop = chunks[index]
+                # Slicing a memmap or CSR matrix only reads the chunk's rows
+                X_chunk = X[chunk_start:chunk_stop]
+                y_chunk = np.asarray(y[chunk_start:chunk_stop])
+                if self.shuffle:
+                    rows = rng.permutation(chunk_stop - chunk_start)
+                    X_chunk, y_chunk = X_chunk[rows], y_chunk[rows]
+                model.partial_fit(X_chunk, y_chunk, classes=classes)
+            logger.info(
+                f"Epoch {epoch + 1}/{self.epochs} over {len(chunks)} chunks "
+                f"in {time.perf_counter() - start:.2f}s"
+            )
+
+        return model
@@ -0,0 +1,82 @@
+from box import ConfigBox
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+
+
+def _logistic_regression(params: ConfigBox, n_threads: int):
+    # lbfgs parallelizes through BLAS, which ModelTrainer limits per model
+    lr_params = params["logistic_regression"]
+    return LogisticRegression(
+        max_iter=lr_params["max_iter"],
+        class_weight=lr_params["class_weight"],
+        solver=lr_params["solver"]
+    )
+
+
+def _sgd_logistic(params: ConfigBox, n_threads: int):
+    # Logistic loss, so predict_proba works as for logistic regression.
+    # max_iter only applies to `fit`; IncrementalTraining runs `epochs`
+    # passes of partial_fit instead.
+    sgd_params = params["sgd_logistic"]
+    return SGDClassifier(
+        loss="log_loss",
+        alpha=sgd_params["alpha"],
+        penalty=sgd_params["penalty"],
+        learning_rate=sgd_params["learning_rate"],
+        average=sgd_params["average"],
+        class_weight=sgd_params["class_weight"],
+        max_iter=sgd_params["epochs"],
+        random_state=params["general"]["random_state"],
+    )
+
+
+def _xgboost(params: ConfigBox, n_threads: int):
+    try:
+        from xgboost import XGBClassifier
+    except ImportError as e:
+        raise ImportError("The xgboost model needs the xgboost package installed") from e
+
+    return XGBClassifier(
+        **params["xgboost"],
+        n_jobs=n_threads,
+        random_state=params["general"]["random_state"],
+    )
+
+
+def _catboost(params: ConfigBox, n_threads: int):
+    try:
+        from catboost import CatBoostClassifier
+    except ImportError as e:
+        raise ImportError("The catboost model needs the catboost package installed") from e
+
+    return CatBoostClassifier(
+        **params["catboost"],
+        thread_count=n_threads,
+        random_seed=params["general"]["random_state"],
+        verbose=False,
+        allow_writing_files=False,
+    )
+
+
+# params.yaml model.name -> builder of the unfitted estimator
+BACKENDS = {
+    "logistic_regression": _logistic_regression,
+    "sgd_logistic": _sgd_logistic,
+    "xgboost": _xgboost,
+    "catboost": _catboost,
+}
+
+# Backends trained out of core by IncrementalTraining rather than `fit`
+INCREMENTAL_MODELS = ("sgd_logistic",)
+
+
+def build_model(name: str, params: ConfigBox, n_threads: int):
+    """
+    Unfitted classifier of a backend, configured from its params.yaml
+    section and limited to `n_threads` threads.
+
+    XGBoost and CatBoost are optional dependencies, imported only when
+    their backend is built.
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown model {name}, expected one of {sorted(BACKENDS)}")
+    return BACKENDS[name](params, n_threads)
@@ -1,6 +1,5 @@
 from pathlib import Path
 import json
-import numpy as np
 import joblib
 
 from sklearn.metrics import (
@@ -13,23 +12,48 @@ from sklearn.metrics import (
 
 from mlProject import logger
 from mlProject.entity.config_entity import ModelEvaluationConfig
+from mlProject.utils.artifact_writer import ArtifactWriter
+from mlProject.utils.common import read_yaml, load_matrix, matrix_path
+from mlProject.constants import PARAMS_FILE_PATH
 
 
 class ModelEvaluation:
-    def __init__(self, config: ModelEvaluationConfig):
+    def __init__(self, config: ModelEvaluationConfig, writer: ArtifactWriter = None):
         self.config = config
+        self.writer = writer
+        self.params = read_yaml(PARAMS_FILE_PATH)
 
     def _load_artifacts(self):
         model = joblib.load(self.config.model_path)
-        X_test = np.load(self.config.test_data_path)
-        y_test = np.load(self.config.y_test)
+        transformation_params = self.params["data_transformation"]
+        sparse = bool(transformation_params["encoding"]["sparse_output"])
+        mmap = bool(transformation_params["storage"]["mmap"])
+
+        X_test = load_matrix(matrix_path(Path(self.config.test_data_path), sparse), mmap)
+        y_test = load_matrix(Path(self.config.y_test), mmap)
 
         return model, X_test, y_test
 
-    def initiate_model_evaluation(self):
+    @staticmethod
+    def _save_metrics(metrics: dict, output_path: Path):
+        with open(output_path, "w") as f:
+            json.dump(metrics, f, indent=4)
+
+    def initiate_model_evaluation(self, model=None, X_test=None, y_test=None):
+        """
+        Computes the test metrics of the trained model.
+
+        Args:
+            model (optional): trained model, with X_test and y_test.
+                Loaded from the artifacts if omitted.
+
+        Returns:
+            dict: evaluation metrics
+        """
         logger.info("Starting model evaluation")
 
-        model, X_test, y_test = self._load_artifacts()
+        if model is None:
+            model, X_test, y_test = self._load_artifacts()
 
         y_pred = model.predict(X_test)
         y_pred_proba = model.predict_proba(X_test)[:, 1]
@@ -45,10 +69,12 @@ class ModelEvaluation:
         output_path = Path(self.config.metrics_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(output_path, "w") as f:
-            json.dump(metrics, f, indent=4)
-
-        logger.info(f"Model evaluation metrics saved at: {output_path}")
+        if self.writer is not None:
+            self.writer.submit(self._save_metrics, metrics, output_path)
+            logger.info(f"Model evaluation metrics queued for: {output_path}")
+        else:
+            self._save_metrics(metrics, output_path)
+            logger.info(f"Model evaluation metrics saved at: {output_path}")
         logger.info(f"Evaluation Metrics: {metrics}")
 
         return metrics
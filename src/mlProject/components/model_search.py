@@ -0,0 +1,310 @@
+import math
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import product
+from pathlib import Path
+
+import numpy as np
+import scipy.sparse as sp
+from box import ConfigBox
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import roc_auc_score
+from threadpoolctl import threadpool_limits
+
+from mlProject import logger
+from mlProject.utils.common import load_shared_matrix, share_matrix
+
+
+# Penalties each solver supports. The penalty is passed as l1_ratio,
+# which replaces LogisticRegression's `penalty` from scikit-learn 1.8;
+# older versions ignore l1_ratio and fit l2, hence the pin in
+# requirements.txt.
+SOLVER_PENALTIES = {
+    "lbfgs": ("l2",),
+    "newton-cg": ("l2",),
+    "newton-cholesky": ("l2",),
+    "sag": ("l2",),
+    "saga": ("l1", "l2"),
+    "liblinear": ("l1", "l2"),
+}
+L1_RATIOS = {"l1": 1.0, "l2": 0.0}
+
+# liblinear ignores warm_start, every C on its path is fitted from zero
+COLD_START_SOLVERS = {"liblinear"}
+
+HYPERPARAMETERS = ("C", "penalty", "solver", "class_weight")
+
+
+def make_model(candidate: dict, max_iter: int, random_state: int = None) -> LogisticRegression:
+    """LogisticRegression for one candidate of the search space"""
+    return LogisticRegression(
+        C=candidate["C"],
+        l1_ratio=L1_RATIOS[candidate["penalty"]],
+        solver=candidate["solver"],
+        class_weight=candidate["class_weight"],
+        max_iter=max_iter,
+        random_state=random_state,
+    )
+
+
+def _rows(X, start: int, stop: int):
+    """Rows start:stop of X without copying them, also for CSR matrices"""
+    if not sp.issparse(X):
+        return X[start:stop]
+    begin, end = X.indptr[start], X.indptr[stop]
+    return sp.csr_matrix(
+        (X.data[begin:end], X.indices[begin:end], X.indptr[start:stop + 1] - begin),
+        shape=(stop - start, X.shape[1]),
+    )
+
+
+# Training matrices memory-mapped once per worker process by `_init_worker`
+_worker_state = {}
+
+
+def _init_worker(X_shared: dict, y_shared: dict, n_fit: int, threads: int):
+    # One BLAS/OpenMP thread per worker when the workers fill the cores
+    _worker_state["threadpool_limits"] = threadpool_limits(limits=threads)
+    _worker_state["X"] = load_shared_matrix(X_shared)
+    _worker_state["y"] = load_shared_matrix(y_shared)
+    _worker_state["n_fit"] = n_fit
+
+
+def _fit_path(settings: dict, Cs: list, n_rows: int, max_iter: int, random_state: int) -> list:
+    """
+    Fits one penalty/solver/class_weight combination along its
+    regularization path on the first `n_rows` training rows, each C
+    warm-started from the previous (smaller) one, and scores every C on
+    the validation rows.
+
+    Returns:
+        list: C, validation ROC-AUC, fit seconds and iterations per C
+    """
+    X, y, n_fit = _worker_state["X"], _worker_state["y"], _worker_state["n_fit"]
+    X_fit, y_fit = _rows(X, 0, n_rows), y[:n_rows]
+    X_val, y_val = _rows(X, n_fit, X.shape[0]), y[n_fit:]
+
+    model = make_model({"C": Cs[0], **settings}, max_iter, random_state)
+    model.set_params(warm_start=settings["solver"] not in COLD_START_SOLVERS)
+
+    results = []
+    for C in sorted(Cs):
+        model.set_params(C=C)
+        start = time.perf_counter()
+        model.fit(X_fit, y_fit)
+        fit_s = time.perf_counter() - start
+        results.append({
+            "C": C,
+            "validation_roc_auc": float(roc_auc_score(y_val, model.predict_proba(X_val)[:, 1])),
+            "fit_s": fit_s,
+            "n_iter": int(np.max(model.n_iter_)),
+        })
+    return results
+
+
+class ModelSearch:
+    """
+    Successive-halving search over the logistic regression search space
+    in params.yaml.
+
+    The last `validation_size` of the training rows is held out for
+    selection; the test split is never seen. Every rung fits the
+    surviving candidates on a prefix of the remaining rows (X_train
+    rows are already shuffled by the split) and keeps the best
+    1/`halving_factor` of them, the last rung using all rows. Candidates
+    that share a penalty, solver and class_weight form one task that
+    walks their C values in ascending order with warm starts, and tasks
+    run on a process pool that memory-maps a single copy of the
+    training matrices (see utils.common.share_matrix). The `cpu_threads`
+    budget caps the number of workers and is split evenly between their
+    BLAS/OpenMP pools.
+    """
+
+    def __init__(self, search_params: ConfigBox, max_iter: int, random_state: int,
+                 n_workers: int, cpu_threads: int, scratch_dir: Path):
+        self.search_params = search_params
+        self.max_iter = max_iter
+        self.random_state = random_state
+        self.n_workers = n_workers or os.cpu_count()
+        self.cpu_threads = cpu_threads or os.cpu_count()
+        self.scratch_dir = Path(scratch_dir)
+
+    def candidates(self) -> tuple:
+        """
+        Grid of the search space.
+
+        Returns:
+            tuple: candidates, and the skipped combinations with the reason
+        """
+        for solver in self.search_params["solver"]:
+            if solver not in SOLVER_PENALTIES:
+                raise ValueError(f"Unknown solver in search space: {solver}")
+        for penalty in self.search_params["penalty"]:
+            if penalty not in L1_RATIOS:
+                raise ValueError(f"Unsupported penalty in search space: {penalty}")
+
+        candidates, skipped = [], []
+        for values in product(*(self.search_params[name] for name in HYPERPARAMETERS)):
+            candidate = dict(zip(HYPERPARAMETERS, values))
+            candidate["C"] = float(candidate["C"])
+            if candidate in candidates:
+                continue
+            if candidate["penalty"] in SOLVER_PENALTIES[candidate["solver"]]:
+                candidates.append(candidate)
+            else:
+                skipped.append({
+                    "params": candidate,
+                    "reason": f"{candidate['solver']} does not support {candidate['penalty']}",
+                })
+        if not candidates:
+            raise ValueError("Search space has no supported penalty/solver combination")
+        return candidates, skipped
+
+    def _rung_rows(self, n_candidates: int, n_fit: int) -> list:
+        """Training rows of each rung, growing by the halving factor"""
+        factor = self.search_params["halving_factor"]
+        n_rungs, remaining = 0, n_candidates
+        while remaining > 1:
+            remaining = math.ceil(remaining / factor)
+            n_rungs += 1
+        n_rungs = max(n_rungs, 1)
+
+        min_rows = min(self.search_params["min_rows"], n_fit)
+        return [
+            max(min_rows, n_fit // factor ** (n_rungs - 1 - rung))
+            for rung in range(n_rungs)
+        ]
+
+    def _run_rung(self, executor: ProcessPoolExecutor, survivors: list, rung: int,
+                  rows: int) -> dict:
+        """
+        Fits and scores the surviving candidates on `rows` rows, one task
+        per regularization path, and sorts them best first.
+        """
+        start = time.perf_counter()
+        paths = {}
+        for entry in survivors:
+            key = tuple(entry["params"][name] for name in HYPERPARAMETERS[1:])
+            paths.setdefault(key, {})[entry["params"]["C"]] = entry
+
+        futures = {
+            executor.submit(
+                _fit_path,
+                dict(zip(HYPERPARAMETERS[1:], key)),
+                sorted(path),
+                rows,
+                self.max_iter,
+                self.random_state,
+            ): path
+            for key, path in paths.items()
+        }
+        for future in as_completed(futures):
+            for result in future.result():
+                futures[future][result["C"]]["scores"].append({
+                    "rung": rung,
+                    "rows": rows,
+                    **{k: v for k, v in result.items() if k != "C"},
+                })
+
+        survivors.sort(key=lambda e: e["scores"][-1]["validation_roc_auc"], reverse=True)
+        best = survivors[0]
+        summary = {
+            "rung": rung,
+            "rows": rows,
+            "candidates": len(survivors),
+            "tasks": len(futures),
+            "wall_s": time.perf_counter() - start,
+            "best_validation_roc_auc": best["scores"][-1]["validation_roc_auc"],
+        }
+        logger.info(
+            f"Rung {rung}: {len(survivors)} candidates in {len(futures)} paths on {rows} rows "
+            f"in {summary['wall_s']:.2f}s, best {best['params']} "
+            f"validation ROC-AUC {summary['best_validation_roc_auc']:.4f}"
+        )
+        return summary
+
+    def run(self, X_train, y_train) -> dict:
+        """
+        Runs the search.
+
+        Returns:
+            dict: the selected candidate, the ranked leaderboard, the
+                rungs and the skipped combinations
+        """
+        start = time.perf_counter()
+        candidates, skipped = self.candidates()
+
+        n_rows = X_train.shape[0]
+        n_val = int(n_rows * self.search_params["validation_size"])
+        n_fit = n_rows - n_val
+        if n_val == 0 or n_fit == 0:
+            raise ValueError(f"{n_rows} training rows are too few for validation_size "
+                             f"{self.search_params['validation_size']}")
+
+        rung_rows = self._rung_rows(len(candidates), n_fit)
+        factor = self.search_params["halving_factor"]
+
+        groups = {tuple(c[name] for name in HYPERPARAMETERS[1:]) for c in candidates}
+        # Never more processes than threads in the budget
+        n_workers = min(self.n_workers, len(groups), self.cpu_threads)
+        threads = max(1, self.cpu_threads // n_workers)
+        logger.info(
+            f"Searching {len(candidates)} candidates ({len(skipped)} unsupported skipped) in "
+            f"{len(rung_rows)} rungs of {rung_rows} rows on {n_workers} workers "
+            f"with {threads} threads each, "
+            f"{n_val} rows held out for validation"
+        )
+
+        entries = [{"params": c, "rung": 0, "scores": []} for c in candidates]
+        survivors = entries
+        rungs = []
+        try:
+            X_shared = share_matrix(X_train, self.scratch_dir, "X")
+            y_shared = share_matrix(y_train, self.scratch_dir, "y")
+            with ProcessPoolExecutor(
+                max_workers=n_workers,
+                initializer=_init_worker,
+                initargs=(X_shared, y_shared, n_fit, threads),
+            ) as executor:
+                for rung, rows in enumerate(rung_rows):
+                    for entry in survivors:
+                        entry["rung"] = rung
+                    # With min_rows, small data can repeat a rung's rows;
+                    # refitting would reproduce the same scores
+                    if rung == 0 or rows != rung_rows[rung - 1]:
+                        rungs.append(self._run_rung(executor, survivors, rung, rows))
+                    survivors = survivors[:math.ceil(len(survivors) / factor)]
+        finally:
+            shutil.rmtree(self.scratch_dir, ignore_errors=True)
+
+        # Further rungs first, then the score of the last fit
+        entries.sort(
+            key=lambda e: (e["rung"], e["scores"][-1]["validation_roc_auc"]),
+            reverse=True,
+        )
+        leaderboard = [
+            {
+                "rank": rank,
+                "params": entry["params"],
+                "rung": entry["rung"],
+                "rows": entry["scores"][-1]["rows"],
+                "validation_roc_auc": entry["scores"][-1]["validation_roc_auc"],
+                "fit_s": sum(score["fit_s"] for score in entry["scores"]),
+                "scores": entry["scores"],
+            }
+            for rank, entry in enumerate(entries, start=1)
+        ]
+
+        return {
+            "metric": "roc_auc",
+            "selected": leaderboard[0]["params"],
+            "n_workers": n_workers,
+            "threads_per_worker": threads,
+            "validation_rows": n_val,
+            "wall_s": time.perf_counter() - start,
+            "rungs": rungs,
+            "leaderboard": leaderboard,
+            "skipped": skipped,
+        }
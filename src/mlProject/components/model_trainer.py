@@ -1,53 +1,465 @@
+import os
+import pickle
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-import numpy as np
-import joblib
 
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import roc_auc_score
+from threadpoolctl import threadpool_limits
 
 from mlProject import logger
+from mlProject.components.cross_validation import CrossValidation
+from mlProject.components.data_transformation import build_preprocessor
+from mlProject.components.incremental_training import IncrementalTraining
+from mlProject.components.model_backends import INCREMENTAL_MODELS, build_model
+from mlProject.components.model_search import ModelSearch, make_model
+from mlProject.components.scorer_export import (
+    FUSABLE_MODELS,
+    PARITY_SAMPLE_ROWS,
+    ScorerExport,
+)
 from mlProject.entity.config_entity import ModelTrainerConfig
-from mlProject.utils.common import read_yaml
-from mlProject.constants import PARAMS_FILE_PATH
+from mlProject.utils.artifact_writer import ArtifactWriter
+from mlProject.utils.common import (
+    read_yaml,
+    save_bin_atomic,
+    save_json,
+    load_json,
+    iter_dataframe,
+    load_matrix,
+    matrix_path,
+    share_matrix,
+    load_shared_matrix,
+)
+from mlProject.constants import PARAMS_FILE_PATH, SCHEMA_PROCESSED_FILE_PATH
+
+
+# Single-row predictions timed per model for the latency report
+SINGLE_ROW_CALLS = 200
+
+# Training matrices memory-mapped once per worker process by `_init_worker`
+_worker_state = {}
+
+
+def _init_worker(X_shared: dict, y_shared: dict):
+    _worker_state["X"] = load_shared_matrix(X_shared)
+    _worker_state["y"] = load_shared_matrix(y_shared)
+
+
+def _fit(model, X, y, n_threads: int, incremental: IncrementalTraining = None) -> tuple:
+    """
+    Fits a model with BLAS and OpenMP limited to `n_threads` threads,
+    out of core through `incremental` when given.
+
+    Returns:
+        tuple: fitted model and training seconds
+    """
+    with threadpool_limits(limits=n_threads):
+        start = time.perf_counter()
+        if incremental is not None:
+            incremental.fit(model, X, y)
+        else:
+            model.fit(X, y)
+    return model, time.perf_counter() - start
+
+
+def _fit_shared(model, n_threads: int, incremental: IncrementalTraining = None) -> tuple:
+    return _fit(model, _worker_state["X"], _worker_state["y"], n_threads, incremental)
 
 
 class ModelTrainer:
-    def __init__(self, config: ModelTrainerConfig):
+    def __init__(self, config: ModelTrainerConfig, writer: ArtifactWriter = None):
         self.config = config
+        self.writer = writer
         self.params = read_yaml(PARAMS_FILE_PATH)
 
     def _load_data(self):
-        X_train = np.load(self.config.train_data_path)
-        X_test = np.load(self.config.test_data_path)
-        y_train = np.load(self.config.y_train)
-        y_test = np.load(self.config.y_test)
+        transformation_params = self.params["data_transformation"]
+        sparse = bool(transformation_params["encoding"]["sparse_output"])
+        # Out-of-core models read the training matrices chunk by chunk
+        mmap = bool(transformation_params["storage"]["mmap"]) or any(
+            name in INCREMENTAL_MODELS for name in self.model_names()
+        )
+
+        X_train = load_matrix(matrix_path(Path(self.config.train_data_path), sparse), mmap)
+        X_test = load_matrix(matrix_path(Path(self.config.test_data_path), sparse), mmap)
+        y_train = load_matrix(Path(self.config.y_train), mmap)
+        y_test = load_matrix(Path(self.config.y_test), mmap)
 
         return X_train, X_test, y_train, y_test
 
-    def initiate_model_training(self):
-        logger.info("Starting model training")
+    def model_names(self) -> list:
+        """The selected model.name, then the other candidates to compare"""
+        model_params = self.params["model"]
+        names = [model_params["name"], *model_params.get("candidates", [])]
+        return list(dict.fromkeys(names))
 
-        X_train, X_test, y_train, y_test = self._load_data()
+    @property
+    def search_enabled(self) -> bool:
+        search = self.params["logistic_regression"].get("search")
+        return bool(search and search["enabled"]) and "logistic_regression" in self.model_names()
 
-        lr_params = self.params["logistic_regression"]
+    @property
+    def warm_start_enabled(self) -> bool:
+        warm_start = self.params.get("warm_start")
+        enabled = bool(warm_start and warm_start["enabled"])
+        return enabled and "logistic_regression" in self.model_names()
+
+    @property
+    def cv_enabled(self) -> bool:
+        cv_params = self.params.get("cross_validation")
+        return bool(cv_params and cv_params["enabled"])
+
+    @property
+    def verifies_scorer(self) -> bool:
+        """Whether the selected model is checked against its fused scorer"""
+        return self.model_names()[0] in FUSABLE_MODELS
+
+    def output_paths(self) -> list:
+        """Artifacts written by initiate_model_training"""
+        paths = [self.config.model_path, self.config.report_path]
+        if self.search_enabled:
+            paths.append(self.config.leaderboard_path)
+        if self.cv_enabled:
+            paths.append(self.config.cv_report_path)
+        return paths
 
-        model = LogisticRegression(
+    def _incremental(self, name: str):
+        """IncrementalTraining of an out-of-core model, None for the others"""
+        if name not in INCREMENTAL_MODELS:
+            return None
+        return IncrementalTraining(self.params[name], self.params["general"]["random_state"])
+
+    def _save_json(self, data: dict, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if self.writer is not None:
+            self.writer.submit(save_json, path, data)
+        else:
+            save_json(path, data)
+
+    def _search(self, X_train, y_train, budget: int):
+        """
+        Runs the hyperparameter search and saves its leaderboard.
+
+        Returns:
+            LogisticRegression: unfitted model with the selected parameters
+        """
+        lr_params = self.params["logistic_regression"]
+        search = ModelSearch(
+            lr_params["search"],
             max_iter=lr_params["max_iter"],
-            class_weight=lr_params["class_weight"],
-            solver=lr_params["solver"]
+            random_state=self.params["general"]["random_state"],
+            n_workers=self.config.n_workers,
+            cpu_threads=budget,
+            scratch_dir=Path(self.config.root_dir) / "search",
         )
+        leaderboard = search.run(X_train, y_train)
+        logger.info(
+            f"Hyperparameter search completed in {leaderboard['wall_s']:.1f}s, selected "
+            f"{leaderboard['selected']} (validation ROC-AUC "
+            f"{leaderboard['leaderboard'][0]['validation_roc_auc']:.4f})"
+        )
+
+        self._save_json(leaderboard, Path(self.config.leaderboard_path))
+
+        return make_model(
+            leaderboard["selected"], lr_params["max_iter"], self.params["general"]["random_state"]
+        )
+
+    def _warm_start(self, model, features: list, n_features: int):
+        """
+        Starts `model` from the coefficients of the previous model.pkl,
+        when that is a logistic regression trained on the same feature
+        layout, as recorded in the previous model report.
+
+        Returns:
+            str: why `model` starts cold, None when it was warm-started
+        """
+        model_path, report_path = Path(self.config.model_path), Path(self.config.report_path)
+        if model.solver == "liblinear":
+            return "the liblinear solver does not warm start"
+        if not model_path.exists() or not report_path.exists():
+            return "there is no previous model"
+
+        previous = joblib.load(model_path)
+        if not isinstance(previous, LogisticRegression):
+            return f"the previous model is a {type(previous).__name__}"
+        previous_features = load_json(report_path).get("features")
+        if previous_features is None:
+            return "the previous model's feature layout was not recorded"
+        if previous_features != features or previous.coef_.shape != (1, n_features):
+            return "the feature layout changed"
+
+        model.set_params(warm_start=True)
+        model.coef_ = previous.coef_.copy()
+        model.intercept_ = previous.intercept_.copy()
+        return None
 
-        model.fit(X_train, y_train)
+    def _compare_cold_start(self, warm, warm_s: float, threads: int, X_train, y_train,
+                            X_test, y_test) -> dict:
+        """Fits `warm` again from scratch to report what warm start saved"""
+        # A clone has the parameters but not the coefficients
+        cold, cold_s = _fit(clone(warm), X_train, y_train, threads)
+        warm_iter, cold_iter = int(np.max(warm.n_iter_)), int(np.max(cold.n_iter_))
+        return {
+            "cold_n_iter": cold_iter,
+            "cold_train_s": cold_s,
+            "cold_roc_auc": float(roc_auc_score(y_test, cold.predict_proba(X_test)[:, 1])),
+            "iterations_saved": cold_iter - warm_iter,
+            "time_saved_s": cold_s - warm_s,
+        }
 
+    def _cross_validate(self, featured_data, model, budget: int):
+        """Cross-validates the preprocessor and `model` and saves the report"""
+        schema = read_yaml(SCHEMA_PROCESSED_FILE_PATH)
+        transformation_params = self.params["data_transformation"]
+        preprocessor = build_preprocessor(
+            self.params, schema, bool(transformation_params["encoding"]["sparse_output"])
+        )
+
+        cross_validation = CrossValidation(
+            self.params["cross_validation"],
+            target_column=schema["target_column"],
+            random_state=self.params["general"]["random_state"],
+            cpu_threads=budget,
+            scratch_dir=Path(self.config.root_dir) / "cross_validation",
+        )
+        report = cross_validation.run(
+            featured_data, preprocessor, model,
+            compact=bool(transformation_params["storage"]["compact"]),
+        )
+        roc_auc = report["summary"]["roc_auc"]
+        logger.info(
+            f"Cross-validation completed in {report['wall_s']:.1f}s. ROC-AUC "
+            f"{roc_auc['mean']:.4f} +/- {roc_auc['std']:.4f}"
+        )
+        self._save_json(report, Path(self.config.cv_report_path))
+
+    def _save_model(self, model, report: dict):
+        """
+        Writes model.pkl, then the report describing it. The next warm
+        start trusts the report's features, so it is only written once
+        the verified model is.
+        """
+        save_bin_atomic(model, Path(self.config.model_path))
+
+        report_path = Path(self.config.report_path)
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        save_json(report_path, report)
+
+    def _verify_scorer(self, model, featured_data, preprocessor):
+        """
+        Checks that the fused scorer reproduces the model before model.pkl
+        is replaced. The new preprocessor.pkl is already written by then,
+        but ModelHolder only loads a set whose model is at least as new as
+        its preprocessor, so a failure here leaves the served set alone.
+
+        Only the first PARITY_SAMPLE_ROWS rows of a featured dataset on
+        disk are read, so the check does not grow with the dataset. It is
+        skipped with a warning when there is no featured dataset.
+        """
+        if not isinstance(featured_data, pd.DataFrame):
+            path = Path(featured_data if featured_data is not None else self.config.featured_data_path)
+            featured_data = None
+            if path.exists():
+                chunks = iter_dataframe(path, PARITY_SAMPLE_ROWS)
+                featured_data = next(chunks, None)
+                chunks.close()
+            if featured_data is None:
+                logger.warning(f"No featured data at {path}, skipping the fused scorer parity check")
+                return
+        if preprocessor is None:
+            preprocessor = joblib.load(Path(self.config.preprocessor_path))
+
+        _, _, max_diff = ScorerExport.verify(preprocessor, model, featured_data)
+        logger.info(f"Fused scorer parity check passed, max abs diff: {max_diff:.3e}")
+
+    def _fit_models(self, models: dict, n_workers: int, threads: int, X_train, y_train) -> dict:
+        """
+        Fits the models, concurrently on `n_workers` processes when there
+        are several. Each process memory-maps the same training matrices
+        and is limited to `threads` threads.
+
+        Returns:
+            dict: name -> (fitted model, training seconds)
+        """
+        if n_workers == 1:
+            return {
+                name: _fit(model, X_train, y_train, threads, self._incremental(name))
+                for name, model in models.items()
+            }
+
+        scratch_dir = Path(self.config.root_dir) / "shared"
+        try:
+            X_shared = share_matrix(X_train, scratch_dir, "X")
+            y_shared = share_matrix(y_train, scratch_dir, "y")
+            with ProcessPoolExecutor(
+                max_workers=n_workers,
+                initializer=_init_worker,
+                initargs=(X_shared, y_shared),
+            ) as executor:
+                futures = {
+                    name: executor.submit(_fit_shared, model, threads, self._incremental(name))
+                    for name, model in models.items()
+                }
+                return {name: future.result() for name, future in futures.items()}
+        finally:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    @staticmethod
+    def _score(model, X_test, y_test) -> dict:
+        """Test ROC-AUC, model size and inference latency of a fitted model"""
+        start = time.perf_counter()
         y_pred_proba = model.predict_proba(X_test)[:, 1]
-        roc_auc = roc_auc_score(y_test, y_pred_proba)
+        batch_s = time.perf_counter() - start
+
+        latencies = []
+        for i in range(min(SINGLE_ROW_CALLS, X_test.shape[0])):
+            start = time.perf_counter()
+            model.predict_proba(X_test[i:i + 1])
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        return {
+            "roc_auc": float(roc_auc_score(y_test, y_pred_proba)),
+            "model_bytes": len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)),
+            "single_row_p50_ms": float(np.percentile(latencies, 50)),
+            "single_row_p99_ms": float(np.percentile(latencies, 99)),
+            "batch_rows_per_s": X_test.shape[0] / batch_s,
+        }
+
+    def initiate_model_training(self, data: tuple = None, featured_data=None, preprocessor=None):
+        """
+        Trains the params.yaml model.name model and scores it on the
+        test split. The models in model.candidates are trained alongside
+        it, concurrently within the cpu_threads budget, which also bounds
+        the search and cross-validation processes, and compared in
+        the model report; only the selected one is saved. Out-of-core
+        models (sgd_logistic) stream the memory-mapped training matrices
+        chunk by chunk instead of fitting them whole. With the search
+        enabled, logistic regression is refitted on the whole training
+        split with the parameters the search selected. With
+        cross-validation enabled, the selected model is first
+        cross-validated on the featured data. With warm start enabled,
+        logistic regression starts from the previous model.pkl when the
+        feature layout is unchanged, and cold otherwise. A model that can
+        be fused is checked against its fused scorer before it is saved.
+
+        Args:
+            data (tuple, optional): X_train, X_test, y_train and y_test
+                arrays. Loaded from the transformation artifacts if omitted.
+            featured_data (Path | pd.DataFrame, optional): featured
+                dataset for cross-validation and the scorer parity check.
+                Read from the feature engineering artifact if omitted.
+            preprocessor (ColumnTransformer, optional): fitted
+                preprocessor, whose feature layout warm start checks and
+                which the scorer parity check compiles.
+                Loaded from the transformation artifact if omitted.
+
+        Returns:
+            tuple: path to the saved model, or with a writer the model
+                itself while the artifact is written, and the test ROC-AUC
+        """
+        budget = self.config.cpu_threads or os.cpu_count()
+        # The search, cross-validation and fitting pools split the budget
+        # between their processes; the limit holds this process's own
+        # scoring and refits to it too
+        with threadpool_limits(limits=budget):
+            return self._train(budget, data, featured_data, preprocessor)
+
+    def _train(self, budget: int, data: tuple, featured_data, preprocessor) -> tuple:
+        logger.info("Starting model training")
+
+        X_train, X_test, y_train, y_test = data if data is not None else self._load_data()
+
+        names = self.model_names()
+        # Models beyond the budget wait for a free process
+        n_workers = min(len(names), budget)
+        threads = max(1, budget // n_workers)
+
+        models = {}
+        for name in names:
+            if name == "logistic_regression" and self.search_enabled:
+                models[name] = self._search(X_train, y_train, budget)
+            else:
+                models[name] = build_model(name, self.params, threads)
+
+        if self.cv_enabled:
+            self._cross_validate(
+                featured_data if featured_data is not None else Path(self.config.featured_data_path),
+                models[names[0]],
+                budget,
+            )
+
+        if self.warm_start_enabled:
+            if preprocessor is None:
+                preprocessor = joblib.load(Path(self.config.preprocessor_path))
+            features = preprocessor.get_feature_names_out().tolist()
+            cold_reason = self._warm_start(
+                models["logistic_regression"], features, X_train.shape[1]
+            )
+            if cold_reason is not None:
+                logger.info(f"Logistic regression starts cold, {cold_reason}")
+            else:
+                logger.info("Logistic regression starts from the previous model's coefficients")
+
+        logger.info(f"Training {names} with {threads} of {budget} threads each")
+        start = time.perf_counter()
+        fitted = self._fit_models(models, n_workers, threads, X_train, y_train)
+        wall_s = time.perf_counter() - start
+
+        report = {"selected": names[0], "cpu_threads": budget, "wall_s": wall_s, "models": {}}
+        if self.warm_start_enabled:
+            model, train_s = fitted["logistic_regression"]
+            model.set_params(warm_start=False)
+            report["features"] = features
+            report["warm_start"] = {
+                "warm": cold_reason is None,
+                "cold_reason": cold_reason,
+                "n_iter": int(np.max(model.n_iter_)),
+                "train_s": train_s,
+            }
+            if cold_reason is None and self.params["warm_start"]["compare_cold_start"]:
+                report["warm_start"].update(self._compare_cold_start(
+                    model, train_s, threads, X_train, y_train, X_test, y_test
+                ))
+            logger.info("Warm start: " + ", ".join(
+                f"{key} {value:.4g}" if isinstance(value, float) else f"{key} {value}"
+                for key, value in report["warm_start"].items()
+            ))
+
+        for name, (model, train_s) in fitted.items():
+            report["models"][name] = {
+                "threads": threads,
+                "train_s": train_s,
+                **self._score(model, X_test, y_test),
+            }
+            logger.info(f"{name}: " + ", ".join(
+                f"{key} {value:.4g}" for key, value in report["models"][name].items()
+            ))
+
+        model = fitted[names[0]][0]
+        roc_auc = report["models"][names[0]]["roc_auc"]
+
+        if self.verifies_scorer:
+            self._verify_scorer(model, featured_data, preprocessor)
 
         logger.info(f"Model training completed. ROC-AUC: {roc_auc:.4f}")
 
         output_path = Path(self.config.model_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        joblib.dump(model, output_path)
+        if self.writer is not None:
+            self.writer.submit(self._save_model, model, report)
+            logger.info(f"Trained model queued for: {output_path}")
+            return model, roc_auc
+
+        self._save_model(model, report)
 
         logger.info(f"Trained model saved at: {output_path}")
 
@@ -0,0 +1,406 @@
+import hashlib
+import math
+import os
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import joblib
+
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.preprocessing import StandardScaler, OneHotEncoder, OrdinalEncoder
+
+from mlProject import logger
+from mlProject.entity.config_entity import ScorerExportConfig
+from mlProject.utils.artifact_writer import ArtifactWriter
+from mlProject.utils.common import save_json, load_dataframe
+
+
+PARITY_SAMPLE_ROWS = 10_000
+PARITY_TOLERANCE = 1e-9
+
+# params.yaml model.name values whose model can be folded into a FusedScorer
+FUSABLE_MODELS = ("logistic_regression", "sgd_logistic")
+
+
+def model_version(preprocessor_bytes: bytes, model_bytes: bytes) -> str:
+    """Identifies the preprocessor.pkl and model.pkl a scorer was compiled from"""
+    return hashlib.blake2b(preprocessor_bytes + model_bytes, digest_size=8).hexdigest()
+
+
+class FusedScorer:
+    """
+    ColumnTransformer + LogisticRegression folded into lookup tables.
+
+    The scaler statistics are absorbed into the numeric weights and every
+    one-hot or ordinal category becomes an additive logit contribution, so
+    scoring is a dot product plus one table gather per categorical column.
+    Each column also carries the contribution of an unknown or null
+    category: 0 for a one-hot column, whose encoder has
+    `handle_unknown="ignore"`, and NaN for an ordinal column, whose
+    encoder raises on unknown categories, so the scorer raises a
+    ValueError too.
+    `model_version` records the preprocessor and model files it was
+    compiled from, so serving only uses it alongside exactly those.
+    """
+
+    def __init__(
+        self,
+        intercept: float,
+        numeric_columns: list,
+        numeric_weights: np.ndarray,
+        categorical_columns: list,
+        categories: list,
+        contributions: list,
+        unknown_contributions: list = None,
+        model_version: str = "",
+    ):
+        self.model_version = model_version
+        self.intercept = float(intercept)
+        self.numeric_columns = list(numeric_columns)
+        self.numeric_weights = np.asarray(numeric_weights, dtype=np.float64)
+        self.categorical_columns = list(categorical_columns)
+        self.categories = [list(cats) for cats in categories]
+        if unknown_contributions is None:
+            unknown_contributions = [0.0] * len(self.categorical_columns)
+        self.unknown_contributions = [float(unknown) for unknown in unknown_contributions]
+        # One trailing slot per table holds the contribution of unknown
+        # categories, which the -1 code from `get_indexer` gathers.
+        self.contributions = [
+            np.append(np.asarray(contrib, dtype=np.float64), unknown)
+            for contrib, unknown in zip(contributions, self.unknown_contributions)
+        ]
+
+        self._numeric_pairs = list(
+            zip(self.numeric_columns, self.numeric_weights.tolist())
+        )
+        self._indexes = [pd.Index(cats) for cats in self.categories]
+        self._lookups = [
+            (col, dict(zip(cats, contrib[:-1].tolist())), None if math.isnan(unknown) else unknown)
+            for col, cats, contrib, unknown in zip(
+                self.categorical_columns,
+                self.categories,
+                self.contributions,
+                self.unknown_contributions,
+            )
+        ]
+
+    def score_record(self, record: dict) -> float:
+        """
+        Churn probability for a single featured customer record.
+
+        Raises:
+            ValueError: if an ordinal column holds an unknown category
+        """
+        z = self.intercept
+        for col, weight in self._numeric_pairs:
+            z += weight * record[col]
+        for col, lookup, unknown in self._lookups:
+            contribution = lookup.get(record[col], unknown)
+            if contribution is None:
+                raise ValueError(f"Found unknown category {record[col]!r} in column {col}")
+            z += contribution
+        return 1.0 / (1.0 + math.exp(-z))
+
+    def score_batch(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Churn probabilities for a featured dataframe.
+
+        Raises:
+            ValueError: if an ordinal column holds an unknown category
+        """
+        z = df[self.numeric_columns].to_numpy(dtype=np.float64) @ self.numeric_weights
+        z += self.intercept
+        for col, index, contrib, unknown in zip(
+            self.categorical_columns,
+            self._indexes,
+            self.contributions,
+            self.unknown_contributions,
+        ):
+            codes = index.get_indexer(df[col])
+            if math.isnan(unknown) and (codes == -1).any():
+                value = df[col].iloc[int(np.argmax(codes == -1))]
+                raise ValueError(f"Found unknown category {value!r} in column {col}")
+            z += contrib[codes]
+        return 1.0 / (1.0 + np.exp(-z))
+
+    def save(self, path: Path):
+        arrays = {
+            "model_version": np.array(self.model_version),
+            "intercept": np.array(self.intercept),
+            "numeric_columns": np.array(self.numeric_columns, dtype=str),
+            "numeric_weights": self.numeric_weights,
+            "categorical_columns": np.array(self.categorical_columns, dtype=str),
+            "unknown_contributions": np.array(self.unknown_contributions, dtype=np.float64),
+        }
+        for i, (cats, contrib) in enumerate(zip(self.categories, self.contributions)):
+            arrays[f"categories_{i}"] = np.array(cats, dtype=str)
+            arrays[f"contributions_{i}"] = contrib[:-1]
+
+        # Renamed into place so a serving process never reads half a file
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path) -> "FusedScorer":
+        """
+        Args:
+            path (Path | file-like): saved scorer
+        """
+        with np.load(path) as arrays:
+            categorical_columns = arrays["categorical_columns"].tolist()
+            return cls(
+                model_version=(
+                    arrays["model_version"].item() if "model_version" in arrays.files else ""
+                ),
+                intercept=arrays["intercept"].item(),
+                numeric_columns=arrays["numeric_columns"].tolist(),
+                numeric_weights=arrays["numeric_weights"],
+                categorical_columns=categorical_columns,
+                categories=[
+                    arrays[f"categories_{i}"].tolist()
+                    for i in range(len(categorical_columns))
+                ],
+                contributions=[
+                    arrays[f"contributions_{i}"]
+                    for i in range(len(categorical_columns))
+                ],
+                unknown_contributions=(
+                    arrays["unknown_contributions"].tolist()
+                    if "unknown_contributions" in arrays.files else None
+                ),
+            )
+
+    @classmethod
+    def load_matching(cls, path, preprocessor_bytes: bytes, model_bytes: bytes):
+        """
+        Loads the scorer if it was compiled from the given preprocessor
+        and model files.
+
+        Args:
+            path (Path | file-like): saved scorer
+            preprocessor_bytes (bytes): contents of preprocessor.pkl
+            model_bytes (bytes): contents of model.pkl
+
+        Returns:
+            FusedScorer | None: the scorer, or None if it belongs to
+            other artifacts
+        """
+        scorer = cls.load(path)
+        if scorer.model_version != model_version(preprocessor_bytes, model_bytes):
+            return None
+        return scorer
+
+
+class ScorerExport:
+    def __init__(self, config: ScorerExportConfig, writer: ArtifactWriter = None):
+        self.config = config
+        self.writer = writer
+
+    @staticmethod
+    def compile(preprocessor, model) -> FusedScorer:
+        """
+        Folds a fitted ColumnTransformer and a binary LogisticRegression,
+        or an SGDClassifier with the logistic loss, into a FusedScorer.
+
+        Args:
+            preprocessor: fitted ColumnTransformer from DataTransformation
+            model: fitted LogisticRegression or SGDClassifier from ModelTrainer
+
+        Returns:
+            FusedScorer: equivalent scorer over the featured columns
+        """
+        logistic = isinstance(model, LogisticRegression) or (
+            isinstance(model, SGDClassifier) and model.loss == "log_loss"
+        )
+        if not logistic:
+            raise ValueError(
+                f"Cannot fuse a {type(model).__name__}, only a logistic regression"
+            )
+
+        # SGDClassifier keeps float32 weights when trained on float32 input
+        coef = model.coef_.ravel().astype(np.float64)
+        intercept = float(model.intercept_[0])
+
+        numeric_columns, numeric_weights = [], []
+        categorical_columns, categories, contributions = [], [], []
+        unknown_contributions = []
+
+        for name, transformer, columns in preprocessor.transformers_:
+            if transformer == "drop":
+                continue
+
+            weights = coef[preprocessor.output_indices_[name]]
+
+            if transformer == "passthrough" or isinstance(transformer, StandardScaler):
+                if transformer == "passthrough":
+                    mean, scale = np.zeros(len(columns)), np.ones(len(columns))
+                else:
+                    mean = transformer.mean_ if transformer.with_mean else np.zeros(len(columns))
+                    scale = transformer.scale_ if transformer.with_std else np.ones(len(columns))
+
+                numeric_columns.extend(columns)
+                numeric_weights.extend(weights / scale)
+                intercept -= float(np.sum(weights * mean / scale))
+
+            elif isinstance(transformer, OneHotEncoder):
+                drop_idx = transformer.drop_idx_
+                offset = 0
+                for i, (col, cats) in enumerate(zip(columns, transformer.categories_)):
+                    dropped = None if drop_idx is None else drop_idx[i]
+                    contrib = np.zeros(len(cats))
+                    for j in range(len(cats)):
+                        if dropped is not None and j == dropped:
+                            continue
+                        contrib[j] = weights[offset]
+                        offset += 1
+
+                    categorical_columns.append(col)
+                    categories.append(cats.tolist())
+                    contributions.append(contrib)
+                    # Encoded as all zeros unless the encoder raises
+                    unknown_contributions.append(
+                        math.nan if transformer.handle_unknown == "error" else 0.0
+                    )
+
+            elif isinstance(transformer, OrdinalEncoder):
+                for i, (col, cats) in enumerate(zip(columns, transformer.categories_)):
+                    categorical_columns.append(col)
+                    categories.append(cats.tolist())
+                    contributions.append(np.arange(len(cats)) * weights[i])
+                    # NaN makes the scorer raise like the encoder does
+                    if transformer.handle_unknown == "use_encoded_value":
+                        unknown_contributions.append(transformer.unknown_value * weights[i])
+                    else:
+                        unknown_contributions.append(math.nan)
+
+            else:
+                raise ValueError(
+                    f"Cannot fuse transformer '{name}' of type {type(transformer).__name__}"
+                )
+
+        return FusedScorer(
+            intercept=intercept,
+            numeric_columns=numeric_columns,
+            numeric_weights=np.array(numeric_weights),
+            categorical_columns=categorical_columns,
+            categories=categories,
+            contributions=contributions,
+            unknown_contributions=unknown_contributions,
+        )
+
+    @staticmethod
+    def _check_parity(scorer: FusedScorer, preprocessor, model, df: pd.DataFrame) -> float:
+        expected = model.predict_proba(preprocessor.transform(df))[:, 1]
+
+        batch_diff = float(np.max(np.abs(scorer.score_batch(df) - expected)))
+
+        records = df.head(1000).to_dict(orient="records")
+        record_scores = np.array([scorer.score_record(r) for r in records])
+        record_diff = float(np.max(np.abs(record_scores - expected[:len(records)])))
+
+        max_diff = max(batch_diff, record_diff)
+        if max_diff > PARITY_TOLERANCE:
+            raise ValueError(
+                f"Fused scorer disagrees with sklearn by {max_diff:.3e} "
+                f"(tolerance {PARITY_TOLERANCE:.0e})"
+            )
+
+        return max_diff
+
+    @classmethod
+    def verify(cls, preprocessor, model, featured_data: pd.DataFrame) -> tuple:
+        """
+        Compiles the preprocessor and model and checks the fused scorer
+        against them on a sample of the featured data. ModelTrainer calls
+        this before it writes model.pkl, so a model the scorer cannot
+        reproduce never replaces the served one.
+
+        Args:
+            preprocessor: fitted ColumnTransformer from DataTransformation
+            model: fitted LogisticRegression or SGDClassifier from ModelTrainer
+            featured_data (pd.DataFrame): featured dataset
+
+        Returns:
+            tuple: the FusedScorer, the parity sample and the largest
+                absolute difference from sklearn
+
+        Raises:
+            ValueError: if the scorer cannot be compiled or disagrees
+                with sklearn by more than PARITY_TOLERANCE
+        """
+        scorer = cls.compile(preprocessor, model)
+        df = featured_data.sample(n=min(len(featured_data), PARITY_SAMPLE_ROWS), random_state=0)
+        return scorer, df, cls._check_parity(scorer, preprocessor, model, df)
+
+    def _save(self, scorer: FusedScorer, output_path: Path):
+        # Stamped when written, after the writer has saved model.pkl
+        scorer.model_version = model_version(
+            Path(self.config.preprocessor_path).read_bytes(),
+            Path(self.config.model_path).read_bytes(),
+        )
+        scorer.save(output_path)
+
+    @staticmethod
+    def _benchmark(scorer: FusedScorer, df: pd.DataFrame) -> dict:
+        record = df.iloc[0].to_dict()
+        n_calls = 10_000
+        start = time.perf_counter()
+        for _ in range(n_calls):
+            scorer.score_record(record)
+        single_row_us = (time.perf_counter() - start) / n_calls * 1e6
+
+        start = time.perf_counter()
+        scorer.score_batch(df)
+        batch_rows_per_sec = len(df) / (time.perf_counter() - start)
+
+        return {
+            "single_row_latency_us": single_row_us,
+            "batch_rows_per_sec": batch_rows_per_sec,
+        }
+
+    def initiate_scorer_export(self, preprocessor=None, model=None, featured_data=None) -> Path:
+        """
+        Compiles the trained preprocessor and model into a fused scorer,
+        verifies it against the sklearn path and saves it.
+
+        Args:
+            preprocessor (optional): fitted preprocessor, loaded if omitted
+            model (optional): trained model, loaded if omitted
+            featured_data (pd.DataFrame, optional): featured dataset for
+                the parity check, loaded if omitted
+
+        Returns:
+            Path: path to the exported scorer
+        """
+        logger.info("Starting scorer export")
+
+        if preprocessor is None:
+            preprocessor = joblib.load(self.config.preprocessor_path)
+        if model is None:
+            model = joblib.load(self.config.model_path)
+
+        if featured_data is None:
+            featured_data = load_dataframe(Path(self.config.featured_data_path))
+
+        scorer, df, max_diff = self.verify(preprocessor, model, featured_data)
+        logger.info(f"Fused scorer parity check passed, max abs diff: {max_diff:.3e}")
+
+        report = {"parity_max_abs_diff": max_diff, **self._benchmark(scorer, df)}
+        logger.info(f"Fused scorer benchmark: {report}")
+
+        output_path = Path(self.config.scorer_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        if self.writer is not None:
+            self.writer.submit(self._save, scorer, output_path)
+            self.writer.submit(save_json, Path(self.config.report_path), report)
+        else:
+            self._save(scorer, output_path)
+            save_json(Path(self.config.report_path), report)
+
+        logger.info(f"Scorer export completed. Scorer saved at: {output_path}")
+
+        return output_path
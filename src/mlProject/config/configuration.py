@@ -10,6 +10,14 @@ from mlProject.entity.config_entity import (
     DataTransformationConfig,
     ModelTrainerConfig,
     ModelEvaluationConfig,
+    ScorerExportConfig,
+    ModelServingConfig,
+    MicroBatchingConfig,
+    PredictionCacheConfig,
+    BatchPredictionConfig,
+    StageCacheConfig,
+    TrainingPipelineConfig,
+    PipelineProfileConfig,
 )
 
 from mlProject.utils.common import create_directories
@@ -39,6 +47,10 @@ class ConfigurationManager:
             root_dir=Path(config["root_dir"]),
             source_data_path=Path(config["source_data_path"]),
             local_data_file=Path(config["local_data_file"]),
+            incremental=bool(config["incremental"]),
+            source_data_dir=Path(config["source_data_dir"]),
+            state_dir=Path(config["state_dir"]),
+            delta_data_file=Path(config["delta_data_file"]),
         )
 
     # ================================
@@ -55,6 +67,7 @@ class ConfigurationManager:
             schema_raw=Path(config["schema_raw"]),
             schema_processed=Path(config["schema_processed"]),
             validation_report=Path(config["validation_report"]),
+            chunk_size=int(config["chunk_size"]),
         )
 
     # ================================
@@ -78,11 +91,16 @@ class ConfigurationManager:
     def get_feature_engineering_config(self) -> FeatureEngineeringConfig:
         config = self.config["feature_engineering"]
 
-        create_directories([config["root_dir"]])
+        create_directories([
+            config["root_dir"],
+            Path(config["feature_transformer_path"]).parent,
+        ])
 
         return FeatureEngineeringConfig(
             root_dir=Path(config["root_dir"]),
             featured_data_path=Path(config["featured_data_path"]),
+            feature_transformer_path=Path(config["feature_transformer_path"]),
+            partitions_dir=Path(config["partitions_dir"]),
         )
 
     # ================================
@@ -101,6 +119,8 @@ class ConfigurationManager:
             y_train=Path(config["y_train"]),
             y_test=Path(config["y_test"]),
             preprocessor_path=Path(config["preprocessor_path"]),
+            streaming=bool(config["streaming"]),
+            chunk_size=int(config["chunk_size"]),
         )
 
     # ================================
@@ -115,10 +135,17 @@ class ConfigurationManager:
         return ModelTrainerConfig(
             root_dir=Path(config["root_dir"]),
             model_path=Path(config["model_path"]),
+            leaderboard_path=Path(config["leaderboard_path"]),
+            report_path=Path(config["report_path"]),
+            cv_report_path=Path(config["cv_report_path"]),
+            featured_data_path=Path(config["featured_data_path"]),
+            preprocessor_path=Path(config["preprocessor_path"]),
             train_data_path=Path(config["train_data_path"]),
             test_data_path=Path(config["test_data_path"]),
             y_train=Path(config["y_train"]),
-            y_test=Path(config["y_test"])
+            y_test=Path(config["y_test"]),
+            n_workers=int(config["n_workers"]),
+            cpu_threads=int(config["cpu_threads"])
         )
 
     # ================================
@@ -137,3 +164,130 @@ class ConfigurationManager:
             y_test=Path(config["y_test"]),
             metrics_path=Path(config["metrics_path"])
         )
+
+    # ================================
+    # Scorer Export
+    # ================================
+
+    def get_scorer_export_config(self) -> ScorerExportConfig:
+        config = self.config["scorer_export"]
+
+        create_directories([config["root_dir"]])
+
+        return ScorerExportConfig(
+            root_dir=Path(config["root_dir"]),
+            model_path=Path(config["model_path"]),
+            preprocessor_path=Path(config["preprocessor_path"]),
+            featured_data_path=Path(config["featured_data_path"]),
+            scorer_path=Path(config["scorer_path"]),
+            report_path=Path(config["report_path"]),
+        )
+
+    # ================================
+    # Model Serving
+    # ================================
+
+    def get_model_serving_config(self) -> ModelServingConfig:
+        config = self.config["model_serving"]
+
+        return ModelServingConfig(
+            model_path=Path(config["model_path"]),
+            preprocessor_path=Path(config["preprocessor_path"]),
+            feature_transformer_path=Path(config["feature_transformer_path"]),
+            scorer_path=Path(config["scorer_path"]),
+            hot_reload=bool(config["hot_reload"]),
+            reload_interval_seconds=float(config["reload_interval_seconds"]),
+            host=str(config["host"]),
+            port=int(config["port"]),
+            workers=int(config["workers"]),
+        )
+
+    # ================================
+    # Micro-Batching
+    # ================================
+
+    def get_micro_batching_config(self) -> MicroBatchingConfig:
+        config = self.config["micro_batching"]
+
+        return MicroBatchingConfig(
+            enabled=bool(config["enabled"]),
+            max_batch_size=int(config["max_batch_size"]),
+            max_wait_ms=float(config["max_wait_ms"]),
+        )
+
+    # ================================
+    # Prediction Cache
+    # ================================
+
+    def get_prediction_cache_config(self) -> PredictionCacheConfig:
+        config = self.config["prediction_cache"]
+
+        return PredictionCacheConfig(
+            enabled=bool(config["enabled"]),
+            max_entries=int(config["max_entries"]),
+            ttl_seconds=float(config["ttl_seconds"]),
+            check_interval_seconds=float(config["check_interval_seconds"]),
+        )
+
+    # ================================
+    # Batch Prediction
+    # ================================
+
+    def get_batch_prediction_config(self) -> BatchPredictionConfig:
+        config = self.config["batch_prediction"]
+
+        create_directories([config["root_dir"]])
+
+        return BatchPredictionConfig(
+            root_dir=Path(config["root_dir"]),
+            input_path=Path(config["input_path"]),
+            output_path=Path(config["output_path"]),
+            model_path=Path(config["model_path"]),
+            preprocessor_path=Path(config["preprocessor_path"]),
+            feature_transformer_path=Path(config["feature_transformer_path"]),
+            scorer_path=Path(config["scorer_path"]),
+            chunk_size_mb=float(config["chunk_size_mb"]),
+            n_workers=int(config["n_workers"]),
+        )
+
+    # ================================
+    # Stage Cache
+    # ================================
+
+    def get_stage_cache_config(self) -> StageCacheConfig:
+        config = self.config["stage_cache"]
+
+        create_directories([config["root_dir"]])
+
+        return StageCacheConfig(
+            root_dir=Path(config["root_dir"]),
+            enabled=bool(config["enabled"]),
+            max_entries_per_stage=int(config["max_entries_per_stage"]),
+        )
+
+    # ================================
+    # Training Pipeline
+    # ================================
+
+    def get_training_pipeline_config(self) -> TrainingPipelineConfig:
+        config = self.config["training_pipeline"]
+
+        return TrainingPipelineConfig(
+            in_memory=bool(config["in_memory"]),
+            artifact_writes=str(config["artifact_writes"]),
+        )
+
+    # ================================
+    # Pipeline Profile
+    # ================================
+
+    def get_pipeline_profile_config(self) -> PipelineProfileConfig:
+        config = self.config["pipeline_profile"]
+
+        return PipelineProfileConfig(
+            enabled=bool(config["enabled"]),
+            profile_path=Path(config["profile_path"]),
+            dump_dir=Path(config["dump_dir"]),
+            profile_stage=config["profile_stage"],
+            profile_mode=str(config["profile_mode"]),
+        )
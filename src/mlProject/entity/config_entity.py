@@ -11,6 +11,10 @@ class DataIngestionConfig:
     root_dir: Path
     source_data_path: Path
     local_data_file: Path
+    incremental: bool
+    source_data_dir: Path
+    state_dir: Path
+    delta_data_file: Path
 
 
 # ================================
@@ -23,6 +27,7 @@ class DataValidationConfig:
     schema_raw: Path
     schema_processed: Path
     validation_report: Path
+    chunk_size: int
 
 
 # ================================
@@ -43,6 +48,8 @@ class DataCleaningConfig:
 class FeatureEngineeringConfig:
     root_dir: Path
     featured_data_path: Path
+    feature_transformer_path: Path
+    partitions_dir: Path
 
 
 # ================================
@@ -57,6 +64,8 @@ class DataTransformationConfig:
     y_train: Path
     y_test: Path
     preprocessor_path: Path
+    streaming: bool
+    chunk_size: int
 
 
 # ================================
@@ -67,10 +76,17 @@ class DataTransformationConfig:
 class ModelTrainerConfig:
     root_dir: Path
     model_path: Path
+    leaderboard_path: Path
+    report_path: Path
+    cv_report_path: Path
+    featured_data_path: Path
+    preprocessor_path: Path
     train_data_path: Path
     test_data_path: Path
     y_train: Path
     y_test: Path
+    n_workers: int
+    cpu_threads: int
 
 
 # ================================
@@ -84,3 +100,108 @@ class ModelEvaluationConfig:
     test_data_path: Path
     y_test: Path
     metrics_path: Path
+
+
+# ================================
+# Scorer Export Config
+# ================================
+
+@dataclass(frozen=True)
+class ScorerExportConfig:
+    root_dir: Path
+    model_path: Path
+    preprocessor_path: Path
+    featured_data_path: Path
+    scorer_path: Path
+    report_path: Path
+
+
+# ================================
+# Model Serving Config
+# ================================
+
+@dataclass(frozen=True)
+class ModelServingConfig:
+    model_path: Path
+    preprocessor_path: Path
+    feature_transformer_path: Path
+    scorer_path: Path
+    hot_reload: bool
+    reload_interval_seconds: float
+    host: str
+    port: int
+    workers: int
+
+
+# ================================
+# Micro-Batching Config
+# ================================
+
+@dataclass(frozen=True)
+class MicroBatchingConfig:
+    enabled: bool
+    max_batch_size: int
+    max_wait_ms: float
+
+
+# ================================
+# Prediction Cache Config
+# ================================
+
+@dataclass(frozen=True)
+class PredictionCacheConfig:
+    enabled: bool
+    max_entries: int
+    ttl_seconds: float
+    check_interval_seconds: float
+
+
+# ================================
+# Batch Prediction Config
+# ================================
+
+@dataclass(frozen=True)
+class BatchPredictionConfig:
+    root_dir: Path
+    input_path: Path
+    output_path: Path
+    model_path: Path
+    preprocessor_path: Path
+    feature_transformer_path: Path
+    scorer_path: Path
+    chunk_size_mb: float
+    n_workers: int
+
+
+# ================================
+# Stage Cache Config
+# ================================
+
+@dataclass(frozen=True)
+class StageCacheConfig:
+    root_dir: Path
+    enabled: bool
+    max_entries_per_stage: int
+
+
+# ================================
+# Training Pipeline Config
+# ================================
+
+@dataclass(frozen=True)
+class TrainingPipelineConfig:
+    in_memory: bool
+    artifact_writes: str
+
+
+# ================================
+# Pipeline Profile Config
+# ================================
+
+@dataclass(frozen=True)
+class PipelineProfileConfig:
+    enabled: bool
+    profile_path: Path
+    dump_dir: Path
+    profile_stage: str
+    profile_mode: str
@@ -0,0 +1,161 @@
+import io
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import joblib
+import pandas as pd
+
+from mlProject import logger
+from mlProject.components.data_cleaning import DataCleaning
+from mlProject.components.scorer_export import FusedScorer
+from mlProject.constants import PARAMS_FILE_PATH, SCHEMA_RAW_FILE_PATH
+from mlProject.entity.config_entity import BatchPredictionConfig
+from mlProject.utils.common import read_yaml, read_dataset
+
+
+# Artifacts loaded once per worker process by `_init_worker`
+_worker_state = {}
+
+
+def _init_worker(config: BatchPredictionConfig, identifier_column: str, threshold: float):
+    _worker_state["schema"] = read_yaml(SCHEMA_RAW_FILE_PATH)
+    preprocessor_bytes = Path(config.preprocessor_path).read_bytes()
+    model_bytes = Path(config.model_path).read_bytes()
+    _worker_state["preprocessor"] = joblib.load(io.BytesIO(preprocessor_bytes))
+    _worker_state["model"] = joblib.load(io.BytesIO(model_bytes))
+    _worker_state["feature_transformer"] = joblib.load(config.feature_transformer_path)
+    # The fused scorer only stands in for the exact model it was compiled from
+    _worker_state["scorer"] = None
+    if Path(config.scorer_path).exists():
+        _worker_state["scorer"] = FusedScorer.load_matching(
+            config.scorer_path, preprocessor_bytes, model_bytes
+        )
+    _worker_state["identifier_column"] = identifier_column
+    _worker_state["threshold"] = threshold
+
+
+def _score_block(header: bytes, block: bytes) -> tuple:
+    """
+    Parses, cleans, engineers and scores one block of CSV lines.
+
+    Returns:
+        tuple: (result CSV bytes without header, rows in, rows scored)
+    """
+    identifier_column = _worker_state["identifier_column"]
+
+    df = read_dataset(io.BytesIO(header + block), _worker_state["schema"])
+    rows_in = len(df)
+
+    # Customers with a blank TotalCharges are scored, as online, not dropped
+    df = DataCleaning.clean(df, drop_identifier=False, fill_blank_total_charges=True)
+    if df.empty:
+        return b"", rows_in, 0
+
+    df = _worker_state["feature_transformer"].transform(df)
+
+    if _worker_state["scorer"] is not None:
+        probabilities = _worker_state["scorer"].score_batch(df)
+    else:
+        X = _worker_state["preprocessor"].transform(df)
+        probabilities = _worker_state["model"].predict_proba(X)[:, 1]
+
+    result = pd.DataFrame({
+        identifier_column: df[identifier_column].to_numpy(),
+        "churn_probability": probabilities,
+        "churn": (probabilities >= _worker_state["threshold"]).astype(int),
+    })
+
+    return result.to_csv(index=False, header=False).encode(), rows_in, len(result)
+
+
+class BatchPredictionPipeline:
+    """
+    Scores customer files of any size with bounded memory.
+
+    The input is read as blocks of whole CSV lines. Each block is parsed,
+    cleaned, feature-engineered and scored in a worker process, through
+    the fused scorer when it was exported from the loaded model, and the
+    results are appended to the output in input order. At most two blocks
+    per worker are in flight, so memory does not grow with the file.
+    Every row is scored: a blank TotalCharges is scored as
+    `BLANK_TOTAL_CHARGES`, as the online PredictionPipeline does.
+    Quoted fields must not contain newlines, which holds for the Telco
+    extract layout.
+    """
+
+    def __init__(self, config: BatchPredictionConfig):
+        self.config = config
+
+        schema = read_yaml(SCHEMA_RAW_FILE_PATH)
+        self.identifier_column = schema["identifier_column"]
+        self.threshold = read_yaml(PARAMS_FILE_PATH)["threshold"]["default"]
+
+    def _read_blocks(self, f):
+        block_bytes = int(self.config.chunk_size_mb * 1024 * 1024)
+        while True:
+            block = f.read(block_bytes)
+            if not block:
+                return
+            # Complete the last line so every block holds whole records
+            block += f.readline()
+            yield block
+
+    def run(self, input_path: Path = None, output_path: Path = None) -> Path:
+        """
+        Scores a raw customer CSV and writes customerID, churn_probability
+        and churn for every scored row.
+
+        Args:
+            input_path (Path, optional): CSV in the raw dataset layout
+            output_path (Path, optional): where predictions are written
+
+        Returns:
+            Path: path to the predictions file
+        """
+        input_path = Path(input_path or self.config.input_path)
+        output_path = Path(output_path or self.config.output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        n_workers = self.config.n_workers or os.cpu_count()
+        max_in_flight = 2 * n_workers
+
+        logger.info(f"Starting batch prediction of {input_path} with {n_workers} workers")
+        start = time.perf_counter()
+        rows_in, rows_out = 0, 0
+
+        def write_result(future):
+            nonlocal rows_in, rows_out
+            data, block_rows_in, block_rows_out = future.result()
+            out.write(data)
+            rows_in += block_rows_in
+            rows_out += block_rows_out
+
+        with open(input_path, "rb") as f, open(output_path, "wb") as out, \
+                ProcessPoolExecutor(
+                    max_workers=n_workers,
+                    initializer=_init_worker,
+                    initargs=(self.config, self.identifier_column, self.threshold),
+                ) as executor:
+            header = f.readline()
+            out.write(f"{self.identifier_column},churn_probability,churn\n".encode())
+
+            in_flight = deque()
+            for block in self._read_blocks(f):
+                in_flight.append(executor.submit(_score_block, header, block))
+                if len(in_flight) >= max_in_flight:
+                    write_result(in_flight.popleft())
+
+            while in_flight:
+                write_result(in_flight.popleft())
+
+        elapsed = time.perf_counter() - start
+        logger.info(
+            f"Batch prediction completed in {elapsed:.1f}s: scored {rows_out} of "
+            f"{rows_in} rows ({rows_in / elapsed:,.0f} rows/s)"
+        )
+        logger.info(f"Predictions saved at: {output_path}")
+
+        return output_path
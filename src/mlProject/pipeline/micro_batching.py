@@ -0,0 +1,186 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Callable
+
+import numpy as np
+
+from mlProject import logger
+from mlProject.entity.config_entity import MicroBatchingConfig
+
+
+LATENCY_WINDOW = 10_000
+
+
+class MicroBatcher:
+    """
+    Queues single-customer requests and scores them in windows.
+
+    A window closes after `max_wait_ms` or once `max_batch_size` requests
+    are queued, whichever comes first. The window is scored with one call
+    to `score_fn` and the results are handed back to the waiting callers.
+    """
+
+    def __init__(self, config: MicroBatchingConfig, score_fn: Callable[[list], list]):
+        self.config = config
+        self.score_fn = score_fn
+
+        self._queue = None
+        self._loop = None
+        self._worker = None
+
+        self._lock = threading.Lock()
+        self._batch_sizes = {}
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._requests = 0
+        self._batches = 0
+
+    # ================================
+    # Lifecycle
+    # ================================
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+        logger.info(
+            f"Micro-batcher started (max_batch_size={self.config.max_batch_size}, "
+            f"max_wait_ms={self.config.max_wait_ms})"
+        )
+
+    async def stop(self):
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+
+    def start_in_thread(self) -> threading.Thread:
+        """
+        Runs the batcher on its own event loop in a daemon thread, so it
+        can be fed from a synchronous server such as Flask.
+        """
+        started = threading.Event()
+
+        def run():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(self.start())
+            started.set()
+            loop.run_forever()
+
+        thread = threading.Thread(target=run, name="micro-batcher", daemon=True)
+        thread.start()
+        started.wait()
+        return thread
+
+    # ================================
+    # Submission
+    # ================================
+
+    async def submit(self, record: dict) -> dict:
+        """
+        Scores one customer record as part of the next window.
+        """
+        future = self._loop.create_future()
+        await self._queue.put((record, future, time.perf_counter()))
+        return await future
+
+    def submit_threadsafe(self, record: dict, timeout: float = None) -> dict:
+        """
+        Blocking `submit` for callers outside the batcher's event loop.
+        """
+        return asyncio.run_coroutine_threadsafe(
+            self.submit(record), self._loop
+        ).result(timeout)
+
+    # ================================
+    # Batching
+    # ================================
+
+    async def _collect(self) -> list:
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.config.max_wait_ms / 1000
+
+        while len(batch) < self.config.max_batch_size:
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    def _score_window(self, records: list) -> list:
+        try:
+            return [(True, result) for result in self.score_fn(records)]
+        except Exception:
+            if len(records) == 1:
+                raise
+            # Isolate the bad records instead of failing the whole window
+            outcomes = []
+            for record in records:
+                try:
+                    outcomes.append((True, self.score_fn([record])[0]))
+                except Exception as e:
+                    outcomes.append((False, e))
+            return outcomes
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            records = [record for record, _, _ in batch]
+
+            try:
+                outcomes = await self._loop.run_in_executor(
+                    None, self._score_window, records
+                )
+            except Exception as e:
+                outcomes = [(False, e)] * len(batch)
+
+            finished = time.perf_counter()
+            for (_, future, _), (ok, result) in zip(batch, outcomes):
+                if future.done():
+                    continue
+                if ok:
+                    future.set_result(result)
+                else:
+                    future.set_exception(result)
+
+            self._record_batch(len(batch), [finished - submitted for _, _, submitted in batch])
+
+    # ================================
+    # Metrics
+    # ================================
+
+    def _record_batch(self, size: int, latencies: list):
+        bucket = 1
+        while bucket < size:
+            bucket *= 2
+
+        with self._lock:
+            self._batch_sizes[bucket] = self._batch_sizes.get(bucket, 0) + 1
+            self._latencies.extend(latencies)
+            self._requests += size
+            self._batches += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            latencies_ms = np.array(self._latencies) * 1000
+            batch_sizes = dict(self._batch_sizes)
+            requests, batches = self._requests, self._batches
+
+        return {
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "requests": requests,
+            "batches": batches,
+            "batch_size_histogram": {
+                f"<={bucket}": count
+                for bucket, count in sorted(batch_sizes.items())
+            },
+            "latency_p50_ms": float(np.percentile(latencies_ms, 50)) if latencies_ms.size else None,
+            "latency_p99_ms": float(np.percentile(latencies_ms, 99)) if latencies_ms.size else None,
+        }
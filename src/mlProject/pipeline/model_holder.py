@@ -0,0 +1,230 @@
+import hashlib
+import io
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+import joblib
+from sklearn.pipeline import Pipeline
+
+from mlProject import logger
+from mlProject.components.scorer_export import FusedScorer
+from mlProject.entity.config_entity import ModelServingConfig
+
+
+@dataclass(frozen=True)
+class ModelBundle:
+    feature_transformer: Any
+    preprocessor: Any
+    model: Any
+    pipeline: Pipeline
+    scorer: Any
+    version: str
+    loaded_at: float
+
+
+class ModelHolder:
+    """
+    Holds the serving artifacts and swaps in retrained ones without a restart.
+
+    A background thread polls the artifact files. A new set is loaded only
+    once it is complete, i.e. the model is at least as new as the
+    preprocessor and the preprocessor at least as new as the feature
+    transformer, which is the order TrainingPipeline writes them in. The
+    new bundle is built off to the side and published with a single
+    reference assignment, so a batch that read `holder.bundle` keeps a
+    consistent set of artifacts until it finishes. The fused scorer is
+    part of the bundle when scorer.npz was compiled from exactly the
+    loaded preprocessor and model, and None otherwise, e.g. for a model
+    that cannot be fused or while a retrain has yet to export it. The files are stat-ed
+    again after they are read, and a bundle whose files changed in the
+    meantime, which may pair a new preprocessor with the old model, is
+    discarded and loaded again on the next poll.
+    """
+
+    def __init__(self, config: ModelServingConfig, on_swap: Callable[[ModelBundle], None] = None):
+        self.config = config
+        self.on_swap = on_swap
+        self.paths = [
+            self.config.feature_transformer_path,
+            self.config.preprocessor_path,
+            self.config.model_path,
+        ]
+
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.reloads = 0
+        self.failed_reloads = 0
+        self.last_load_seconds = None
+        self.last_swap_latency_ms = None
+
+        while True:
+            self._stamp = self._read_stamp()
+            self.bundle = self._load_unchanged(self._stamp)
+            if self.bundle is not None:
+                break
+            time.sleep(self.config.reload_interval_seconds)
+
+    # ================================
+    # Loading
+    # ================================
+
+    def _read_stamp(self) -> tuple:
+        stamp = [
+            (os.stat(path).st_mtime_ns, os.stat(path).st_size) for path in self.paths
+        ]
+        # The scorer is optional, and is exported after the model
+        try:
+            scorer_stat = os.stat(self.config.scorer_path)
+            stamp.append((scorer_stat.st_mtime_ns, scorer_stat.st_size))
+        except FileNotFoundError:
+            stamp.append(None)
+        return tuple(stamp)
+
+    def _load(self) -> ModelBundle:
+        contents = [path.read_bytes() for path in self.paths]
+        try:
+            scorer_content = self.config.scorer_path.read_bytes()
+        except FileNotFoundError:
+            scorer_content = b""
+        version = hashlib.blake2b(b"".join(contents) + scorer_content, digest_size=6).hexdigest()
+
+        feature_transformer, preprocessor, model = (
+            joblib.load(io.BytesIO(content)) for content in contents
+        )
+        scorer = None
+        if scorer_content:
+            scorer = FusedScorer.load_matching(io.BytesIO(scorer_content), *contents[1:])
+
+        n_features = len(preprocessor.get_feature_names_out())
+        if n_features != model.n_features_in_:
+            raise ValueError(
+                f"Preprocessor produces {n_features} features, "
+                f"model expects {model.n_features_in_}"
+            )
+
+        return ModelBundle(
+            feature_transformer=feature_transformer,
+            preprocessor=preprocessor,
+            model=model,
+            pipeline=Pipeline([
+                ("features", feature_transformer),
+                ("preprocessor", preprocessor),
+                ("model", model),
+            ]),
+            scorer=scorer,
+            version=version,
+            loaded_at=time.time(),
+        )
+
+    def _load_unchanged(self, stamp: tuple):
+        """
+        Loads a bundle from the artifacts last stat-ed as `stamp`.
+
+        Returns:
+            ModelBundle | None: the bundle, or None if any artifact was
+            replaced while it was being read
+        """
+        bundle = self._load()
+        try:
+            unchanged = self._read_stamp() == stamp
+        except FileNotFoundError:
+            unchanged = False
+        if not unchanged:
+            logger.info("Model artifacts changed while loading, discarding the loaded set")
+            return None
+        return bundle
+
+    def reload_if_changed(self) -> bool:
+        """
+        Loads and publishes a new bundle if the artifacts changed and the
+        new set is complete.
+
+        Returns:
+            bool: whether a new bundle was swapped in
+        """
+        try:
+            stamp = self._read_stamp()
+        except FileNotFoundError:
+            return False
+
+        if stamp == self._stamp:
+            return False
+
+        features_mtime, preprocessor_mtime, model_mtime = (mtime for mtime, _ in stamp[:3])
+        if not model_mtime >= preprocessor_mtime >= features_mtime:
+            # Retraining is still writing the artifacts, try again later
+            return False
+
+        detected = time.perf_counter()
+        try:
+            bundle = self._load_unchanged(stamp)
+        except Exception as e:
+            self.failed_reloads += 1
+            logger.warning(f"Failed to load new model artifacts, keeping current model: {e}")
+            return False
+        if bundle is None:
+            # Retraining started writing while the set was read, try again later
+            return False
+        loaded = time.perf_counter()
+
+        self._stamp = stamp
+        if bundle.version == self.bundle.version:
+            return False
+
+        previous_version = self.bundle.version
+        self.bundle = bundle
+        swapped = time.perf_counter()
+
+        self.reloads += 1
+        self.last_load_seconds = loaded - detected
+        self.last_swap_latency_ms = (swapped - detected) * 1000
+
+        if self.on_swap is not None:
+            self.on_swap(bundle)
+
+        logger.info(
+            f"Swapped model {previous_version} -> {bundle.version} "
+            f"(load {self.last_load_seconds:.3f}s, fused scorer {bundle.scorer is not None})"
+        )
+        return True
+
+    # ================================
+    # Watching
+    # ================================
+
+    def start_watching(self) -> threading.Thread:
+        def watch():
+            while not self._stop.wait(self.config.reload_interval_seconds):
+                self.reload_if_changed()
+
+        self._thread = threading.Thread(target=watch, name="model-holder", daemon=True)
+        self._thread.start()
+        logger.info(
+            f"Watching model artifacts every {self.config.reload_interval_seconds}s"
+        )
+        return self._thread
+
+    def stop_watching(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    # ================================
+    # Metrics
+    # ================================
+
+    def stats(self) -> dict:
+        bundle = self.bundle
+        return {
+            "version": bundle.version,
+            "loaded_at": bundle.loaded_at,
+            "fused_scorer": bundle.scorer is not None,
+            "reloads": self.reloads,
+            "failed_reloads": self.failed_reloads,
+            "last_load_seconds": self.last_load_seconds,
+            "last_swap_latency_ms": self.last_swap_latency_ms,
+        }
@@ -1,5 +1,21 @@
+import os
+import time
+from pathlib import Path
+
+import pandas as pd
+
 from mlProject import logger
 from mlProject.config.configuration import ConfigurationManager
+from mlProject.constants import (
+    CONFIG_FILE_PATH,
+    PARAMS_FILE_PATH,
+    SCHEMA_RAW_FILE_PATH,
+    SCHEMA_PROCESSED_FILE_PATH,
+)
+from mlProject.utils.artifact_writer import ArtifactWriter
+from mlProject.utils.common import read_yaml, matrix_path
+from mlProject.pipeline.profiler import StageProfiler
+from mlProject.pipeline.stage_cache import StageCache, module_sources
 
 from mlProject.components.data_ingestion import DataIngestion
 from mlProject.components.data_validation import DataValidation
@@ -8,53 +24,390 @@ from mlProject.components.feature_engineering import FeatureEngineering
 from mlProject.components.data_transformation import DataTransformation
 from mlProject.components.model_trainer import ModelTrainer
 from mlProject.components.model_evaluation import ModelEvaluation
+from mlProject.components.scorer_export import FUSABLE_MODELS, ScorerExport
 
 
 class TrainingPipeline:
-    def __init__(self):
-        self.config_manager = ConfigurationManager()
+    def __init__(self, config_filepath: Path = CONFIG_FILE_PATH):
+        self.config_manager = ConfigurationManager(config_filepath)
+        self.pipeline_config = self.config_manager.get_training_pipeline_config()
+        self.params = read_yaml(PARAMS_FILE_PATH)
+        self.stage_cache = StageCache(self.config_manager.get_stage_cache_config())
+        self.profiler = None
 
-    def run(self):
-        try:
-            logger.info("===== Starting Training Pipeline =====")
+    def _run_stage(self, stage, fn, component, inputs, outputs, params=(), schemas=()):
+        """
+        Runs a stage through the stage cache and the profiler. The
+        fingerprint covers the stage's config.yaml section, the listed
+        params.yaml sections and schema files, and the source of its
+        component's module and of every mlProject module that imports,
+        directly or indirectly.
+        """
+        settings = {
+            "config": self.config_manager.config[stage],
+            "params": {name: self.params[name] for name in params},
+        }
+        sources = [*module_sources(component.__module__), *schemas]
 
-            # Data Ingestion
-            ingestion_config = self.config_manager.get_data_ingestion_config()
-            data_ingestion = DataIngestion(ingestion_config)
-            raw_data_path = data_ingestion.initiate_data_ingestion()
+        n_cached = len(self.stage_cache.report)
+        result = self.profiler.run(
+            stage,
+            lambda: self.stage_cache.run(
+                stage, fn, inputs=inputs, outputs=outputs, settings=settings, sources=sources
+            ),
+            inputs=inputs,
+            outputs=outputs,
+        )
+        if len(self.stage_cache.report) > n_cached:
+            hit = self.stage_cache.report[-1]["hit"]
+            self.profiler.annotate(stage, cache_hit=hit)
+            if hit and stage == self.profiler.config.profile_stage:
+                logger.warning(
+                    f"Profiled stage {stage} was restored from the stage cache, so its "
+                    f"profile covers the restore only; disable stage_cache to profile the stage"
+                )
+        return result
+
+    def _matrix(self, path: Path) -> Path:
+        """Where a configured design matrix is stored in the chosen layout"""
+        sparse = bool(self.params["data_transformation"]["encoding"]["sparse_output"])
+        return matrix_path(Path(path), sparse)
+
+    def _exports_scorer(self, export_config) -> bool:
+        """
+        Whether the selected model can be fused. Otherwise a scorer left
+        by an earlier model is removed, so it cannot disagree with model.pkl.
+        """
+        model_name = self.params["model"]["name"]
+        if model_name in FUSABLE_MODELS:
+            return True
+        logger.info(f"Skipping scorer export, a {model_name} model cannot be fused")
+        Path(export_config.scorer_path).unlink(missing_ok=True)
+        return False
+
+    def _touch_serving_artifacts(self):
+        """
+        Stages restored from the cache, or rerun with identical output, do
+        not rewrite their artifacts. ModelHolder only loads a set whose
+        mtimes are in write order, so restore that order once at the end.
+        """
+        serving_config = self.config_manager.get_model_serving_config()
+        now = time.time_ns()
+        for offset, path in enumerate([
+            serving_config.feature_transformer_path,
+            serving_config.preprocessor_path,
+            serving_config.model_path,
+        ]):
+            os.utime(path, ns=(now + offset, now + offset))
+
+    def _run_incremental_stages(self, data_ingestion, fe_config):
+        """
+        Ingests only new or changed customers and passes that delta
+        through validation, cleaning and feature engineering.
+        """
+        ingestion_config = data_ingestion.config
+        delta_path = self.profiler.run(
+            "data_ingestion", data_ingestion.initiate_incremental_ingestion,
+            outputs=[ingestion_config.delta_data_file],
+        )
+
+        if delta_path is None:
+            # the delta file on disk, if any, is from a previous run
+            self.profiler.annotate("data_ingestion", rows_out=0)
+            logger.info("No delta to process, reusing the featured dataset")
+            return fe_config.featured_data_path
+
+        # Data Validation
+        validation_config = self.config_manager.get_data_validation_config()
+        data_validation = DataValidation(validation_config)
+        self.profiler.run(
+            "data_validation",
+            lambda: data_validation.initiate_data_validation(delta_path),
+            inputs=[delta_path],
+            outputs=[validation_config.validation_report],
+        )
+
+        # Data Cleaning
+        cleaning_config = self.config_manager.get_data_cleaning_config()
+        data_cleaning = DataCleaning(cleaning_config)
+        cleaned_delta_path = self.profiler.run(
+            "data_cleaning",
+            lambda: data_cleaning.initiate_data_cleaning(delta_path, keep_identifier=True),
+            inputs=[delta_path],
+            outputs=[cleaning_config.cleaned_data_path],
+        )
+
+        # Feature Engineering
+        feature_engineering = FeatureEngineering(fe_config)
+        return self.profiler.run(
+            "feature_engineering",
+            lambda: feature_engineering.initiate_incremental_feature_engineering(
+                cleaned_delta_path
+            ),
+            inputs=[cleaned_delta_path],
+            outputs=[fe_config.featured_data_path, fe_config.feature_transformer_path],
+        )
+
+    def _run_on_disk(self, data_ingestion, ingestion_config, fe_config) -> dict:
+        """
+        Runs the stages through the stage cache, each reading its inputs
+        from the artifacts of the previous one.
+        """
+        if ingestion_config.incremental:
+            featured_data_path = self._run_incremental_stages(data_ingestion, fe_config)
+        else:
+            raw_data_path = self._run_stage(
+                "data_ingestion", data_ingestion.initiate_data_ingestion, DataIngestion,
+                inputs=[ingestion_config.source_data_path],
+                outputs=[ingestion_config.local_data_file],
+            )
 
             # Data Validation
             validation_config = self.config_manager.get_data_validation_config()
             data_validation = DataValidation(validation_config)
-            data_validation.initiate_data_validation(raw_data_path)
+            self._run_stage(
+                "data_validation",
+                lambda: data_validation.initiate_data_validation(raw_data_path),
+                DataValidation,
+                inputs=[raw_data_path],
+                outputs=[validation_config.validation_report],
+                schemas=[SCHEMA_RAW_FILE_PATH],
+            )
 
             # Data Cleaning
             cleaning_config = self.config_manager.get_data_cleaning_config()
             data_cleaning = DataCleaning(cleaning_config)
-            cleaned_data_path = data_cleaning.initiate_data_cleaning(raw_data_path)
+            cleaned_data_path = self._run_stage(
+                "data_cleaning",
+                lambda: data_cleaning.initiate_data_cleaning(raw_data_path),
+                DataCleaning,
+                inputs=[raw_data_path],
+                outputs=[cleaning_config.cleaned_data_path],
+                schemas=[SCHEMA_RAW_FILE_PATH],
+            )
 
             # Feature Engineering
-            fe_config = self.config_manager.get_feature_engineering_config()
             feature_engineering = FeatureEngineering(fe_config)
-            featured_data_path = feature_engineering.initiate_feature_engineering(
-                cleaned_data_path
+            featured_data_path = self._run_stage(
+                "feature_engineering",
+                lambda: feature_engineering.initiate_feature_engineering(cleaned_data_path),
+                FeatureEngineering,
+                inputs=[cleaned_data_path],
+                outputs=[fe_config.featured_data_path, fe_config.feature_transformer_path],
+                params=["feature_engineering"],
+                schemas=[SCHEMA_PROCESSED_FILE_PATH],
+            )
+
+        # Data Transformation
+        transformation_config = self.config_manager.get_data_transformation_config()
+        data_transformation = DataTransformation(transformation_config)
+        self._run_stage(
+            "data_transformation",
+            lambda: data_transformation.initiate_data_transformation(featured_data_path),
+            DataTransformation,
+            inputs=[featured_data_path],
+            outputs=[
+                self._matrix(transformation_config.transformed_train),
+                self._matrix(transformation_config.transformed_test),
+                transformation_config.y_train,
+                transformation_config.y_test,
+                transformation_config.preprocessor_path,
+            ],
+            params=["general", "data_split", "data_transformation", "warm_start"],
+            schemas=[SCHEMA_PROCESSED_FILE_PATH],
+        )
+
+        # Model Training
+        trainer_config = self.config_manager.get_model_trainer_config()
+        model_trainer = ModelTrainer(trainer_config)
+        # A warm start's previous model.pkl is only a starting point, not
+        # an input: the same data converges to the same model from it
+        model_path, roc_auc = self._run_stage(
+            "model_trainer", model_trainer.initiate_model_training, ModelTrainer,
+            inputs=[
+                self._matrix(trainer_config.train_data_path),
+                self._matrix(trainer_config.test_data_path),
+                trainer_config.y_train,
+                trainer_config.y_test,
+                *([trainer_config.featured_data_path]
+                  if model_trainer.cv_enabled or model_trainer.verifies_scorer else []),
+                *([trainer_config.preprocessor_path]
+                  if model_trainer.warm_start_enabled or model_trainer.verifies_scorer else []),
+            ],
+            outputs=model_trainer.output_paths(),
+            params=[
+                "general", "model", "logistic_regression", "sgd_logistic", "xgboost", "catboost",
+                "cross_validation", "data_transformation", "warm_start",
+            ],
+        )
+
+        # Model Evaluation
+        evaluation_config = self.config_manager.get_model_evaluation_config()
+        model_evaluation = ModelEvaluation(evaluation_config)
+        metrics = self._run_stage(
+            "model_evaluation", model_evaluation.initiate_model_evaluation, ModelEvaluation,
+            inputs=[
+                evaluation_config.model_path,
+                self._matrix(evaluation_config.test_data_path),
+                evaluation_config.y_test,
+            ],
+            outputs=[evaluation_config.metrics_path],
+        )
+
+        # Scorer Export
+        export_config = self.config_manager.get_scorer_export_config()
+        if self._exports_scorer(export_config):
+            scorer_export = ScorerExport(export_config)
+            self._run_stage(
+                "scorer_export", scorer_export.initiate_scorer_export, ScorerExport,
+                inputs=[
+                    export_config.model_path,
+                    export_config.preprocessor_path,
+                    export_config.featured_data_path,
+                ],
+                outputs=[export_config.scorer_path, export_config.report_path],
             )
 
+        self.stage_cache.save_report()
+        return metrics
+
+    def _run_in_memory(self, data_ingestion, ingestion_config, fe_config) -> dict:
+        """
+        Runs the stages handing DataFrames, arrays and fitted objects to
+        each other directly. Artifacts go through an ArtifactWriter, in
+        the background or at the end, and are all on disk when this
+        returns. The stage cache is bypassed since its fingerprints need
+        each stage's inputs on disk.
+        """
+        writer = ArtifactWriter(self.pipeline_config.artifact_writes)
+        try:
+            if ingestion_config.incremental:
+                featured_data = self._run_incremental_stages(data_ingestion, fe_config)
+            else:
+                raw_data_path = self.profiler.run(
+                    "data_ingestion", data_ingestion.initiate_data_ingestion,
+                    inputs=[ingestion_config.source_data_path],
+                    outputs=[ingestion_config.local_data_file],
+                )
+
+                # Data Validation
+                validation_config = self.config_manager.get_data_validation_config()
+                data_validation = DataValidation(validation_config)
+                self.profiler.run(
+                    "data_validation",
+                    lambda: data_validation.initiate_data_validation(raw_data_path),
+                    inputs=[raw_data_path],
+                    outputs=[validation_config.validation_report],
+                )
+
+                # Data Cleaning
+                cleaning_config = self.config_manager.get_data_cleaning_config()
+                data_cleaning = DataCleaning(cleaning_config, writer)
+                cleaned_data = self.profiler.run(
+                    "data_cleaning",
+                    lambda: data_cleaning.initiate_data_cleaning(raw_data_path),
+                    inputs=[raw_data_path],
+                    outputs=[cleaning_config.cleaned_data_path],
+                )
+
+                # Feature Engineering
+                feature_engineering = FeatureEngineering(fe_config, writer)
+                featured_data = self.profiler.run(
+                    "feature_engineering",
+                    lambda: feature_engineering.initiate_feature_engineering(cleaned_data),
+                    inputs=[cleaning_config.cleaned_data_path],
+                    outputs=[fe_config.featured_data_path, fe_config.feature_transformer_path],
+                )
+
             # Data Transformation
             transformation_config = self.config_manager.get_data_transformation_config()
-            data_transformation = DataTransformation(transformation_config)
-            data_transformation.initiate_data_transformation(featured_data_path)
+            data_transformation = DataTransformation(transformation_config, writer)
+            arrays = self.profiler.run(
+                "data_transformation",
+                lambda: data_transformation.initiate_data_transformation(featured_data),
+                inputs=[fe_config.featured_data_path],
+                outputs=[
+                    self._matrix(transformation_config.transformed_train),
+                    self._matrix(transformation_config.transformed_test),
+                    transformation_config.y_train,
+                    transformation_config.y_test,
+                    transformation_config.preprocessor_path,
+                ],
+            )
+            _, X_test, _, y_test = arrays
 
             # Model Training
             trainer_config = self.config_manager.get_model_trainer_config()
-            model_trainer = ModelTrainer(trainer_config)
-            model_path, roc_auc = model_trainer.initiate_model_training()
+            model_trainer = ModelTrainer(trainer_config, writer)
+            model, roc_auc = self.profiler.run(
+                "model_trainer",
+                lambda: model_trainer.initiate_model_training(
+                    arrays, featured_data, data_transformation.preprocessor
+                ),
+                inputs=[
+                    self._matrix(trainer_config.train_data_path),
+                    self._matrix(trainer_config.test_data_path),
+                    trainer_config.y_train,
+                    trainer_config.y_test,
+                ],
+                outputs=model_trainer.output_paths(),
+            )
 
             # Model Evaluation
             evaluation_config = self.config_manager.get_model_evaluation_config()
-            model_evaluation = ModelEvaluation(evaluation_config)
-            metrics = model_evaluation.initiate_model_evaluation()
+            model_evaluation = ModelEvaluation(evaluation_config, writer)
+            metrics = self.profiler.run(
+                "model_evaluation",
+                lambda: model_evaluation.initiate_model_evaluation(model, X_test, y_test),
+                inputs=[self._matrix(evaluation_config.test_data_path), evaluation_config.y_test],
+                outputs=[evaluation_config.metrics_path],
+            )
+
+            # Scorer Export
+            export_config = self.config_manager.get_scorer_export_config()
+            if self._exports_scorer(export_config):
+                scorer_export = ScorerExport(export_config, writer)
+                self.profiler.run(
+                    "scorer_export",
+                    lambda: scorer_export.initiate_scorer_export(
+                        data_transformation.preprocessor,
+                        model,
+                        featured_data if isinstance(featured_data, pd.DataFrame) else None,
+                    ),
+                    inputs=[export_config.featured_data_path],
+                    outputs=[export_config.scorer_path, export_config.report_path],
+                )
+
+            self.profiler.run("artifact_flush", writer.flush)
+        finally:
+            writer.close()
+
+        return metrics
+
+    def run(self):
+        try:
+            logger.info("===== Starting Training Pipeline =====")
+
+            self.profiler = StageProfiler(
+                self.config_manager.get_pipeline_profile_config(),
+                mode="in_memory" if self.pipeline_config.in_memory else "on_disk",
+            )
+
+            # Data Ingestion
+            ingestion_config = self.config_manager.get_data_ingestion_config()
+            data_ingestion = DataIngestion(ingestion_config)
+            fe_config = self.config_manager.get_feature_engineering_config()
+
+            if self.pipeline_config.in_memory:
+                metrics = self._run_in_memory(data_ingestion, ingestion_config, fe_config)
+            else:
+                metrics = self._run_on_disk(data_ingestion, ingestion_config, fe_config)
 
+            self._touch_serving_artifacts()
+            if ingestion_config.incremental:
+                # Only now is the delta safely in the featured dataset
+                data_ingestion.commit_incremental_ingestion()
+            self.profiler.save()
             logger.info("===== Training Pipeline Completed Successfully =====")
             logger.info(f"Final ROC-AUC: {metrics['roc_auc']:.4f}")
 
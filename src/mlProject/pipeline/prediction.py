@@ -0,0 +1,232 @@
+import math
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
+
+from mlProject import logger
+from mlProject.components.data_cleaning import BLANK_TOTAL_CHARGES
+from mlProject.components.feature_engineering import RECORD_PATH_MAX_ROWS
+from mlProject.constants import (
+    PARAMS_FILE_PATH,
+    SCHEMA_RAW_FILE_PATH,
+    SCHEMA_PROCESSED_FILE_PATH,
+)
+from mlProject.entity.config_entity import ModelServingConfig, PredictionCacheConfig
+from mlProject.pipeline.model_holder import ModelHolder, ModelBundle
+from mlProject.pipeline.prediction_cache import PredictionCache
+from mlProject.utils.common import read_yaml
+
+
+# A blank TotalCharges is scored as batch prediction scores it, see
+# `BLANK_TOTAL_CHARGES`. Every other numeric column must hold a number.
+BLANK_NUMBERS = {"TotalCharges": BLANK_TOTAL_CHARGES}
+
+
+def _is_blank(value) -> bool:
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return not value.strip()
+    return isinstance(value, float) and math.isnan(value)
+
+
+def _to_number(col: str, value) -> float:
+    """
+    The value of numeric column `col` as a float, which both scoring paths
+    go through.
+
+    Raises:
+        ValueError: if the value is not a number
+    """
+    if col in BLANK_NUMBERS and _is_blank(value):
+        return BLANK_NUMBERS[col]
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Column {col} must be numeric, got {value!r}") from None
+    if math.isnan(number):
+        raise ValueError(f"Column {col} must be numeric, got {value!r}")
+    return number
+
+
+class PredictionPipeline:
+    """
+    Scores customers with the trained model.
+
+    The feature transformer, preprocessor and model are loaded once when
+    the pipeline is created. When the model was exported as a fused
+    scorer, batches of up to `RECORD_PATH_MAX_ROWS` records (or, with a
+    cache, their cache misses) are scored one record at a time through
+    `FeatureTransformer.transform_record` and `FusedScorer.score_record`,
+    and larger batches through `FusedScorer.score_batch`. Models that
+    cannot be fused fall back to a single `predict_proba` of the composed
+    sklearn pipeline. Retrained artifacts are swapped in between batches
+    by a ModelHolder once `start_hot_reload` has been called.
+    """
+
+    def __init__(
+        self,
+        config: ModelServingConfig,
+        cache_config: PredictionCacheConfig = None,
+    ):
+        self.config = config
+
+        schema = read_yaml(SCHEMA_RAW_FILE_PATH)
+        self.identifier_column = schema["identifier_column"]
+        self.feature_columns = [
+            col for col in schema["columns"]
+            if col not in (self.identifier_column, schema["target_column"])
+        ]
+        self.threshold = read_yaml(PARAMS_FILE_PATH)["threshold"]["default"]
+        numeric_columns = read_yaml(SCHEMA_PROCESSED_FILE_PATH)["numerical_columns"]
+        self.numeric_columns = [col for col in self.feature_columns if col in numeric_columns]
+
+        self.cache = None
+        if cache_config is not None and cache_config.enabled:
+            self.cache = PredictionCache(
+                cache_config,
+                feature_columns=self.feature_columns,
+                # Every artifact that shapes a probability, new bin edges included
+                watched_paths=[
+                    self.config.feature_transformer_path,
+                    self.config.preprocessor_path,
+                    self.config.model_path,
+                ],
+            )
+
+        self.model_holder = ModelHolder(self.config, on_swap=self._on_model_swap)
+
+        logger.info(f"Prediction pipeline ready, model version {self.model_holder.bundle.version}")
+
+    def start_hot_reload(self):
+        """
+        Starts watching the artifacts if `hot_reload` is enabled. Call it
+        in the process that serves requests, i.e. after any fork.
+        """
+        if self.config.hot_reload:
+            self.model_holder.start_watching()
+
+    def _on_model_swap(self, bundle: ModelBundle):
+        if self.cache is not None:
+            self.cache.clear()
+
+    def _prepare(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        The feature columns of raw customers, numeric columns as floats,
+        by the same rules as `_prepare_record`.
+        """
+        missing_columns = set(self.feature_columns) - set(df.columns)
+        if missing_columns:
+            raise ValueError(f"Missing columns: {sorted(missing_columns)}")
+
+        df = df[self.feature_columns].copy()
+
+        for col in self.numeric_columns:
+            values = df[col]
+            if is_numeric_dtype(values) and not is_bool_dtype(values):
+                values = values.astype(float)
+                if col in BLANK_NUMBERS:
+                    values = values.fillna(BLANK_NUMBERS[col])
+                if not values.isna().any():
+                    df[col] = values
+                    continue
+            df[col] = [_to_number(col, value) for value in df[col]]
+
+        return df
+
+    def _prepare_record(self, record: dict) -> dict:
+        """`_prepare` for a single record"""
+        missing_columns = set(self.feature_columns) - set(record)
+        if missing_columns:
+            raise ValueError(f"Missing columns: {sorted(missing_columns)}")
+
+        record = {col: record[col] for col in self.feature_columns}
+        for col in self.numeric_columns:
+            record[col] = _to_number(col, record[col])
+
+        return record
+
+    def predict_proba(self, df: pd.DataFrame, bundle: ModelBundle = None) -> np.ndarray:
+        """
+        Churn probability for every row of a raw customer dataframe.
+
+        Args:
+            df (pd.DataFrame): customers in the raw dataset layout
+            bundle (ModelBundle, optional): artifacts to score with.
+                Defaults to the currently active bundle.
+
+        Returns:
+            np.ndarray: churn probabilities
+        """
+        # Read the bundle once so the whole batch sees the same artifacts
+        bundle = bundle or self.model_holder.bundle
+        if bundle.scorer is not None:
+            return bundle.scorer.score_batch(bundle.feature_transformer.transform(self._prepare(df)))
+        return bundle.pipeline.predict_proba(self._prepare(df))[:, 1]
+
+    def _score_records(self, records: list, bundle: ModelBundle = None) -> list:
+        """Churn probabilities of records returned by `_prepare_record`"""
+        bundle = bundle or self.model_holder.bundle
+        if bundle.scorer is None or len(records) > RECORD_PATH_MAX_ROWS:
+            df = pd.DataFrame.from_records(records, columns=self.feature_columns)
+            return self.predict_proba(df, bundle).tolist()
+
+        transform_record, score_record = (
+            bundle.feature_transformer.transform_record, bundle.scorer.score_record
+        )
+        return [score_record(transform_record(record)) for record in records]
+
+    def predict(self, records: list) -> list:
+        """
+        Scores a batch of customer records.
+
+        Every record is validated and its numbers coerced once, up front,
+        so the record path and the dataframe path score the same values.
+
+        Args:
+            records (list): customer dicts in the raw dataset layout
+
+        Returns:
+            list: one prediction dict per record
+
+        Raises:
+            ValueError: if a record is not a dict, lacks a feature column
+                or holds a non-numeric value in a numeric column
+        """
+        if not all(isinstance(record, dict) for record in records):
+            raise ValueError("Every customer must be a JSON object")
+        prepared = [self._prepare_record(record) for record in records]
+
+        if self.cache is None:
+            probabilities = self._score_records(prepared)
+        else:
+            probabilities = self._predict_cached(prepared)
+
+        predictions = []
+        for record, proba in zip(records, probabilities):
+            prediction = {"churn_probability": proba, "churn": proba >= self.threshold}
+            if self.identifier_column in record:
+                prediction[self.identifier_column] = record[self.identifier_column]
+            predictions.append(prediction)
+
+        return predictions
+
+    def _predict_cached(self, records: list) -> list:
+        keys = [self.cache.make_key(record) for record in records]
+        probabilities = [self.cache.get(key) for key in keys]
+
+        misses = [i for i, proba in enumerate(probabilities) if proba is None]
+        if misses:
+            # A model swap clears the cache, so scores from a model swapped
+            # out mid-batch are dropped by `put` rather than cached. The
+            # generation is read first so a swap landing in between is
+            # caught too.
+            generation = self.cache.generation
+            bundle = self.model_holder.bundle
+            scored = self._score_records([records[i] for i in misses], bundle)
+            for i, proba in zip(misses, scored):
+                probabilities[i] = proba
+                self.cache.put(keys[i], proba, generation)
+
+        return probabilities
@@ -0,0 +1,173 @@
+import hashlib
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from mlProject import logger
+from mlProject.entity.config_entity import PredictionCacheConfig
+
+
+class PredictionCache:
+    """
+    Bounded LRU cache of churn probabilities with a TTL.
+
+    Entries are keyed by a hash of the feature values exactly as the
+    scorer consumes them, i.e. of a record after
+    `PredictionPipeline._prepare_record`, which has already turned the
+    numbers into floats however they were formatted. Categorical values
+    are hashed as they are, so two records share an entry only if they
+    score the same. The cache clears itself when any of the watched
+    artifacts changes on disk. Every clear starts a new `generation`, and
+    a value scored before the clear is not stored by `put`.
+    """
+
+    def __init__(
+        self,
+        config: PredictionCacheConfig,
+        feature_columns: list,
+        watched_paths: list,
+    ):
+        self.config = config
+        self.feature_columns = list(feature_columns)
+        self.watched_paths = [Path(p) for p in watched_paths]
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.generation = 0
+
+        self._artifacts_version = self._read_artifacts_version()
+        self._next_check = time.monotonic() + self.config.check_interval_seconds
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    # ================================
+    # Keys
+    # ================================
+
+    def make_key(self, record: dict) -> bytes:
+        """
+        Hash of a prepared customer record, ignoring the identifier and any
+        other column outside the feature set. `repr` keeps the type of
+        every value, so e.g. "1" and 1 do not collide.
+        """
+        values = tuple(record.get(col) for col in self.feature_columns)
+        return hashlib.blake2b(repr(values).encode(), digest_size=16).digest()
+
+    # ================================
+    # Invalidation
+    # ================================
+
+    def _read_artifacts_version(self) -> tuple:
+        version = []
+        for path in self.watched_paths:
+            try:
+                stat = os.stat(path)
+                version.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                version.append(None)
+        return tuple(version)
+
+    def _check_artifacts(self):
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + self.config.check_interval_seconds
+
+        version = self._read_artifacts_version()
+        if version != self._artifacts_version:
+            self._artifacts_version = version
+            self._clear()
+            self.invalidations += 1
+            logger.info("Model artifacts changed, prediction cache cleared")
+
+    # ================================
+    # Lookup
+    # ================================
+
+    def get(self, key: bytes):
+        with self._lock:
+            self._check_artifacts()
+
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at, size = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: bytes, value, generation: int = None):
+        """
+        Stores `value` under `key`.
+
+        Args:
+            key (bytes): key from `make_key`
+            value: the churn probability
+            generation (int, optional): `generation` read before the value
+                was scored. The value is dropped if the cache was cleared
+                since, e.g. because the model it was scored with was
+                swapped out.
+        """
+        size = sys.getsizeof(key) + sys.getsizeof(value) + sys.getsizeof((value, 0.0, 0))
+        expires_at = time.monotonic() + self.config.ttl_seconds
+
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[2]
+
+            self._entries[key] = (value, expires_at, size)
+            self._bytes += size
+
+            while len(self._entries) > self.config.max_entries:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def _clear(self):
+        self._entries.clear()
+        self._bytes = 0
+        self.generation += 1
+
+    def clear(self):
+        with self._lock:
+            self._clear()
+
+    # ================================
+    # Metrics
+    # ================================
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.config.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "approx_memory_bytes": sys.getsizeof(self._entries) + self._bytes,
+            }
@@ -0,0 +1,239 @@
+import gc
+import os
+import signal
+import socket
+import time
+
+from werkzeug.serving import make_server
+
+from mlProject import logger
+from mlProject.entity.config_entity import ModelServingConfig
+
+
+# Exit status of a worker that could not start serving
+STARTUP_FAILED = 3
+
+# A worker that exits sooner than this after being forked, or that could
+# not start, is respawned after a backoff doubling from RESPAWN_BACKOFF
+# up to MAX_RESPAWN_BACKOFF; after MAX_EARLY_EXITS such exits in a row
+# its slot is given up.
+MIN_UPTIME_SECONDS = 5.0
+RESPAWN_BACKOFF_SECONDS = 0.5
+MAX_RESPAWN_BACKOFF_SECONDS = 30.0
+MAX_EARLY_EXITS = 5
+
+
+class _Wakeup(Exception):
+    """Raised by the parent's signal handlers to break out of a blocking wait"""
+
+
+class PreforkServer:
+    """
+    Serves a WSGI app from several forked worker processes.
+
+    The app, and with it the preprocessor and model, is loaded once in the
+    parent before forking, so workers start without unpickling anything
+    and share the parent's memory pages copy-on-write. `gc.freeze()` moves
+    the loaded objects out of the collector's reach so garbage collection
+    in a worker does not touch, and thereby copy, the shared pages.
+    Workers accept connections from one listening socket opened by the
+    parent, and a worker that dies is replaced, with a backoff when it
+    keeps failing right after starting.
+
+    Between worker exits the parent sleeps in `os.waitpid`. Respawns that
+    are backed off are due at a deadline, and SIGALRM, set for the
+    earliest one, or SIGTERM/SIGINT break the parent out of the wait by
+    raising from their handler, as a handler that returns would have the
+    wait resumed.
+    """
+
+    def __init__(self, app, config: ModelServingConfig):
+        self.app = app
+        self.config = config
+        self.workers = {}
+        self._started = {}
+        self._early_exits = {}
+        self._respawn_at = {}
+        self._running = True
+        self._blocking = False
+        self._woken = False
+        self._socket = None
+
+    def _spawn_worker(self, index: int):
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = index
+            self._started[index] = time.monotonic()
+            return
+
+        # Worker process
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGALRM, signal.SIG_DFL)
+        status = 1
+        try:
+            try:
+                server = make_server(
+                    self.config.host,
+                    self.config.port,
+                    self.app,
+                    threaded=True,
+                    fd=self._socket.fileno(),
+                )
+            except Exception as e:
+                logger.error(f"Worker {index} (pid {os.getpid()}) failed to start: {e}")
+                status = STARTUP_FAILED
+                return
+            logger.info(f"Worker {index} (pid {os.getpid()}) serving")
+            server.serve_forever()
+            status = 0
+        except Exception as e:
+            logger.error(f"Worker {index} (pid {os.getpid()}) failed: {e}")
+        finally:
+            os._exit(status)
+
+    def _respawn(self, index: int, exit_code: int):
+        """
+        Replaces an exited worker, at once if it had been serving for a
+        while, after a growing backoff if it failed to start or died
+        straight away, and not at all after MAX_EARLY_EXITS in a row.
+        A backed off respawn is left to `_spawn_due_workers`.
+        """
+        uptime = time.monotonic() - self._started.pop(index)
+        if exit_code != STARTUP_FAILED and uptime >= MIN_UPTIME_SECONDS:
+            self._early_exits[index] = 0
+            logger.warning(f"Worker {index} exited with status {exit_code}, restarting")
+            self._spawn_worker(index)
+            return
+
+        early_exits = self._early_exits.get(index, 0) + 1
+        self._early_exits[index] = early_exits
+        if early_exits >= MAX_EARLY_EXITS:
+            logger.error(
+                f"Worker {index} exited with status {exit_code} {early_exits} times "
+                f"in a row right after starting, not restarting it"
+            )
+            return
+
+        backoff = min(
+            RESPAWN_BACKOFF_SECONDS * 2 ** (early_exits - 1), MAX_RESPAWN_BACKOFF_SECONDS
+        )
+        logger.warning(
+            f"Worker {index} exited with status {exit_code} after {uptime:.1f}s, "
+            f"restarting in {backoff:.1f}s"
+        )
+        self._respawn_at[index] = time.monotonic() + backoff
+
+    def _spawn_due_workers(self):
+        """
+        Spawns the workers whose backoff is over and sets SIGALRM for the
+        next one due.
+        """
+        # Cleared before the alarm is set, so `_wait` sees any alarm after it
+        self._woken = False
+        now = time.monotonic()
+        for index, due in list(self._respawn_at.items()):
+            if due <= now:
+                del self._respawn_at[index]
+                if self._running:
+                    self._spawn_worker(index)
+
+        delay = 0
+        if self._respawn_at:
+            delay = max(min(self._respawn_at.values()) - time.monotonic(), 0.001)
+        signal.setitimer(signal.ITIMER_REAL, delay)
+
+    def _wait(self) -> list:
+        """
+        Blocks until a worker exits or a signal arrives.
+
+        Returns:
+            list: (pid, exit code) of the workers that exited
+        """
+        exited = None
+        self._blocking = True
+        try:
+            try:
+                # A signal since `_spawn_due_workers` would not break the wait
+                if not self._woken:
+                    if self.workers:
+                        pid, status = os.waitpid(-1, 0)
+                        exited = [(pid, os.waitstatus_to_exitcode(status))]
+                    else:
+                        signal.pause()
+            except ChildProcessError:
+                pass
+            finally:
+                self._blocking = False
+        except _Wakeup:
+            pass
+
+        if exited is None:
+            exited = self._reap_exited()
+        return exited
+
+    def _reap_exited(self) -> list:
+        """(pid, exit code) of the workers that exited while no wait returned them"""
+        exited = []
+        for pid in list(self.workers):
+            try:
+                reaped, status = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                # Reaped by a wait a signal handler cut short, status lost
+                exited.append((pid, 1))
+                continue
+            if reaped:
+                exited.append((pid, os.waitstatus_to_exitcode(status)))
+        return exited
+
+    def _wake(self, signum=None, frame=None):
+        # Raising at most once per wait, and only while blocked in it
+        self._woken = True
+        if self._blocking:
+            self._blocking = False
+            raise _Wakeup
+
+    def _shutdown(self, signum, frame):
+        self._running = False
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        self._wake()
+
+    def serve_forever(self):
+        self._socket = socket.create_server(
+            (self.config.host, self.config.port), backlog=2048
+        )
+        self._socket.set_inheritable(True)
+
+        n_workers = self.config.workers or os.cpu_count()
+
+        gc.collect()
+        gc.freeze()
+
+        start = time.perf_counter()
+        for index in range(n_workers):
+            self._spawn_worker(index)
+        logger.info(
+            f"Forked {n_workers} workers on {self.config.host}:{self.config.port} "
+            f"in {(time.perf_counter() - start) * 1000:.1f} ms"
+        )
+
+        signal.signal(signal.SIGTERM, self._shutdown)
+        signal.signal(signal.SIGINT, self._shutdown)
+        signal.signal(signal.SIGALRM, self._wake)
+
+        while self.workers or (self._running and self._respawn_at):
+            self._spawn_due_workers()
+            for pid, exit_code in self._wait():
+                index = self.workers.pop(pid, None)
+                if self._running and index is not None:
+                    self._respawn(index, exit_code)
+
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        self._socket.close()
+        logger.info("All workers stopped")
+        # Non-zero when the workers were given up rather than shut down
+        return 0 if not self._running else 1
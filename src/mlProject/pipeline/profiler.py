@@ -0,0 +1,258 @@
+import cProfile
+import io
+import json
+import pstats
+import resource
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+import pyarrow.parquet as pq
+from pyarrow import feather
+
+from mlProject import logger
+from mlProject.entity.config_entity import PipelineProfileConfig
+
+
+PROFILE_MODES = ("cprofile", "tracemalloc")
+REPORT_TOP_N = 40
+COUNT_BLOCK_BYTES = 1 << 20
+
+
+def _read_status_mb(field: str) -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(f"{field}:"):
+                return int(line.split()[1]) / 1024
+    raise RuntimeError(f"{field} not found in /proc/self/status")
+
+
+def reset_peak_rss() -> bool:
+    """
+    Resets the kernel's RSS high-water mark (Linux only). Where that is
+    not possible the peak stays a process-lifetime peak.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb() -> float:
+    try:
+        return _read_status_mb("VmHWM")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def rss_mb() -> float:
+    try:
+        return _read_status_mb("VmRSS")
+    except OSError:
+        return float("nan")
+
+
+def count_rows(path: Path):
+    """
+    Rows of a tabular artifact, read from its header or metadata where
+    the format has one. Returns None for non-tabular artifacts and for
+    1-D label arrays, which only mirror the rows of their matrix.
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+
+    if suffix == ".parquet":
+        return pq.read_metadata(path).num_rows
+    if suffix == ".feather":
+        return feather.read_table(path, columns=[], memory_map=True).num_rows
+    if suffix == ".npy":
+        array = np.load(path, mmap_mode="r")
+        return array.shape[0] if array.ndim > 1 else None
+    if suffix == ".npz":
+        with np.load(path) as arrays:
+            return int(arrays["shape"][0]) if "shape" in arrays else None
+    if suffix == ".csv":
+        newlines, last = 0, b"\n"
+        with open(path, "rb") as f:
+            while block := f.read(COUNT_BLOCK_BYTES):
+                newlines += block.count(b"\n")
+                last = block[-1:]
+        # header line, plus a final row without a trailing newline
+        return newlines - 1 + (last != b"\n")
+    return None
+
+
+def _sum_rows(paths: list):
+    counts = [count_rows(path) for path in paths if Path(path).exists()]
+    counts = [n for n in counts if n is not None]
+    return sum(counts) if counts else None
+
+
+class StageProfiler:
+    """
+    Resource instrumentation around the training pipeline's stages.
+
+    Every stage records wall time, CPU time (process-wide, so background
+    artifact writes count towards the stage they overlap), its RSS at
+    start and its peak RSS. Rows and artifact sizes are read from the
+    stage's input and output artifacts when the profile is saved, after
+    every write has landed, so they are the same whether the stage ran,
+    was restored from the stage cache or handed its output on in memory.
+
+    With `profile_stage` set, that one stage additionally runs under
+    cProfile or tracemalloc and its report is dumped next to the profile.
+    """
+
+    def __init__(self, config: PipelineProfileConfig, mode: str):
+        if config.profile_mode not in PROFILE_MODES:
+            raise ValueError(
+                f"Unknown profile mode {config.profile_mode!r}, expected one of {PROFILE_MODES}"
+            )
+
+        self.config = config
+        self.mode = mode
+        self.stages = []
+        self._start_wall = time.perf_counter()
+        self._start_cpu = time.process_time()
+        self._started_at = time.time()
+
+    def run(self, stage: str, fn: Callable, inputs: list = (), outputs: list = ()) -> Any:
+        """
+        Runs a stage and records its resource use.
+
+        Args:
+            stage (str): stage name
+            fn (Callable): runs the stage and returns its result
+            inputs (list): artifact paths the stage reads
+            outputs (list): artifact paths the stage writes
+
+        Returns:
+            Any: the stage's result
+        """
+        if not self.config.enabled:
+            return fn()
+
+        peak_is_per_stage = reset_peak_rss()
+        rss_start = rss_mb()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+
+        if stage == self.config.profile_stage:
+            result, dump = self._run_profiled(stage, fn)
+        else:
+            result, dump = fn(), None
+
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+
+        record = {
+            "stage": stage,
+            "wall_s": wall,
+            "cpu_s": cpu,
+            "cpu_utilization": cpu / wall if wall else None,
+            "rss_start_mb": rss_start,
+            "peak_rss_mb": peak_rss_mb(),
+            "peak_rss_scope": "stage" if peak_is_per_stage else "process",
+            "cache_hit": None,
+            "inputs": [str(path) for path in inputs],
+            "outputs": [str(path) for path in outputs],
+        }
+        if dump is not None:
+            record["profile_dump"] = dump
+        self.stages.append(record)
+
+        logger.info(
+            f"Stage {stage}: {wall:.3f}s wall, {cpu:.3f}s CPU, "
+            f"peak RSS {record['peak_rss_mb']:.1f} MB"
+        )
+        return result
+
+    def annotate(self, stage: str, **fields):
+        """
+        Adds fields to the most recent record of a stage, such as whether
+        the stage cache hit, or rows that its artifacts do not show.
+        """
+        for record in reversed(self.stages):
+            if record["stage"] == stage:
+                record.update(fields)
+                return
+
+    def _run_profiled(self, stage: str, fn: Callable) -> tuple:
+        self.config.dump_dir.mkdir(parents=True, exist_ok=True)
+
+        if self.config.profile_mode == "cprofile":
+            profiler = cProfile.Profile()
+            result = profiler.runcall(fn)
+
+            dump_path = self.config.dump_dir / f"{stage}.prof"
+            profiler.dump_stats(dump_path)
+
+            text = io.StringIO()
+            pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(REPORT_TOP_N)
+            report_path = self.config.dump_dir / f"{stage}.prof.txt"
+            report_path.write_text(text.getvalue())
+
+        else:
+            already_tracing = tracemalloc.is_tracing()
+            if not already_tracing:
+                tracemalloc.start(25)
+            tracemalloc.reset_peak()
+            try:
+                result = fn()
+                snapshot = tracemalloc.take_snapshot()
+                _, traced_peak = tracemalloc.get_traced_memory()
+            finally:
+                if not already_tracing:
+                    tracemalloc.stop()
+
+            dump_path = self.config.dump_dir / f"{stage}.tracemalloc"
+            snapshot.dump(str(dump_path))
+
+            lines = [f"Peak traced memory: {traced_peak / 1e6:.1f} MB", ""]
+            lines += [str(stat) for stat in snapshot.statistics("lineno")[:REPORT_TOP_N]]
+            report_path = self.config.dump_dir / f"{stage}.tracemalloc.txt"
+            report_path.write_text("\n".join(lines) + "\n")
+
+        logger.info(f"{self.config.profile_mode} report for {stage} saved to: {report_path}")
+        return result, {"mode": self.config.profile_mode, "dump": str(dump_path), "report": str(report_path)}
+
+    def save(self) -> dict:
+        """
+        Adds rows and artifact sizes to every stage record and writes the
+        profile to `profile_path`. Call once every artifact is on disk.
+        """
+        if not self.config.enabled:
+            return {}
+
+        for record in self.stages:
+            if "rows_in" not in record:
+                record["rows_in"] = _sum_rows(record["inputs"])
+            if "rows_out" not in record:
+                record["rows_out"] = _sum_rows(record["outputs"])
+            rows = record["rows_in"] if record["rows_in"] is not None else record["rows_out"]
+            record["rows_per_s"] = rows / record["wall_s"] if rows and record["wall_s"] else None
+            record["artifact_bytes"] = {
+                path: Path(path).stat().st_size
+                for path in record["outputs"] if Path(path).exists()
+            }
+            record["total_artifact_bytes"] = sum(record["artifact_bytes"].values())
+
+        profile = {
+            "mode": self.mode,
+            "started_at": self._started_at,
+            "wall_s": time.perf_counter() - self._start_wall,
+            "cpu_s": time.process_time() - self._start_cpu,
+            "peak_rss_mb": max((record["peak_rss_mb"] for record in self.stages), default=None),
+            "stages": self.stages,
+        }
+
+        self.config.profile_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.config.profile_path, "w") as f:
+            json.dump(profile, f, indent=4)
+
+        logger.info(f"Pipeline profile saved to: {self.config.profile_path}")
+        return profile
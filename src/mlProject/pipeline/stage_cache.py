@@ -0,0 +1,301 @@
+import ast
+import hashlib
+import importlib.util
+import json
+import os
+import shutil
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable
+
+from mlProject import logger
+from mlProject.entity.config_entity import StageCacheConfig
+from mlProject.utils.common import hash_file
+
+
+PACKAGE = "mlProject"
+
+
+def _module_file(name: str):
+    try:
+        spec = importlib.util.find_spec(name)
+    except ImportError:
+        # `name` is an attribute of a module, not a module
+        return None
+    return Path(spec.origin) if spec is not None and spec.origin else None
+
+
+@lru_cache(maxsize=None)
+def _imported_modules(name: str) -> tuple:
+    """mlProject modules imported anywhere in module `name`'s source"""
+    path = _module_file(name)
+    if path is None or path.suffix != ".py":
+        return ()
+
+    package = name if path.name == "__init__.py" else name.rpartition(".")[0]
+    imported = set()
+    for node in ast.walk(ast.parse(path.read_text(), filename=str(path))):
+        if isinstance(node, ast.Import):
+            imported.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ""
+            if node.level:
+                parent = package.rsplit(".", node.level - 1)[0] if node.level > 1 else package
+                base = f"{parent}.{base}" if base else parent
+            imported.add(base)
+            # `from mlProject.utils import common` imports a submodule
+            imported.update(f"{base}.{alias.name}" for alias in node.names)
+
+    return tuple(sorted(
+        module for module in imported
+        if (module == PACKAGE or module.startswith(PACKAGE + ".")) and _module_file(module)
+    ))
+
+
+def module_sources(name: str) -> list:
+    """
+    Source files of module `name` and of every mlProject module it
+    imports, directly or through other mlProject modules, including the
+    packages they belong to. Imports inside functions count too.
+
+    Args:
+        name (str): dotted module name, e.g. a component's `__module__`
+
+    Returns:
+        list: sorted source paths
+    """
+    seen, pending = set(), [name]
+    while pending:
+        module = pending.pop()
+        if module in seen:
+            continue
+        seen.add(module)
+        parts = module.split(".")
+        pending.extend(".".join(parts[:i]) for i in range(1, len(parts)))
+        pending.extend(_imported_modules(module))
+
+    return sorted(
+        path for path in map(_module_file, seen)
+        if path is not None and path.suffix == ".py"
+    )
+
+
+class StageCache:
+    """
+    Content-addressed cache of training pipeline stages.
+
+    A stage's fingerprint covers the content of its input artifacts, its
+    settings (config.yaml and params.yaml sections) and the source files
+    it depends on (the component's module with every mlProject module it
+    imports, and schemas). When a stage runs, its
+    outputs are copied into an object store under their content hash and
+    an entry maps the fingerprint to those objects and to the stage's
+    return value. A later run with the same fingerprint restores the
+    outputs from the store instead of running the stage, so switching
+    params back and forth hits the cache both ways. Because fingerprints
+    use content hashes, a stage that reruns but writes identical bytes
+    lets everything downstream of it hit.
+    """
+
+    def __init__(self, config: StageCacheConfig):
+        self.config = config
+        self.root_dir = Path(config.root_dir)
+        self.entries_dir = self.root_dir / "entries"
+        self.objects_dir = self.root_dir / "objects"
+        self.hashes_path = self.root_dir / "file_hashes.json"
+
+        self.entries_dir.mkdir(parents=True, exist_ok=True)
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+
+        # (size, mtime) -> hash memo, so unchanged artifacts are not re-read
+        self._hashes = json.loads(self.hashes_path.read_text()) if self.hashes_path.exists() else {}
+        self.report = []
+
+    # ================================
+    # Hashing
+    # ================================
+
+    def _hash(self, path: Path) -> str:
+        stat = os.stat(path)
+        key = str(Path(path).resolve())
+        cached = self._hashes.get(key)
+        if cached is not None and cached[:2] == [stat.st_size, stat.st_mtime_ns]:
+            return cached[2]
+
+        digest = hash_file(Path(path))
+        self._hashes[key] = [stat.st_size, stat.st_mtime_ns, digest]
+        return digest
+
+    def fingerprint(self, stage: str, inputs: list, settings: dict, sources: list) -> str:
+        description = {
+            "stage": stage,
+            "inputs": {str(path): self._hash(path) for path in inputs},
+            "settings": settings,
+            "sources": {str(path): self._hash(path) for path in sources},
+        }
+        payload = json.dumps(description, sort_keys=True, default=str).encode()
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+    # ================================
+    # Results
+    # ================================
+
+    @classmethod
+    def _encode(cls, value):
+        if isinstance(value, Path):
+            return {"__path__": str(value)}
+        if isinstance(value, tuple):
+            return {"__tuple__": [cls._encode(v) for v in value]}
+        if isinstance(value, list):
+            return [cls._encode(v) for v in value]
+        if isinstance(value, dict):
+            return {k: cls._encode(v) for k, v in value.items()}
+        if isinstance(value, float):
+            return float(value)
+        return value
+
+    @classmethod
+    def _decode(cls, value):
+        if isinstance(value, dict):
+            if "__path__" in value:
+                return Path(value["__path__"])
+            if "__tuple__" in value:
+                return tuple(cls._decode(v) for v in value["__tuple__"])
+            return {k: cls._decode(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [cls._decode(v) for v in value]
+        return value
+
+    # ================================
+    # Objects
+    # ================================
+
+    @staticmethod
+    def _copy_atomic(source: Path, target: Path):
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f".{target.name}.tmp")
+        shutil.copyfile(source, tmp)
+        os.replace(tmp, target)
+
+    def _store(self, path: Path) -> str:
+        digest = self._hash(path)
+        obj = self.objects_dir / digest
+        if not obj.exists():
+            self._copy_atomic(Path(path), obj)
+        return digest
+
+    def _restore(self, outputs: dict):
+        for path, digest in outputs.items():
+            path = Path(path)
+            if path.exists() and self._hash(path) == digest:
+                continue
+            self._copy_atomic(self.objects_dir / digest, path)
+
+    def _prune(self, stage: str):
+        entries = sorted(
+            self.entries_dir.glob(f"{stage}-*.json"), key=lambda p: p.stat().st_mtime_ns
+        )
+        for entry in entries[:-self.config.max_entries_per_stage]:
+            entry.unlink()
+
+        referenced = set()
+        for entry in self.entries_dir.glob("*.json"):
+            referenced.update(json.loads(entry.read_text())["outputs"].values())
+        for obj in self.objects_dir.iterdir():
+            if obj.name not in referenced:
+                obj.unlink()
+
+    # ================================
+    # Running
+    # ================================
+
+    def run(
+        self,
+        stage: str,
+        fn: Callable,
+        inputs: list,
+        outputs: list,
+        settings: dict,
+        sources: list,
+    ) -> Any:
+        """
+        Runs a stage, or restores its outputs if it ran with the same
+        fingerprint before.
+
+        Args:
+            stage (str): stage name
+            fn (Callable): runs the stage and returns its result
+            inputs (list): artifact paths the stage reads
+            outputs (list): artifact paths the stage writes
+            settings (dict): config and params sections the stage uses
+            sources (list): source and schema files the stage depends on
+
+        Returns:
+            Any: the stage's result, from the cache on a hit
+        """
+        if not self.config.enabled:
+            return fn()
+
+        start = time.perf_counter()
+        fingerprint = self.fingerprint(stage, inputs, settings, sources)
+        entry_path = self.entries_dir / f"{stage}-{fingerprint}.json"
+
+        if entry_path.exists():
+            entry = json.loads(entry_path.read_text())
+            if all((self.objects_dir / digest).exists() for digest in entry["outputs"].values()):
+                self._restore(entry["outputs"])
+                os.utime(entry_path)
+                elapsed = time.perf_counter() - start
+                self._record(stage, fingerprint, True, elapsed, entry["seconds"])
+                return self._decode(entry["result"])
+
+        result = fn()
+        seconds = time.perf_counter() - start
+
+        entry = {
+            "stage": stage,
+            "fingerprint": fingerprint,
+            "outputs": {str(path): self._store(path) for path in outputs},
+            "result": self._encode(result),
+            "seconds": seconds,
+            "created_at": time.time(),
+        }
+        entry_path.write_text(json.dumps(entry, indent=4))
+        self._prune(stage)
+
+        self._record(stage, fingerprint, False, seconds, seconds)
+        return result
+
+    def _record(self, stage: str, fingerprint: str, hit: bool, seconds: float, original_seconds: float):
+        saved = max(original_seconds - seconds, 0.0) if hit else 0.0
+        self.report.append({
+            "stage": stage,
+            "fingerprint": fingerprint,
+            "hit": hit,
+            "seconds": seconds,
+            "saved_seconds": saved,
+        })
+        self.hashes_path.write_text(json.dumps(self._hashes))
+
+        if hit:
+            logger.info(f"Stage cache hit for {stage}: restored in {seconds:.3f}s, saved {saved:.3f}s")
+        else:
+            logger.info(f"Stage cache miss for {stage}: ran in {seconds:.3f}s")
+
+    def save_report(self) -> dict:
+        """
+        Writes the hits, misses and time saved of this run to report.json.
+        """
+        report = {
+            "stages": self.report,
+            "hits": sum(stage["hit"] for stage in self.report),
+            "misses": sum(not stage["hit"] for stage in self.report),
+            "saved_seconds": sum(stage["saved_seconds"] for stage in self.report),
+        }
+        (self.root_dir / "report.json").write_text(json.dumps(report, indent=4))
+        logger.info(
+            f"Stage cache: {report['hits']} hits, {report['misses']} misses, "
+            f"{report['saved_seconds']:.2f}s saved"
+        )
+        return report
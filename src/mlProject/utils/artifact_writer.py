@@ -0,0 +1,63 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from mlProject import logger
+
+
+class ArtifactWriter:
+    """
+    Writes stage artifacts off the critical path of an in-memory run.
+
+    Components handed a writer return their DataFrames and arrays to the
+    next stage directly and submit the artifact writes here instead of
+    doing them inline. In `background` mode the writes run in order on
+    one worker thread while the next stage computes; in `end` mode they
+    are queued and run by `flush`. Either way every artifact is on disk
+    once `flush` returns, so the run stays auditable.
+    """
+
+    MODES = ("background", "end")
+
+    def __init__(self, mode: str = "background"):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown artifact write mode {mode!r}, expected one of {self.MODES}")
+
+        self.mode = mode
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="artifact-writer") \
+            if mode == "background" else None
+        self._pending = []
+
+    def submit(self, fn: Callable, *args):
+        """
+        Schedules `fn(*args)`. The arguments must not be mutated afterwards.
+        """
+        if self._executor is not None:
+            self._pending.append(self._executor.submit(fn, *args))
+        else:
+            self._pending.append((fn, args))
+
+    def flush(self) -> float:
+        """
+        Waits for, or runs, every scheduled write.
+
+        Returns:
+            float: seconds spent waiting for the writes
+        """
+        start = time.perf_counter()
+
+        pending, self._pending = self._pending, []
+        for item in pending:
+            if self._executor is not None:
+                item.result()
+            else:
+                fn, args = item
+                fn(*args)
+
+        waited = time.perf_counter() - start
+        logger.info(f"Flushed {len(pending)} artifact writes in {waited:.3f}s")
+        return waited
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
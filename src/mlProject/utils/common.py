@@ -1,9 +1,17 @@
 import os
+import hashlib
+import struct
+import zipfile
 from box.exceptions import BoxValueError
 import yaml
 from mlProject import logger
 import json
 import joblib
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import scipy.sparse as sp
 from ensure import ensure_annotations
 from box import ConfigBox
 from pathlib import Path
@@ -96,6 +104,23 @@ def save_bin(data: Any, path: Path):
     logger.info(f"binary file saved at: {path}")
 
 
+@ensure_annotations
+def save_bin_atomic(data, path: Path):
+    """save binary file atomically
+
+    Writes to a temporary file next to the target and renames it into
+    place, so a reader never sees a partially written file.
+
+    Args:
+        data (Any): data to be saved as binary
+        path (Path): path to binary file
+    """
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    joblib.dump(value=data, filename=tmp_path)
+    os.replace(tmp_path, path)
+    logger.info(f"binary file saved at: {path}")
+
+
 @ensure_annotations
 def load_bin(path: Path) -> Any:
     """load binary data
@@ -123,4 +148,308 @@ def get_size(path: Path) -> str:
         str: size in KB
     """
     size_in_kb = round(os.path.getsize(path)/1024)
-    return f"~ {size_in_kb} KB"
\ No newline at end of file
+    return f"~ {size_in_kb} KB"
+
+
+@ensure_annotations
+def hash_file(path: Path) -> str:
+    """content hash of a file
+
+    Args:
+        path (Path): path of the file
+
+    Returns:
+        str: hex blake2b digest of the file content
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# Share of distinct values below which a text column is stored as category
+CATEGORICAL_MAX_UNIQUE_RATIO = 0.5
+
+# Rows per Parquet row group. Readers decode a whole row group at a time,
+# so this bounds the memory of reading the first rows of a file.
+PARQUET_ROW_GROUP_ROWS = 65_536
+
+# Field values treated as missing by the schema-driven loader
+BLANK_VALUES = ["", " "]
+
+
+@ensure_annotations
+def read_dataset(path, schema: ConfigBox, usecols=None, **kwargs) -> pd.DataFrame:
+    """read a CSV with the dtypes declared in a schema file
+
+    Columns listed under `categorical_columns` are parsed straight to
+    `category`, numeric columns to their declared dtype, and blank fields
+    to NaN, so no type fixing is needed after the read. Columns listed
+    under `data_issues.type_mismatch` are parsed as their expected type.
+
+    Args:
+        path (Path | file-like): CSV file
+        schema (ConfigBox): contents of schema.yaml or schema_processed.yaml
+        usecols (list, optional): only read these columns
+        **kwargs: passed on to `pd.read_csv`
+
+    Returns:
+        pd.DataFrame: typed dataframe
+    """
+    categorical = set(schema.get("categorical_columns", []))
+    expected_types = {
+        issue["column"]: issue["expected_type"]
+        for issue in schema.get("data_issues", {}).get("type_mismatch", [])
+    }
+
+    dtypes = {}
+    for col, dtype in schema["columns"].items():
+        dtype = expected_types.get(col, dtype)
+        if col in categorical:
+            dtypes[col] = "category"
+        elif dtype != "object":
+            dtypes[col] = dtype
+
+    if usecols is not None:
+        dtypes = {col: dtype for col, dtype in dtypes.items() if col in usecols}
+
+    return pd.read_csv(
+        path,
+        dtype=dtypes,
+        usecols=usecols,
+        na_values=BLANK_VALUES,
+        keep_default_na=False,
+        **kwargs,
+    )
+
+
+@ensure_annotations
+def save_dataframe(df: pd.DataFrame, path: Path):
+    """save dataframe in the format given by the file extension
+
+    Parquet (.parquet) and Feather (.feather) keep column dtypes, and
+    low-cardinality text columns are stored as categoricals. Parquet is
+    written in row groups of PARQUET_ROW_GROUP_ROWS. Anything else is
+    written as CSV.
+
+    Args:
+        df (pd.DataFrame): dataframe to be saved
+        path (Path): path to the output file
+    """
+    suffix = path.suffix.lower()
+
+    if suffix in (".parquet", ".feather"):
+        df = df.copy()
+        for col in df.select_dtypes(include=["object", "string"]).columns:
+            if df[col].nunique() <= CATEGORICAL_MAX_UNIQUE_RATIO * len(df):
+                df[col] = df[col].astype("category")
+
+        if suffix == ".parquet":
+            df.to_parquet(path, index=False, row_group_size=PARQUET_ROW_GROUP_ROWS)
+        else:
+            df.reset_index(drop=True).to_feather(path)
+    else:
+        df.to_csv(path, index=False)
+
+    logger.info(f"dataframe saved at: {path}")
+
+
+@ensure_annotations
+def load_dataframe(path: Path, schema=None) -> pd.DataFrame:
+    """load dataframe in the format given by the file extension
+
+    Args:
+        path (Path): path to a .parquet, .feather or .csv file
+        schema (ConfigBox, optional): schema used to type a CSV file
+
+    Returns:
+        pd.DataFrame: loaded dataframe
+    """
+    suffix = path.suffix.lower()
+
+    if suffix == ".parquet":
+        return pd.read_parquet(path)
+    if suffix == ".feather":
+        return pd.read_feather(path)
+    if schema is not None:
+        return read_dataset(path, schema)
+    return pd.read_csv(path)
+
+
+@ensure_annotations
+def iter_dataframe(path: Path, chunk_rows: int, schema=None):
+    """iterate over a dataframe file in chunks of rows
+
+    Parquet is decoded one batch at a time, without buffering the rest
+    of the file ahead, Feather is memory-mapped and sliced, and CSV is
+    read with `chunksize`, typed by the schema if one is given. Only one
+    chunk is held in memory at a time.
+
+    Args:
+        path (Path): path to a .parquet, .feather or .csv file
+        chunk_rows (int): rows per chunk
+        schema (ConfigBox, optional): schema used to type a CSV file
+
+    Yields:
+        pd.DataFrame: consecutive chunks of the file
+    """
+    suffix = path.suffix.lower()
+
+    if suffix == ".parquet":
+        for batch in pq.ParquetFile(path, pre_buffer=False).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    elif suffix == ".feather":
+        with pa.memory_map(str(path)) as source:
+            table = pa.ipc.open_file(source).read_all()
+            for start in range(0, table.num_rows, chunk_rows):
+                yield table.slice(start, chunk_rows).to_pandas()
+    elif schema is not None:
+        yield from read_dataset(path, schema, chunksize=chunk_rows)
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_rows)
+
+
+@ensure_annotations
+def matrix_path(path: Path, sparse: bool) -> Path:
+    """path of a design matrix artifact in the chosen layout
+
+    Dense matrices keep the configured .npy path, sparse ones are stored
+    next to it as .npz.
+
+    Args:
+        path (Path): configured path of the matrix
+        sparse (bool): whether the matrix is stored sparse
+
+    Returns:
+        Path: path to read or write
+    """
+    return path.with_suffix(".npz") if sparse else path
+
+
+@ensure_annotations
+def save_matrix(matrix, path: Path):
+    """save a design matrix in the format given by the file extension
+
+    Sparse matrices are written to .npz as CSR, uncompressed so loading
+    is a plain read of the three CSR arrays. Anything else is written
+    with np.save.
+
+    Args:
+        matrix (np.ndarray | scipy.sparse matrix): matrix to be saved
+        path (Path): path to the output file
+    """
+    if path.suffix.lower() == ".npz":
+        sp.save_npz(path, sp.csr_matrix(matrix), compressed=False)
+    else:
+        np.save(path, matrix)
+
+
+def _mmap_npz_member(path: Path, archive: zipfile.ZipFile, name: str) -> np.memmap:
+    """memory-map one .npy member stored uncompressed in a .npz archive"""
+    info = archive.getinfo(name)
+    with open(path, "rb") as f:
+        # The local file header is 30 bytes, then the name and extra field
+        f.seek(info.header_offset + 26)
+        name_length, extra_length = struct.unpack("<HH", f.read(4))
+        f.seek(info.header_offset + 30 + name_length + extra_length)
+        version = np.lib.format.read_magic(f)
+        read_header = (
+            np.lib.format.read_array_header_1_0 if version == (1, 0)
+            else np.lib.format.read_array_header_2_0
+        )
+        shape, fortran_order, dtype = read_header(f)
+        offset = f.tell()
+
+    return np.memmap(
+        path, dtype=dtype, mode="r", shape=shape, offset=offset,
+        order="F" if fortran_order else "C",
+    )
+
+
+@ensure_annotations
+def load_matrix(path: Path, mmap: bool = False):
+    """load a design matrix in the format given by the file extension
+
+    Args:
+        path (Path): path to a .npy or CSR .npz file
+        mmap (bool, optional): memory-map the matrix read-only instead of
+            reading it. The CSR arrays of a .npz archive are mapped when
+            it is uncompressed, as save_matrix writes it, and read
+            otherwise. Defaults to False.
+
+    Returns:
+        np.ndarray | scipy.sparse.csr_matrix: loaded matrix
+    """
+    if path.suffix.lower() == ".npz":
+        if not mmap:
+            return sp.load_npz(path).tocsr()
+        with zipfile.ZipFile(path) as archive:
+            with np.load(path) as arrays:
+                stored = all(
+                    info.compress_type == zipfile.ZIP_STORED for info in archive.infolist()
+                )
+                if not stored or arrays["format"].item() not in ("csr", b"csr"):
+                    return sp.load_npz(path).tocsr()
+                shape = tuple(arrays["shape"])
+            data, indices, indptr = (
+                _mmap_npz_member(path, archive, f"{name}.npy")
+                for name in ("data", "indices", "indptr")
+            )
+        return sp.csr_matrix((data, indices, indptr), shape=shape)
+    return np.load(path, mmap_mode="r" if mmap else None)
+
+
+@ensure_annotations
+def share_matrix(matrix, directory: Path, name: str) -> dict:
+    """describe a matrix as .npy files other processes can memory-map
+
+    A dense array that already is a whole memory-mapped .npy file is
+    shared in place; anything else is written to `directory`, CSR
+    matrices as their data, indices and indptr arrays.
+
+    Args:
+        matrix (np.ndarray | scipy.sparse matrix): matrix to be shared
+        directory (Path): where copies are written
+        name (str): file name prefix of the copies
+
+    Returns:
+        dict: paths and shape, for load_shared_matrix
+    """
+    if sp.issparse(matrix):
+        matrix = matrix.tocsr()
+        arrays = {"data": matrix.data, "indices": matrix.indices, "indptr": matrix.indptr}
+    else:
+        arrays = {"array": matrix}
+
+    paths = {}
+    for part, array in arrays.items():
+        if isinstance(array, np.memmap) and str(array.filename).endswith(".npy") \
+                and array.flags.c_contiguous:
+            mapped = np.load(array.filename, mmap_mode="r")
+            if mapped.shape == array.shape and mapped.dtype == array.dtype:
+                paths[part] = Path(array.filename)
+                continue
+        os.makedirs(directory, exist_ok=True)
+        paths[part] = directory / f"{name}_{part}.npy"
+        np.save(paths[part], np.ascontiguousarray(array))
+
+    return {"paths": paths, "shape": matrix.shape}
+
+
+@ensure_annotations
+def load_shared_matrix(shared: dict):
+    """memory-map a matrix described by share_matrix, read-only
+
+    Args:
+        shared (dict): paths and shape returned by share_matrix
+
+    Returns:
+        np.memmap | scipy.sparse.csr_matrix: matrix backed by the files
+    """
+    arrays = {part: np.load(path, mmap_mode="r") for part, path in shared["paths"].items()}
+    if "array" in arrays:
+        return arrays["array"]
+    return sp.csr_matrix(
+        (arrays["data"], arrays["indices"], arrays["indptr"]), shape=shared["shape"]
+    )
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Synthetic customers come from the benchmarks' generator
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
@@ -0,0 +1,110 @@
+import os
+
+import pandas as pd
+import pytest
+
+from synthetic import generate_customers
+
+from mlProject.components.data_ingestion import DataIngestion
+from mlProject.entity.config_entity import DataIngestionConfig
+
+
+@pytest.fixture
+def config(tmp_path):
+    (tmp_path / "extracts").mkdir()
+    return DataIngestionConfig(
+        root_dir=tmp_path,
+        source_data_path=tmp_path / "unused.csv",
+        local_data_file=tmp_path / "data.csv",
+        incremental=True,
+        source_data_dir=tmp_path / "extracts",
+        state_dir=tmp_path / "state",
+        delta_data_file=tmp_path / "delta.csv",
+    )
+
+
+@pytest.fixture
+def customers():
+    return generate_customers(6, seed=3).astype(str)
+
+
+def _write(config, name: str, df: pd.DataFrame):
+    """Writes an extract with a newer mtime than any before it"""
+    path = config.source_data_dir / name
+    df.to_csv(path, index=False)
+    mtime_ns = max(
+        [p.stat().st_mtime_ns for p in config.source_data_dir.iterdir()] + [0]
+    ) + 1_000_000
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def _ingest(config, commit: bool = True) -> dict:
+    """customerID -> MonthlyCharges of the delta, empty if there is none"""
+    ingestion = DataIngestion(config)
+    delta_path = ingestion.initiate_incremental_ingestion()
+    if commit:
+        ingestion.commit_incremental_ingestion()
+    if delta_path is None:
+        return {}
+    delta = pd.read_csv(delta_path, dtype=str, keep_default_na=False)
+    return dict(zip(delta["customerID"], delta["MonthlyCharges"]))
+
+
+def _with_charges(df: pd.DataFrame, rows: list, charges: str) -> pd.DataFrame:
+    df = df.copy()
+    df.loc[rows, "MonthlyCharges"] = charges
+    return df
+
+
+def test_first_run_takes_each_customer_from_the_latest_extract(config, customers):
+    ids = customers["customerID"].tolist()
+    _write(config, "2026-01.csv", customers.iloc[:4])
+    _write(config, "2026-02.csv", _with_charges(customers.iloc[[1, 4]], [1], "111.11"))
+
+    delta = _ingest(config)
+
+    assert sorted(delta) == sorted(ids[:5])
+    assert delta[ids[1]] == "111.11"
+    assert delta[ids[4]] == customers.loc[4, "MonthlyCharges"]
+
+
+def test_unchanged_rerun_has_no_delta(config, customers):
+    _write(config, "2026-01.csv", customers.iloc[:4])
+    _write(config, "2026-02.csv", customers.iloc[[1, 4]])
+    _ingest(config)
+
+    assert _ingest(config) == {}
+
+    # Touched but unchanged
+    for path in config.source_data_dir.iterdir():
+        os.utime(path)
+    assert _ingest(config) == {}
+
+
+def test_edit_shadowed_by_a_newer_extract_is_not_ingested(config, customers):
+    ids = customers["customerID"].tolist()
+    _write(config, "2026-01.csv", customers.iloc[:4])
+    _write(config, "2026-02.csv", customers.iloc[[1, 4]])
+    _ingest(config)
+
+    # The older extract is re-delivered with customer 1, whose row the
+    # newer extract holds, and customer 2 edited
+    _write(config, "2026-01.csv", _with_charges(customers.iloc[:4], [1, 2], "1.11"))
+
+    assert _ingest(config) == {ids[2]: "1.11"}
+
+
+def test_run_failing_after_staging_ingests_the_same_delta_again(config, customers):
+    ids = customers["customerID"].tolist()
+    _write(config, "2026-01.csv", customers.iloc[:4])
+    _ingest(config)
+
+    _write(config, "2026-02.csv", _with_charges(customers.iloc[[0, 5]], [0], "2.22"))
+    expected = {ids[0]: "2.22", ids[5]: customers.loc[5, "MonthlyCharges"]}
+
+    # The run fails after the state was staged, before it is committed
+    assert _ingest(config, commit=False) == expected
+
+    assert _ingest(config) == expected
+    assert _ingest(config) == {}
+    assert len(list(config.state_dir.glob("row_index*.parquet"))) == 1
@@ -0,0 +1,39 @@
+import json
+
+import pytest
+
+from synthetic import generate_customers
+
+from mlProject.components.data_validation import DataValidation
+from mlProject.constants import SCHEMA_PROCESSED_FILE_PATH, SCHEMA_RAW_FILE_PATH
+from mlProject.entity.config_entity import DataValidationConfig
+
+
+@pytest.fixture
+def validation(tmp_path):
+    return DataValidation(DataValidationConfig(
+        root_dir=tmp_path,
+        schema_raw=SCHEMA_RAW_FILE_PATH,
+        schema_processed=SCHEMA_PROCESSED_FILE_PATH,
+        validation_report=tmp_path / "status.json",
+        chunk_size=128,
+    ))
+
+
+def test_total_charges_must_be_numeric_but_may_be_blank(validation, tmp_path):
+    customers = generate_customers(500, seed=11)
+    # Customers in their first month, in the first and a later chunk
+    customers.loc[[0, 300], "TotalCharges"] = " "
+    data_path = tmp_path / "customers.csv"
+    customers.to_csv(data_path, index=False)
+
+    assert validation.initiate_data_validation(data_path)
+
+    customers.loc[400, "TotalCharges"] = "n/a"
+    customers.to_csv(data_path, index=False)
+
+    with pytest.raises(ValueError, match="dtypes"):
+        validation.initiate_data_validation(data_path)
+    report = json.loads(validation.config.validation_report.read_text())["rules"]
+    assert report["dtypes"]["invalid_values"] == {"TotalCharges": 1}
+    assert report["missing_values"]["counts"] == {"TotalCharges": 2}
@@ -0,0 +1,230 @@
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from synthetic import generate_customers
+
+from mlProject.components.data_cleaning import DataCleaning
+from mlProject.components.data_transformation import build_preprocessor
+from mlProject.components.feature_engineering import RECORD_PATH_MAX_ROWS, FeatureTransformer
+from mlProject.components.model_backends import build_model
+from mlProject.components.scorer_export import PARITY_TOLERANCE, ScorerExport
+from mlProject.constants import PARAMS_FILE_PATH, SCHEMA_PROCESSED_FILE_PATH
+from mlProject.entity.config_entity import (
+    BatchPredictionConfig,
+    ModelServingConfig,
+    PredictionCacheConfig,
+    ScorerExportConfig,
+)
+from mlProject.pipeline.batch_prediction import BatchPredictionPipeline
+from mlProject.pipeline.prediction import PredictionPipeline
+from mlProject.utils.common import read_yaml
+
+
+N_ROWS = 5_000
+
+
+@pytest.fixture(scope="module")
+def raw():
+    customers = generate_customers(N_ROWS, seed=7)
+    # A few customers in their first month, whose TotalCharges is blank
+    customers.loc[:4, "TotalCharges"] = " "
+    return customers
+
+
+@pytest.fixture(scope="module")
+def fitted(raw):
+    params = read_yaml(PARAMS_FILE_PATH)
+    schema = read_yaml(SCHEMA_PROCESSED_FILE_PATH)
+
+    feature_transformer = FeatureTransformer.from_params(params)
+    featured = feature_transformer.fit_transform(DataCleaning.clean(raw.copy()))
+    X = featured.drop(columns=[schema["target_column"]])
+    y = featured[schema["target_column"]].map({"Yes": 1, "No": 0}).astype(int)
+
+    preprocessor = build_preprocessor(params, schema, sparse=False).fit(X)
+    models = {
+        name: build_model(name, params, 1).fit(preprocessor.transform(X), y)
+        for name in ("logistic_regression", "sgd_logistic")
+    }
+    return feature_transformer, preprocessor, models, featured
+
+
+@pytest.fixture
+def serving(tmp_path, fitted, raw):
+    """A PredictionPipeline over artifacts saved as the training pipeline does"""
+    feature_transformer, preprocessor, models, featured = fitted
+    config = ModelServingConfig(
+        model_path=tmp_path / "model.pkl",
+        preprocessor_path=tmp_path / "preprocessor.pkl",
+        feature_transformer_path=tmp_path / "feature_transformer.pkl",
+        scorer_path=tmp_path / "scorer.npz",
+        hot_reload=False,
+        reload_interval_seconds=1,
+        host="127.0.0.1",
+        port=0,
+        workers=1,
+    )
+    joblib.dump(feature_transformer, config.feature_transformer_path)
+    joblib.dump(preprocessor, config.preprocessor_path)
+    joblib.dump(models["logistic_regression"], config.model_path)
+
+    ScorerExport(ScorerExportConfig(
+        root_dir=tmp_path,
+        model_path=config.model_path,
+        preprocessor_path=config.preprocessor_path,
+        featured_data_path=tmp_path / "featured.parquet",
+        scorer_path=config.scorer_path,
+        report_path=tmp_path / "report.json",
+    )).initiate_scorer_export(featured_data=featured)
+
+    return config
+
+
+@pytest.mark.parametrize("name", ["logistic_regression", "sgd_logistic"])
+def test_fused_scorer_matches_sklearn(fitted, name):
+    _, preprocessor, models, featured = fitted
+
+    scorer, _, max_diff = ScorerExport.verify(preprocessor, models[name], featured)
+
+    assert max_diff <= PARITY_TOLERANCE
+    expected = models[name].predict_proba(preprocessor.transform(featured))[:, 1]
+    np.testing.assert_allclose(scorer.score_batch(featured), expected, rtol=0, atol=PARITY_TOLERANCE)
+
+
+def test_serving_scores_through_fused_scorer(serving, raw):
+    pipeline = PredictionPipeline(serving)
+    bundle = pipeline.model_holder.bundle
+    assert bundle.scorer is not None
+
+    # Both the record path and the batch path, blank TotalCharges included
+    for records in (raw.head(RECORD_PATH_MAX_ROWS), raw.head(RECORD_PATH_MAX_ROWS * 4)):
+        expected = bundle.pipeline.predict_proba(pipeline._prepare(records))[:, 1]
+        predictions = pipeline.predict(records.to_dict(orient="records"))
+        np.testing.assert_allclose(
+            [p["churn_probability"] for p in predictions], expected, rtol=0, atol=PARITY_TOLERANCE
+        )
+
+
+def test_scorer_of_another_model_is_not_used(serving, fitted, raw):
+    _, _, models, _ = fitted
+    joblib.dump(models["sgd_logistic"], serving.model_path)
+
+    pipeline = PredictionPipeline(serving)
+    bundle = pipeline.model_holder.bundle
+    assert bundle.scorer is None
+
+    records = raw.head(8)
+    expected = models["sgd_logistic"].predict_proba(
+        bundle.preprocessor.transform(bundle.feature_transformer.transform(pipeline._prepare(records)))
+    )[:, 1]
+    predictions = pipeline.predict(records.to_dict(orient="records"))
+    np.testing.assert_allclose([p["churn_probability"] for p in predictions], expected)
+
+
+@pytest.mark.parametrize("n_records", [1, RECORD_PATH_MAX_ROWS + 1])
+def test_record_and_batch_paths_coerce_numbers_alike(serving, raw, n_records):
+    pipeline = PredictionPipeline(serving)
+    records = raw.head(n_records).to_dict(orient="records")
+    expected = pipeline.predict(records)
+
+    as_strings = [
+        {**record, "tenure": str(record["tenure"]), "MonthlyCharges": f" {record['MonthlyCharges']} "}
+        for record in records
+    ]
+    assert pipeline.predict(as_strings) == expected
+
+    for bad in ("abc", None, ""):
+        with pytest.raises(ValueError, match="tenure"):
+            pipeline.predict([*records[:-1], {**records[-1], "tenure": bad}])
+
+
+def test_records_differing_in_a_category_do_not_share_a_cache_entry(serving, raw):
+    cache_config = PredictionCacheConfig(
+        enabled=True, max_entries=100, ttl_seconds=60, check_interval_seconds=60
+    )
+    cached = PredictionPipeline(serving, cache_config)
+    uncached = PredictionPipeline(serving)
+
+    record = raw.head(1).to_dict(orient="records")[0]
+    variants = [
+        {**record, "PaymentMethod": method}
+        for method in (
+            "Electronic check", "Electronic check ", "Mailed check", "Bank transfer (automatic)"
+        )
+    ]
+    keys = {cached.cache.make_key(cached._prepare_record(variant)) for variant in variants}
+    assert len(keys) == len(variants)
+
+    # Scored one after another, so each could only come from another's entry
+    for variant in variants:
+        assert cached.predict([variant]) == uncached.predict([variant])
+
+
+def test_scores_of_a_model_swapped_out_mid_batch_are_not_cached(serving, raw):
+    cache_config = PredictionCacheConfig(
+        enabled=True, max_entries=100, ttl_seconds=60, check_interval_seconds=60
+    )
+    pipeline = PredictionPipeline(serving, cache_config)
+    score_records = pipeline._score_records
+
+    def score_during_swap(records, bundle=None):
+        scored = score_records(records, bundle)
+        # What ModelHolder's on_swap does once the new bundle is published
+        pipeline._on_model_swap(bundle)
+        return scored
+
+    pipeline._score_records = score_during_swap
+    pipeline.predict(raw.head(4).to_dict(orient="records"))
+    assert pipeline.cache.stats()["entries"] == 0
+
+
+def test_unknown_ordinal_category_is_rejected_like_sklearn(fitted, serving, raw):
+    _, preprocessor, models, featured = fitted
+    scorer = ScorerExport.compile(preprocessor, models["logistic_regression"])
+
+    for value in ("Weekly", None):
+        unknown = featured.head(3).copy()
+        unknown["Contract"] = unknown["Contract"].astype(object)
+        unknown.iloc[1, unknown.columns.get_loc("Contract")] = value
+        with pytest.raises(ValueError):
+            preprocessor.transform(unknown)
+        with pytest.raises(ValueError, match="Contract"):
+            scorer.score_batch(unknown)
+        with pytest.raises(ValueError, match="Contract"):
+            scorer.score_record(unknown.iloc[1].to_dict())
+
+    # Through serving, on the record path and the batch path
+    pipeline = PredictionPipeline(serving)
+    for n_records in (1, RECORD_PATH_MAX_ROWS + 1):
+        records = raw.head(n_records).to_dict(orient="records")
+        with pytest.raises(ValueError):
+            pipeline.predict([*records[:-1], {**records[-1], "Contract": "Weekly"}])
+
+
+def test_batch_and_online_score_blank_total_charges_alike(serving, raw, tmp_path):
+    records = raw.head(20)
+    input_path = tmp_path / "customers.csv"
+    records.to_csv(input_path, index=False)
+
+    output_path = BatchPredictionPipeline(BatchPredictionConfig(
+        root_dir=tmp_path,
+        input_path=input_path,
+        output_path=tmp_path / "predictions.csv",
+        model_path=serving.model_path,
+        preprocessor_path=serving.preprocessor_path,
+        feature_transformer_path=serving.feature_transformer_path,
+        scorer_path=serving.scorer_path,
+        chunk_size_mb=1,
+        n_workers=1,
+    )).run()
+    batch = pd.read_csv(output_path)
+
+    online = PredictionPipeline(serving).predict(records.to_dict(orient="records"))
+
+    assert batch["customerID"].tolist() == records["customerID"].tolist()
+    np.testing.assert_allclose(
+        batch["churn_probability"], [p["churn_probability"] for p in online],
+        rtol=0, atol=PARITY_TOLERANCE,
+    )
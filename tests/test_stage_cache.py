@@ -0,0 +1,100 @@
+import shutil
+import sys
+
+import pytest
+import yaml
+
+from scratch import scratch_config, working_directory
+from synthetic import write_customers
+
+from mlProject.constants import PARAMS_FILE_PATH
+from mlProject.pipeline import stage_cache
+from mlProject.pipeline.pipeline import TrainingPipeline
+
+
+N_ROWS = 2_000
+
+
+@pytest.fixture
+def run_dir(tmp_path):
+    source_path = write_customers(tmp_path / "customers.csv", N_ROWS)
+    run_dir = tmp_path / "run"
+    config_path = scratch_config(run_dir, source_path, {
+        "training_pipeline": {"in_memory": False},
+        "data_ingestion": {"incremental": False},
+        "stage_cache": {"enabled": True},
+    })
+    return run_dir, config_path
+
+
+@pytest.fixture(autouse=True)
+def fresh_module_sources():
+    stage_cache._imported_modules.cache_clear()
+    yield
+    stage_cache._imported_modules.cache_clear()
+
+
+def _use_params(monkeypatch, params_path):
+    """Points every loaded mlProject module at another params.yaml"""
+    for module in list(sys.modules.values()):
+        if getattr(module, "__name__", "").startswith("mlProject") \
+                and getattr(module, "PARAMS_FILE_PATH", None) == PARAMS_FILE_PATH:
+            monkeypatch.setattr(module, "PARAMS_FILE_PATH", params_path)
+
+
+def _run(run_dir, config_path) -> dict:
+    """stage -> whether it was restored from the stage cache"""
+    with working_directory(run_dir):
+        pipeline = TrainingPipeline(config_path)
+        pipeline.run()
+    return {entry["stage"]: entry["hit"] for entry in pipeline.stage_cache.report}
+
+
+@pytest.mark.parametrize("section, key, value, first_rerun", [
+    ("logistic_regression", "class_weight", None, "model_trainer"),
+    ("feature_engineering", "tenure_bins", [6, 24, 48], "feature_engineering"),
+])
+def test_params_change_reruns_only_the_dependent_stages(
+    run_dir, monkeypatch, section, key, value, first_rerun
+):
+    run_dir, config_path = run_dir
+    assert not any(_run(run_dir, config_path).values())
+    assert all(_run(run_dir, config_path).values())
+
+    params = yaml.safe_load(PARAMS_FILE_PATH.read_text())
+    params[section][key] = value
+    params_path = run_dir / "params.yaml"
+    params_path.write_text(yaml.safe_dump(params))
+    _use_params(monkeypatch, params_path)
+
+    hits = _run(run_dir, config_path)
+
+    stages = list(hits)
+    rerun = stages[stages.index(first_rerun):]
+    assert hits == {stage: stage not in rerun for stage in stages}
+
+
+def test_editing_an_imported_module_invalidates_the_stage(run_dir, monkeypatch):
+    run_dir, config_path = run_dir
+    _run(run_dir, config_path)
+
+    # model_trainer imports model_backends, which no earlier stage does
+    backends = stage_cache._module_file("mlProject.components.model_backends")
+    edited = run_dir / "model_backends.py"
+    shutil.copyfile(backends, edited)
+    with open(edited, "a") as f:
+        f.write("\n# edited\n")
+
+    module_file = stage_cache._module_file
+    monkeypatch.setattr(
+        stage_cache, "_module_file",
+        lambda name: edited if name == "mlProject.components.model_backends" else module_file(name),
+    )
+    stage_cache._imported_modules.cache_clear()
+
+    hits = _run(run_dir, config_path)
+
+    for stage in ("data_ingestion", "data_validation", "data_cleaning",
+                  "feature_engineering", "data_transformation"):
+        assert hits[stage], stage
+    assert not hits["model_trainer"]